@@ -0,0 +1,77 @@
+"""Benchmark du contrôle d'admission des appels aux fournisseurs.
+
+Envoie une rafale de N générations simultanées vers le fournisseur factice avec une
+concurrence, une file d'attente et des débits limités, puis rapporte les appels admis
+et refusés (503 côté API), le Retry-After proposé et les temps d'attente.
+
+    python -m backend.benchmarks.admission --burst 200 --max-concurrency 8 --queue-max 32 --rpm 600
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from backend.benchmarks.mock_provider import MockProviderServer
+from backend.benchmarks.openai_stream import bench_agent
+
+
+async def main(args):
+    server = MockProviderServer(tokens=args.tokens, token_delay=args.token_delay)
+    base_url = server.start()
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{base_url}/v1",
+        "FORCE_MOCK_STREAM": "false",
+        "AI_MAX_CONCURRENCY": str(args.max_concurrency),
+        "AI_QUEUE_MAX": str(args.queue_max),
+        "AI_QUEUE_TIMEOUT": str(args.queue_timeout),
+        "AI_RPM": str(args.rpm),
+        "AI_TPM": str(args.tpm),
+    })
+
+    from backend.services.ai_service import AIService
+    from backend.services.rate_limiter import AdmissionRejected
+    service = AIService()
+    agent = bench_agent()
+    retry_afters = []
+
+    async def one():
+        try:
+            await service.generate_response(agent, "Système", "Présente ta position.", [])
+            return "ok"
+        except AdmissionRejected as e:
+            retry_afters.append(e.retry_after)
+            return e.reason
+
+    try:
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(one() for _ in range(args.burst)))
+        elapsed = time.perf_counter() - start
+    finally:
+        await service.aclose()
+        server.stop()
+
+    print(
+        f"Rafale de {args.burst} appels: concurrence {args.max_concurrency}, file {args.queue_max}, "
+        f"attente max {args.queue_timeout} s, {args.rpm or '∞'} req/min, {args.tpm or '∞'} tokens/min"
+    )
+    print(f"Durée: {elapsed:.2f} s, requêtes reçues par le fournisseur: {server.request_count}")
+    for outcome in sorted(set(outcomes)):
+        print(f"  {outcome:<24} {outcomes.count(outcome)}")
+    if retry_afters:
+        print(f"  Retry-After proposé: {min(retry_afters):.1f}–{max(retry_afters):.1f} s")
+    for key, stats in service.limiter.stats().items():
+        print(f"  {key}: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--burst", type=int, default=200, help="Nombre d'appels simultanés")
+    parser.add_argument("--tokens", type=int, default=20, help="Tokens par réponse")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Délai entre deux tokens (s)")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--queue-max", type=int, default=32)
+    parser.add_argument("--queue-timeout", type=float, default=5)
+    parser.add_argument("--rpm", type=float, default=0, help="Requêtes par minute (0 = illimité)")
+    parser.add_argument("--tpm", type=float, default=0, help="Tokens par minute (0 = illimité)")
+    asyncio.run(main(parser.parse_args()))
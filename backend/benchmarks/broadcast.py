@@ -0,0 +1,212 @@
+"""Test de charge de la diffusion d'un débat à de nombreux spectateurs.
+
+Lance le fournisseur factice dans un thread et l'API (`backend.main`, stockage SQLite
+temporaire) dans un processus séparé, pour que la lecture des N flux côté client ne
+ralentisse pas le serveur; abonne N spectateurs à `GET /debates/{id}/events`, puis joue le débat en
+exécution automatique. Une partie des spectateurs se déconnecte en cours de route et se
+reconnecte avec `Last-Event-ID`. Vérifie que chaque spectateur a reçu tous les
+événements (sans trou ni doublon) et le texte exact des messages enregistrés, et
+rapporte l'écart de réception d'un même événement entre spectateurs.
+
+    python -m backend.benchmarks.broadcast --subscribers 1000 --turns 2 --reconnect 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Tuple
+
+import httpx
+
+from backend.benchmarks.mock_provider import MockProviderServer, _free_port
+from backend.benchmarks.openai_stream import bench_agent
+
+
+class Viewer:
+    """Spectateur simulé: événements reçus (id, type, texte) et instants de réception"""
+
+    def __init__(self, index: int, reconnect_after: int = 0):
+        self.index = index
+        self.reconnect_after = reconnect_after
+        self.last_event_id = None
+        self.events = []
+        self.received_at = {}
+        self.connections = 0
+        self.received = 0
+        self.resyncs = 0
+        self.lagged = 0
+        self.on_connected = lambda: None
+
+    def handle(self, frame: bytes) -> bool:
+        """Traiter une trame SSE; renvoie False pour se déconnecter volontairement"""
+        if frame.startswith(b":"):
+            return True
+        event_id = None
+        if frame.startswith(b"id: "):
+            header, frame = frame.split(b"\n", 1)
+            event_id = header[4:].decode()
+        event = json.loads(frame[6:])
+        if event["type"] == "debate_status" and self.connections == 1:
+            self.on_connected()
+        elif event["type"] == "resync":
+            self.resyncs += 1
+        elif event["type"] == "lagged":
+            self.lagged += 1
+            return False
+        if event_id is not None:
+            self.last_event_id = event_id
+            self.received_at[event_id] = time.perf_counter()
+            self.events.append((event_id, event["type"], event.get("text")))
+            self.received += 1
+        # Déconnexion en cours de débat (une fois), reconnexion un peu plus tard
+        return not (self.reconnect_after and self.connections == 1 and self.received >= self.reconnect_after)
+
+    async def read(self, client: httpx.AsyncClient, url: str):
+        finished = False
+        while not finished:
+            headers = {"Last-Event-ID": self.last_event_id} if self.last_event_id else {}
+            self.connections += 1
+            finished = True
+            async with client.stream("GET", url, headers=headers) as response:
+                pending = b""
+                async for chunk in response.aiter_raw():
+                    *frames, pending = (pending + chunk).split(b"\n\n")
+                    if not all([self.handle(frame) for frame in frames]):
+                        finished = False
+                        break
+            if not finished:
+                await asyncio.sleep(0.05)
+
+
+async def start_api(env: dict) -> Tuple[subprocess.Popen, str]:
+    """API dans un processus uvicorn dédié; renvoie le processus et son URL une fois prêt"""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(200):
+            try:
+                await client.get("/")
+                return process, base_url
+            except httpx.TransportError:
+                await asyncio.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("L'API n'a pas démarré")
+
+
+def cpu_seconds(pid: int) -> float:
+    """Temps CPU consommé par un processus (Linux, /proc)"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def main(args):
+    provider = MockProviderServer(tokens=args.tokens, token_delay=args.token_delay)
+    provider_url = provider.start()
+    api, base_url = await start_api({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{provider_url}/v1",
+        "FORCE_MOCK_STREAM": "false",
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="agora-bench-"), "agora.db"),
+        "SSE_FLUSH_POLICY": args.flush_policy,
+        "BROADCAST_MAX_PENDING": str(args.max_pending),
+    })
+    agent = bench_agent()
+
+    rng = random.Random(0)
+    viewers = [
+        Viewer(i, rng.randint(2, 20) if rng.random() < args.reconnect else 0)
+        for i in range(args.subscribers)
+    ]
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+            agent_id = (await client.post("/agents", json=agent.model_dump(mode="json"))).json()["id"]
+            debate = (await client.post("/debates", json={
+                "topic": "Débat de diffusion", "agent1_id": agent_id, "agent2_id": agent_id,
+                "config": {"max_turns": args.turns, "opening_statement_required": False}
+            })).json()
+            url = f"/debates/{debate['id']}/events"
+
+            connected = asyncio.Event()
+            pending_viewers = [len(viewers)]
+
+            def on_connected():
+                pending_viewers[0] -= 1
+                if pending_viewers[0] == 0:
+                    connected.set()
+
+            for viewer in viewers:
+                viewer.on_connected = on_connected
+            start = time.perf_counter()
+            readers = [asyncio.create_task(v.read(client, url)) for v in viewers]
+            await asyncio.wait_for(connected.wait(), timeout=60)
+            connect_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            cpu_start = cpu_seconds(api.pid)
+            await client.post(f"/debates/{debate['id']}/run")
+            await asyncio.wait_for(asyncio.gather(*readers), timeout=args.timeout)
+            elapsed = time.perf_counter() - start
+            api_cpu = cpu_seconds(api.pid) - cpu_start
+
+            stats = (await client.get("/stats")).json()
+            messages = (await client.get(f"/debates/{debate['id']}")).json()["messages"]
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+        provider.stop()
+
+    # Intégrité: séquence d'identifiants sans trou ni doublon, texte identique aux messages
+    expected_text = "".join(m["content"] for m in messages)
+    complete = 0
+    for viewer in viewers:
+        seqs = [int(event_id.rsplit("-", 1)[1]) for event_id, _, _ in viewer.events]
+        text = "".join(t for _, kind, t in viewer.events if kind == "token")
+        if seqs == list(range(seqs[0], seqs[0] + len(seqs))) and text == expected_text:
+            complete += 1
+
+    # Écart de réception d'un même événement entre spectateurs (coût de la diffusion)
+    spreads = []
+    for event_id in viewers[0].received_at:
+        times = [v.received_at[event_id] for v in viewers if event_id in v.received_at]
+        spreads.append((max(times) - min(times)) * 1000)
+    spreads.sort()
+
+    reconnected = sum(1 for v in viewers if v.connections > 1)
+    broadcast = stats["broadcast"]
+    print(f"{len(viewers)} spectateurs connectés en {connect_time:.2f} s; débat de {len(messages)} messages joué en {elapsed:.2f} s")
+    print(f"Fournisseur: {provider.request_count} appels pour {len(messages)} messages (génération partagée)")
+    print(f"Spectateurs complets: {complete}/{len(viewers)} "
+          f"({reconnected} reconnectés, {sum(v.resyncs for v in viewers)} resync, {sum(v.lagged for v in viewers)} lagged)")
+    print(f"Écart de réception entre spectateurs: p50 {statistics.median(spreads):.1f} ms, "
+          f"p95 {spreads[int(len(spreads) * 0.95) - 1]:.1f} ms, max {spreads[-1]:.1f} ms ({len(spreads)} événements)")
+    print(f"API: {broadcast['events']} événements publiés, {broadcast['frames_delivered']} trames remises, "
+          f"{broadcast['resumed']} reprises, {broadcast['lagged']} détachés")
+    print(f"CPU de l'API pendant le débat: {api_cpu:.2f} s "
+          f"({api_cpu / broadcast['frames_delivered'] * 1e6:.0f} µs par trame remise)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=1000, help="Nombre de spectateurs")
+    parser.add_argument("--turns", type=int, default=2, help="Tours du débat (deux messages par tour)")
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens par réponse")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Délai entre deux tokens (s)")
+    parser.add_argument("--reconnect", type=float, default=0.1, help="Part des spectateurs qui se reconnectent")
+    parser.add_argument("--max-pending", type=int, default=256, help="File maximale par spectateur")
+    parser.add_argument("--flush-policy", default="coalesce", choices=["immediate", "coalesce"])
+    parser.add_argument("--timeout", type=float, default=300, help="Durée maximale du débat (s)")
+    asyncio.run(main(parser.parse_args()))
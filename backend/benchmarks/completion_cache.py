@@ -0,0 +1,103 @@
+"""Cache des réponses: débat déterministe (température 0) rejoué plusieurs fois.
+
+Joue `--replays` fois le même débat entre un agent OpenAI et un agent Anthropic à
+température 0, en streaming, contre le fournisseur factice, sans puis avec le cache des
+réponses (COMPLETION_CACHE). Rapporte pour chaque rejeu les appels au fournisseur, la
+durée des tours (premier segment et flux complet), puis le taux de succès et les tokens
+économisés rapportés par `GET /stats`.
+
+    python -m backend.benchmarks.completion_cache --turns 4 --replays 3 --tokens 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from backend.benchmarks.broadcast import start_api
+from backend.benchmarks.mock_provider import MockProviderServer
+from backend.benchmarks.provider_streams import bench_agent
+
+
+async def stream_turn(client: httpx.AsyncClient, debate_id: str) -> tuple:
+    """Un tour en streaming: (délai du premier segment, durée totale) en ms"""
+    start = time.perf_counter()
+    first = None
+    async with client.stream("POST", f"/debates/{debate_id}/next-turn/stream", params={"speculate": "false"}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:])
+            if first is None and event.get("type") == "token":
+                first = time.perf_counter() - start
+            if event.get("type") == "error":
+                raise RuntimeError(event)
+    return (first or 0) * 1000, (time.perf_counter() - start) * 1000
+
+
+async def play(provider: MockProviderServer, provider_url: str, args, completion_cache: bool):
+    data_dir = tempfile.mkdtemp(prefix="agora-bench-")
+    api, base_url = await start_api({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{provider_url}/v1",
+        "ANTHROPIC_API_KEY": "bench",
+        "ANTHROPIC_BASE_URL": provider_url,
+        "FORCE_MOCK_STREAM": "false",
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_DB_PATH": os.path.join(data_dir, "agora.db"),
+        "COMPLETION_CACHE": "true" if completion_cache else "false",
+        "COMPLETION_CACHE_DIR": os.path.join(data_dir, "completions"),
+    })
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            agent_ids = []
+            for provider_name in ("openai", "anthropic"):
+                agent = bench_agent(provider_name).model_copy(update={"temperature": 0})
+                agent_ids.append((await client.post("/agents", json=agent.model_dump(mode="json"))).json()["id"])
+            for replay in range(args.replays):
+                debate = (await client.post("/debates", json={
+                    "topic": "Débat de démonstration", "agent1_id": agent_ids[0], "agent2_id": agent_ids[1],
+                    "config": {"max_turns": args.turns, "opening_statement_required": False}
+                })).json()
+                requests_before = provider.request_count
+                firsts, totals = [], []
+                for _ in range(args.turns * 2):
+                    first, total = await stream_turn(client, debate["id"])
+                    firsts.append(first)
+                    totals.append(total)
+                print(f"  rejeu {replay + 1}: {provider.request_count - requests_before} appels au fournisseur, "
+                      f"premier segment p50 {statistics.median(firsts):.1f} ms, "
+                      f"tour p50 {statistics.median(totals):.1f} ms, débat {sum(totals):.0f} ms")
+            stats = (await client.get("/stats")).json()["completion_cache"]
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+    if stats:
+        print(f"  cache: taux de succès {stats['hit_ratio']:.0%} ({stats['memory_hits']} en mémoire, "
+              f"{stats['disk_hits']} sur disque, {stats['misses']} absents), {stats['tokens_saved']} tokens économisés")
+
+
+async def main(args):
+    provider = MockProviderServer(tokens=args.tokens, token_delay=args.token_delay)
+    provider_url = provider.start()
+    try:
+        for completion_cache in (False, True):
+            print(f"\nCache des réponses {'activé' if completion_cache else 'désactivé'} "
+                  f"(COMPLETION_CACHE={str(completion_cache).lower()})")
+            await play(provider, provider_url, args, completion_cache)
+    finally:
+        provider.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=4, help="Tours du débat (deux messages par tour)")
+    parser.add_argument("--replays", type=int, default=3, help="Rejeux du même débat")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens par réponse")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Délai entre deux tokens (s)")
+    asyncio.run(main(parser.parse_args()))
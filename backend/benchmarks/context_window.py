@@ -0,0 +1,84 @@
+"""Taille des prompts au fil d'un long débat, avec et sans budget d'historique.
+
+Construit un débat synthétique (message de contexte d'une source, puis N tours de
+deux interventions) et, à chaque intervention, l'historique transmis à l'agent: complet
+(comportement d'origine) ou borné par `ContextWindow`. Rapporte les tokens de
+l'historique aux tours clés, le total du débat, et le temps de construction (le résumé
+est mis à jour incrémentalement, sans recalcul).
+
+    python -m backend.benchmarks.context_window --turns 100 --budget 4000 --summary 800
+"""
+import argparse
+import random
+import time
+import uuid
+
+from backend.benchmarks.openai_stream import bench_agent
+from backend.models.debate import Debate, DebateConfig, DebateMessage, MessageRole
+from backend.services.context_window import ContextWindow
+
+WORDS = (
+    "argument économie société preuve croissance risque liberté données étude coût "
+    "bénéfice régulation innovation éthique emploi climat justice sécurité marché"
+).split()
+
+
+def sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+
+def message(debate_id: str, role: MessageRole, agent_id, turn: int, content: str) -> DebateMessage:
+    return DebateMessage(
+        id=str(uuid.uuid4()), debate_id=debate_id, role=role, agent_id=agent_id,
+        content=content, turn_number=turn
+    )
+
+
+def run(window: ContextWindow, turns: int, words: int, source_chars: int):
+    rng = random.Random(0)
+    agent1 = bench_agent()
+    agent2 = bench_agent().model_copy(update={"id": "bench-agent-2", "name": "Agent Benchmark 2"})
+    debate = Debate(
+        id=str(uuid.uuid4()), topic="Débat de benchmark", agent1_id=agent1.id, agent2_id=agent2.id,
+        config=DebateConfig(topic="Débat de benchmark", max_turns=turns)
+    )
+    source = " ".join(sentence(rng) for _ in range(source_chars // 100))[:source_chars]
+    debate.messages.append(message(debate.id, MessageRole.SYSTEM, None, 0, f"Contexte:\n\n{source}"))
+    speakers = {MessageRole.AGENT1.value: agent1.name, MessageRole.AGENT2.value: agent2.name}
+
+    sizes, elapsed = [], 0.0
+    for turn in range(turns):
+        for role, agent in ((MessageRole.AGENT1, agent1), (MessageRole.AGENT2, agent2)):
+            start = time.perf_counter()
+            history = window.build_history(debate, agent, speakers)
+            elapsed += time.perf_counter() - start
+            key = window.counter.key(agent.ai_provider, agent.model)
+            sizes.append(sum(window.counter.count(entry["content"], key) for entry in history))
+            content = " ".join(sentence(rng) for _ in range(words // 14))
+            debate.messages.append(message(debate.id, role, agent.id, turn, content))
+        debate.current_turn = turn + 1
+    return sizes, elapsed
+
+
+def main(args):
+    print(f"Débat de {args.turns} tours, interventions d'environ {args.words} mots, source de {args.source} caractères")
+    for label, budget in (("complet", 0), (f"budget {args.budget}", args.budget)):
+        window = ContextWindow(history_budget=budget, summary_budget=args.summary)
+        sizes, elapsed = run(window, args.turns, args.words, args.source)
+        checkpoints = [t for t in (1, 10, 25, 50, 100) if t <= args.turns]
+        at_turns = ", ".join(f"tour {t}: {sizes[2 * (t - 1)]}" for t in checkpoints)
+        print(f"Historique {label}: {at_turns} tokens; max {max(sizes)}, total du débat {sum(sizes)} tokens; "
+              f"construction {elapsed / len(sizes) * 1e6:.0f} µs par tour")
+        if budget:
+            stats = window.stats()
+            print(f"  {stats['messages_folded']} interventions résumées, {stats['rebuilds']} reconstructions")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=100, help="Tours du débat (deux interventions par tour)")
+    parser.add_argument("--words", type=int, default=250, help="Mots par intervention")
+    parser.add_argument("--source", type=int, default=8000, help="Caractères du message de contexte")
+    parser.add_argument("--budget", type=int, default=4000, help="Budget de l'historique (tokens)")
+    parser.add_argument("--summary", type=int, default=800, help="Budget du résumé (tokens)")
+    main(parser.parse_args())
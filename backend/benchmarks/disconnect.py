@@ -0,0 +1,102 @@
+"""Vérification de l'annulation du flux du fournisseur à la déconnexion du client SSE.
+
+Lance le fournisseur factice et l'API (`backend.main`, stockage SQLite temporaire) dans
+des threads, ouvre N flux `next-turn/stream`, lit quelques trames puis ferme la
+connexion, après un tour complet qui donne la longueur moyenne des réponses de l'agent.
+Compare les tokens réellement produits par le fournisseur au total qui aurait été
+généré sans annulation, et affiche les compteurs de `/stats`.
+
+    python -m backend.benchmarks.disconnect --debates 8 --tokens 200 --read-frames 3
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from backend.benchmarks.mock_provider import MockProviderServer, ThreadedServer
+from backend.benchmarks.openai_stream import bench_agent
+
+
+async def read_then_disconnect(client: httpx.AsyncClient, debate_id: str, frames: int):
+    async with client.stream("POST", f"/debates/{debate_id}/next-turn/stream") as response:
+        received = 0
+        async for line in response.aiter_lines():
+            if line.startswith("data: "):
+                received += 1
+                if received >= frames:
+                    break
+    # Sortie du bloc: la connexion est fermée sans lire la suite
+
+
+async def main(args):
+    provider = MockProviderServer(tokens=args.tokens, token_delay=args.token_delay)
+    provider_url = provider.start()
+    os.environ.update({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{provider_url}/v1",
+        "FORCE_MOCK_STREAM": "false",
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="agora-bench-"), "agora.db"),
+        "SSE_FLUSH_POLICY": args.flush_policy,
+        "PARTIAL_TURN_POLICY": args.partial_turn_policy,
+    })
+
+    # Import après configuration de l'environnement
+    import backend.main as api
+    agent = bench_agent()
+    api.agents_db[agent.id] = agent
+    server = ThreadedServer(api.app, name="agora-api")
+    base_url = server.start()
+
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            debate_ids = []
+            for i in range(args.debates):
+                response = await client.post("/debates", json={
+                    "topic": f"Débat de benchmark {i}", "agent1_id": agent.id, "agent2_id": agent.id
+                })
+                debate_ids.append(response.json()["id"])
+
+            # Tour complet de référence (longueur des réponses de l'agent)
+            warmup = (await client.post("/debates", json={
+                "topic": "Débat de référence", "agent1_id": agent.id, "agent2_id": agent.id
+            })).json()
+            (await client.post(f"/debates/{warmup['id']}/next-turn")).raise_for_status()
+            tokens_before = provider.app.state.tokens_streamed
+
+            start = time.perf_counter()
+            await asyncio.gather(*(read_then_disconnect(client, d, args.read_frames) for d in debate_ids))
+            elapsed = time.perf_counter() - start
+            # Laisser l'annulation se propager jusqu'au fournisseur
+            await asyncio.sleep(max(0.5, args.token_delay * 5))
+            stats = (await client.get("/stats")).json()
+            messages = [len((await client.get(f"/debates/{d}")).json()["messages"]) for d in debate_ids]
+    finally:
+        server.stop()
+        provider.stop()
+
+    state = provider.app.state
+    full = args.tokens * args.debates
+    print(f"{args.debates} flux de {args.tokens} tokens, déconnexion après {args.read_frames} trames ({elapsed:.2f} s)")
+    streamed = state.tokens_streamed - tokens_before
+    print(f"Fournisseur: {streamed}/{full} tokens produits ({full - streamed} évités), "
+          f"{state.streams_aborted} flux interrompus, {state.streams_completed} menés à terme")
+    print(f"API: {stats['sse']['client_disconnects']} déconnexions, "
+          f"~{stats['sse']['tokens_saved_estimate']} tokens économisés (estimation), "
+          f"budget max_tokens inutilisé {stats['sse']['tokens_budget_unused']} (majorant)")
+    print(f"Places fournisseur encore occupées: {sum(s['in_flight'] for s in stats['ai_limits'].values())}")
+    print(f"Messages enregistrés par débat ({args.partial_turn_policy}): {messages}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--debates", type=int, default=8, help="Nombre de flux ouverts")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens par réponse")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Délai entre deux tokens (s)")
+    parser.add_argument("--read-frames", type=int, default=3, help="Trames lues avant la déconnexion")
+    parser.add_argument("--flush-policy", default="immediate", choices=["immediate", "coalesce"])
+    parser.add_argument("--partial-turn-policy", default="discard", choices=["discard", "save"])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,300 @@
+"""Serveur HTTP local imitant l'API de streaming des fournisseurs d'IA.
+
+Utilisé par les benchmarks pour mesurer le comportement du backend sans appeler
+de vrai fournisseur: chaque réponse renvoie `tokens` segments espacés de `token_delay`
+secondes. Endpoints imités:
+
+- OpenAI: `POST /v1/chat/completions` (également utilisé pour Mistral, API compatible)
+- Anthropic: `POST /v1/messages`
+- Google Gemini: `POST /v1beta/models/{model}:generateContent` et `:streamGenerateContent?alt=sse`
+
+Chaque flux se termine par l'événement de consommation propre au fournisseur. Le cache
+de prompts est simulé: préfixes de messages déjà vus pour OpenAI (automatique), préfixes
+terminés par un bloc `cache_control` pour Anthropic.
+"""
+import asyncio
+import hashlib
+import json
+import socket
+import threading
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_app(tokens: int, token_delay: float) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+    # Flux menés à terme / interrompus par le client, tokens effectivement envoyés
+    app.state.streams_completed = 0
+    app.state.streams_aborted = 0
+    app.state.tokens_streamed = 0
+
+    async def tracked(events):
+        completed = False
+        try:
+            async for event in events:
+                yield event
+            completed = True
+        finally:
+            if completed:
+                app.state.streams_completed += 1
+            else:
+                app.state.streams_aborted += 1
+
+    def words():
+        return [f"mot{i} " for i in range(tokens)]
+
+    # Préfixes de prompts en cache (empreintes)
+    app.state.prompt_prefixes = set()
+
+    def prefixes(units: list) -> list:
+        """(empreinte du préfixe, mots cumulés) après chaque élément du prompt"""
+        digest = hashlib.blake2b(digest_size=16)
+        result, total = [], 0
+        for unit in units:
+            digest.update(json.dumps(unit, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+            total += count_words(unit)
+            result.append((digest.copy().hexdigest(), total))
+        return result
+
+    def openai_cached_tokens(messages: list) -> int:
+        """Mots du plus long préfixe de messages déjà vu (mise en cache automatique)"""
+        cached = 0
+        for key, total in prefixes(messages):
+            if key in app.state.prompt_prefixes:
+                cached = total
+            app.state.prompt_prefixes.add(key)
+        return cached
+
+    def anthropic_cache(body: dict) -> tuple:
+        """(mots lus, mots écrits) dans le cache: les préfixes terminés par un bloc
+        `cache_control` sont écrits; est lu le plus long préfixe en cache qui précède le
+        dernier de ces blocs (recherche en arrière d'Anthropic)"""
+        system = body.get("system", "")
+        blocks = [("system", b) for b in system] if isinstance(system, list) else [("system", {"text": system})]
+        for message in body.get("messages", []):
+            content = message["content"]
+            parts = content if isinstance(content, list) else [{"type": "text", "text": content}]
+            blocks.extend((message["role"], block) for block in parts)
+        units = [{"role": role, "text": block.get("text", "")} for role, block in blocks]
+        marks = [i for i, (_, block) in enumerate(blocks) if block.get("cache_control")]
+        if not marks:
+            return 0, 0
+        keys = prefixes(units)
+        read = max((total for key, total in keys[:marks[-1] + 1] if key in app.state.prompt_prefixes), default=0)
+        last_key, last_total = keys[marks[-1]]
+        written = 0 if last_key in app.state.prompt_prefixes else last_total - read
+        app.state.prompt_prefixes.update(keys[i][0] for i in marks)
+        return read, written
+
+    def count_words(value) -> int:
+        """Nombre de mots d'un contenu (texte ou structure de parts imbriquée)"""
+        if isinstance(value, str):
+            return len(value.split())
+        if isinstance(value, list):
+            return sum(count_words(item) for item in value)
+        if isinstance(value, dict):
+            return sum(count_words(item) for key, item in value.items() if key in ("text", "content", "parts"))
+        return 0
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        cached_tokens = openai_cached_tokens(body.get("messages", []))
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * tokens)
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(words())},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens, "completion_tokens": tokens, "total_tokens": prompt_tokens + tokens,
+                    "prompt_tokens_details": {"cached_tokens": cached_tokens}
+                }
+            })
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+        # Mistral joint la consommation au dernier segment sans qu'elle soit demandée
+        usage = {
+            "prompt_tokens": prompt_tokens, "completion_tokens": tokens, "total_tokens": prompt_tokens + tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}
+        }
+        usage_in_last_chunk = body["model"].startswith("mistral")
+
+        def chunk(delta: dict, finish_reason=None, usage=None, choices=True) -> str:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body["model"],
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if choices else [],
+            }
+            if usage is not None:
+                payload["usage"] = usage
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def stream():
+            yield chunk({"role": "assistant", "content": ""})
+            for word in words():
+                await asyncio.sleep(token_delay)
+                app.state.tokens_streamed += 1
+                yield chunk({"content": word})
+            yield chunk({}, finish_reason="stop", usage=usage if usage_in_last_chunk else None)
+            if include_usage:
+                yield chunk({}, usage=usage, choices=False)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(tracked(stream()), media_type="text/event-stream")
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        message_id = f"msg_{uuid.uuid4().hex}"
+        input_tokens = count_words(body.get("system", "")) + count_words(body.get("messages", []))
+        cache_read, cache_written = anthropic_cache(body)
+        input_usage = {
+            "input_tokens": input_tokens - cache_read - cache_written,
+            "cache_read_input_tokens": cache_read,
+            "cache_creation_input_tokens": cache_written,
+        }
+        message = {
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": body["model"],
+            "content": [],
+            "stop_reason": None,
+            "stop_sequence": None,
+            "usage": {**input_usage, "output_tokens": 1},
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * tokens)
+            message.update({
+                "content": [{"type": "text", "text": "".join(words())}],
+                "stop_reason": "end_turn",
+                "usage": {**input_usage, "output_tokens": tokens},
+            })
+            return JSONResponse(message)
+
+        def event(name: str, payload: dict) -> str:
+            return f"event: {name}\ndata: {json.dumps(payload)}\n\n"
+
+        async def stream():
+            yield event("message_start", {"type": "message_start", "message": message})
+            yield event("content_block_start", {
+                "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}
+            })
+            for word in words():
+                await asyncio.sleep(token_delay)
+                app.state.tokens_streamed += 1
+                yield event("content_block_delta", {
+                    "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": word}
+                })
+            yield event("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield event("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": tokens},
+            })
+            yield event("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(tracked(stream()), media_type="text/event-stream")
+
+    @app.post("/v1beta/models/{model_action}")
+    async def google_generate_content(model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        if action not in ("generateContent", "streamGenerateContent"):
+            raise HTTPException(status_code=404, detail=f"Action inconnue: {action}")
+        body = await request.json()
+        app.state.requests += 1
+        prompt_tokens = count_words(body.get("systemInstruction", {})) + count_words(body.get("contents", []))
+
+        def response(text: str, output_tokens: int, finish_reason=None) -> dict:
+            candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+            if finish_reason:
+                candidate["finishReason"] = finish_reason
+            return {
+                "candidates": [candidate],
+                "usageMetadata": {
+                    "promptTokenCount": prompt_tokens,
+                    "candidatesTokenCount": output_tokens,
+                    "totalTokenCount": prompt_tokens + output_tokens,
+                },
+                "modelVersion": model,
+            }
+
+        if action == "generateContent":
+            await asyncio.sleep(token_delay * tokens)
+            return JSONResponse(response("".join(words()), tokens, "STOP"))
+
+        async def stream():
+            all_words = words()
+            for i, word in enumerate(all_words, start=1):
+                await asyncio.sleep(token_delay)
+                app.state.tokens_streamed += 1
+                finish_reason = "STOP" if i == len(all_words) else None
+                yield f"data: {json.dumps(response(word, i, finish_reason))}\r\n\r\n"
+
+        return StreamingResponse(tracked(stream()), media_type="text/event-stream")
+
+    return app
+
+
+class ThreadedServer:
+    """Serveur uvicorn exécuté dans un thread dédié (sa propre boucle d'événements)"""
+
+    def __init__(self, app, name: str = "uvicorn"):
+        self.app = app
+        self.port = _free_port()
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app, host="127.0.0.1", port=self.port, log_level="warning", backlog=4096
+        ))
+        self._thread = threading.Thread(target=self._server.run, name=name, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> str:
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self.base_url
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+class MockProviderServer(ThreadedServer):
+    """Fournisseur factice servi dans un thread"""
+
+    def __init__(self, tokens: int = 50, token_delay: float = 0.01):
+        super().__init__(build_app(tokens, token_delay), name="mock-provider")
+
+    @property
+    def request_count(self) -> int:
+        return self.app.state.requests
@@ -0,0 +1,101 @@
+"""Benchmark du streaming OpenAI en fonction du nombre de débats simultanés.
+
+Lance un fournisseur factice local (voir `mock_provider`) puis ouvre N flux en parallèle
+sur un seul processus, avec le client asynchrone partagé d'`AIService` et, pour
+comparaison, avec l'ancien client synchrone itéré dans une coroutine.
+
+    python -m backend.benchmarks.openai_stream --tokens 50 --token-delay 0.01
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from backend.benchmarks.mock_provider import MockProviderServer
+from backend.models.agent import AgentConfig
+
+
+def bench_agent() -> AgentConfig:
+    return AgentConfig(
+        id="bench-agent",
+        name="Agent Benchmark",
+        ai_provider="openai",
+        model="gpt-bench",
+        description="Agent de benchmark",
+        debate_style="nuancé",
+        argumentation_strategy="logique",
+    )
+
+
+async def legacy_sync_stream(base_url: str, agent: AgentConfig, messages: list):
+    """Ancienne implémentation: client synchrone itéré dans une coroutine (bloque la boucle)"""
+    import openai
+    client = openai.OpenAI(api_key="bench", base_url=f"{base_url}/v1")
+    response = client.chat.completions.create(model=agent.model, messages=messages, stream=True)
+    for event in response:
+        if event.choices and event.choices[0].delta.content:
+            yield event.choices[0].delta.content
+
+
+async def run_streams(make_stream, concurrency: int) -> dict:
+    first_token_delays = []
+
+    async def one():
+        start = time.perf_counter()
+        tokens = 0
+        async for _ in make_stream():
+            if tokens == 0:
+                first_token_delays.append(time.perf_counter() - start)
+            tokens += 1
+        return tokens
+
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed": elapsed,
+        "tokens": sum(counts),
+        "tokens_per_sec": sum(counts) / elapsed,
+        "ttft_p50": statistics.median(first_token_delays),
+        "ttft_max": max(first_token_delays),
+    }
+
+
+async def main(args):
+    server = MockProviderServer(tokens=args.tokens, token_delay=args.token_delay)
+    base_url = server.start()
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+
+    # Import après configuration de l'environnement (le client est créé à l'initialisation)
+    from backend.services.ai_service import AIService
+    service = AIService()
+    agent = bench_agent()
+    messages = [{"role": "user", "content": "Présente ta position."}]
+
+    print(f"Fournisseur factice: {args.tokens} tokens, {args.token_delay * 1000:.0f} ms/token")
+    print(f"{'mode':<7} {'N':>4} {'durée (s)':>10} {'tokens/s':>10} {'TTFT p50':>9} {'TTFT max':>9}")
+    try:
+        for concurrency in args.concurrency:
+            modes = [("async", lambda: service._generate_openai_stream(agent, "Système", "Présente ta position.", []))]
+            if not args.skip_legacy:
+                modes.append(("sync", lambda: legacy_sync_stream(base_url, agent, messages)))
+            for mode, make_stream in modes:
+                result = await run_streams(make_stream, concurrency)
+                print(
+                    f"{mode:<7} {concurrency:>4} {result['elapsed']:>10.2f} {result['tokens_per_sec']:>10.0f} "
+                    f"{result['ttft_p50'] * 1000:>7.0f}ms {result['ttft_max'] * 1000:>7.0f}ms"
+                )
+    finally:
+        await service.aclose()
+        server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=50, help="Tokens par réponse")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Délai entre deux tokens (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64], help="Nombres de flux simultanés")
+    parser.add_argument("--skip-legacy", action="store_true", help="Ne pas mesurer l'ancien client synchrone")
+    asyncio.run(main(parser.parse_args()))
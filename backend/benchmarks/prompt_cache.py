@@ -0,0 +1,79 @@
+"""Stabilité du préfixe des prompts: tokens d'entrée servis depuis le cache du fournisseur.
+
+Joue un débat entre un agent OpenAI et un agent Anthropic contre le fournisseur factice
+(qui simule leur cache de prompts), avec et sans indications `cache_control`, et
+rapporte pour chaque tour les tokens d'entrée et la part lue depuis le cache, telles
+qu'enregistrées sur les messages.
+
+    python -m backend.benchmarks.prompt_cache --turns 6 --tokens 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+import httpx
+
+from backend.benchmarks.broadcast import start_api
+from backend.benchmarks.mock_provider import MockProviderServer
+from backend.benchmarks.provider_streams import bench_agent
+
+
+async def play(provider_url: str, args, prompt_cache: bool) -> list:
+    api, base_url = await start_api({
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{provider_url}/v1",
+        "ANTHROPIC_API_KEY": "bench",
+        "ANTHROPIC_BASE_URL": provider_url,
+        "FORCE_MOCK_STREAM": "false",
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="agora-bench-"), "agora.db"),
+        "PROMPT_CACHE": "true" if prompt_cache else "false",
+    })
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            agent_ids = []
+            for provider in ("openai", "anthropic"):
+                agent = bench_agent(provider)
+                agent_ids.append((await client.post("/agents", json=agent.model_dump(mode="json"))).json()["id"])
+            debate = (await client.post("/debates", json={
+                "topic": "Débat de cache de prompts", "agent1_id": agent_ids[0], "agent2_id": agent_ids[1],
+                "config": {"max_turns": args.turns, "opening_statement_required": False}
+            })).json()
+            for _ in range(args.turns * 2):
+                response = await client.post(f"/debates/{debate['id']}/next-turn")
+                response.raise_for_status()
+            messages = (await client.get(f"/debates/{debate['id']}")).json()["messages"]
+            stats = (await client.get("/stats")).json()["prompt_cache"]
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+    return messages, stats
+
+
+async def main(args):
+    for prompt_cache in (False, True):
+        provider = MockProviderServer(tokens=args.tokens, token_delay=args.token_delay)
+        provider_url = provider.start()
+        try:
+            messages, stats = await play(provider_url, args, prompt_cache)
+        finally:
+            provider.stop()
+        print(f"\nIndications de cache {'activées' if prompt_cache else 'désactivées'} (PROMPT_CACHE={str(prompt_cache).lower()})")
+        print(f"{'tour':>4} {'agent':<10} {'entrée':>7} {'en cache':>9} {'part':>6}")
+        for message in messages:
+            provider_name = "openai" if message["role"] == "agent1" else "anthropic"
+            total, cached = message["input_tokens"] or 0, message["cached_tokens"] or 0
+            print(f"{message['turn_number'] + 1:>4} {provider_name:<10} {total:>7} {cached:>9} "
+                  f"{(cached / total if total else 0):>6.0%}")
+        for name, entry in stats.items():
+            print(f"{name}: {entry['cached_tokens']}/{entry['input_tokens']} tokens d'entrée en cache "
+                  f"({entry['hit_ratio']:.0%}), {entry['cache_write_tokens']} écrits")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=6, help="Tours du débat (deux messages par tour)")
+    parser.add_argument("--tokens", type=int, default=200, help="Tokens par réponse")
+    parser.add_argument("--token-delay", type=float, default=0.001, help="Délai entre deux tokens (s)")
+    asyncio.run(main(parser.parse_args()))
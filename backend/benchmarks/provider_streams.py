@@ -0,0 +1,142 @@
+"""Vérification et benchmark des appels à chaque fournisseur (OpenAI, Anthropic, Google, Mistral).
+
+Lance le fournisseur factice local (voir `mock_provider`), dirige les clients
+d'`AIService` vers lui puis ouvre N flux en parallèle par fournisseur. Pour chaque
+fournisseur: délai du premier token, débit, et consommation de tokens rapportée par
+le dernier événement du flux. Le mode non-streaming (`generate_response`) est ensuite
+mesuré avec la même concurrence.
+
+    python -m backend.benchmarks.provider_streams --tokens 50 --token-delay 0.01 --concurrency 1 16
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from backend.benchmarks.mock_provider import MockProviderServer
+from backend.models.agent import AgentConfig
+
+PROVIDERS = {
+    "openai": "gpt-bench",
+    "anthropic": "claude-bench",
+    "google": "gemini-bench",
+    "mistral": "mistral-bench",
+}
+
+
+def bench_agent(provider: str) -> AgentConfig:
+    return AgentConfig(
+        id=f"bench-{provider}",
+        name=f"Agent Benchmark {provider}",
+        ai_provider=provider,
+        model=PROVIDERS[provider],
+        description="Agent de benchmark",
+        debate_style="nuancé",
+        argumentation_strategy="logique",
+    )
+
+
+async def run_streams(service, agent: AgentConfig, concurrency: int) -> dict:
+    first_token_delays = []
+    usages = []
+    history = [
+        {"role": "assistant", "content": "Ma position initiale."},
+        {"role": "user", "content": "La réponse de l'adversaire."},
+    ]
+
+    async def one():
+        usage = {}
+        start = time.perf_counter()
+        chunks = 0
+        async for _ in service.generate_response_stream(
+            agent, "Système", "Réponds à ton adversaire.", history, usage=usage
+        ):
+            if chunks == 0:
+                first_token_delays.append(time.perf_counter() - start)
+            chunks += 1
+        usages.append(usage)
+        return chunks
+
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed": elapsed,
+        "chunks_per_sec": sum(counts) / elapsed,
+        "ttft_p50": statistics.median(first_token_delays),
+        "ttft_max": max(first_token_delays),
+        "input_tokens": usages[0].get("input_tokens"),
+        "output_tokens": usages[0].get("output_tokens"),
+    }
+
+
+async def run_responses(service, agent: AgentConfig, concurrency: int) -> dict:
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(
+        service.generate_response(agent, "Système", "Réponds à ton adversaire.", [])
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed": elapsed,
+        "input_tokens": responses[0]["input_tokens"],
+        "output_tokens": responses[0]["output_tokens"],
+        "tokens_used": responses[0]["tokens_used"],
+    }
+
+
+async def main(args):
+    server = MockProviderServer(tokens=args.tokens, token_delay=args.token_delay)
+    base_url = server.start()
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+    os.environ["ANTHROPIC_API_KEY"] = "bench"
+    os.environ["ANTHROPIC_BASE_URL"] = base_url
+    os.environ["GOOGLE_API_KEY"] = "bench"
+    os.environ["GOOGLE_API_BASE_URL"] = base_url
+    os.environ["MISTRAL_API_KEY"] = "bench"
+    os.environ["MISTRAL_BASE_URL"] = f"{base_url}/v1"
+    os.environ["FORCE_MOCK_STREAM"] = "false"
+
+    # Import après configuration de l'environnement (les clients sont créés à l'initialisation)
+    from backend.services.ai_service import AIService
+    service = AIService()
+
+    print(f"Fournisseur factice: {args.tokens} tokens, {args.token_delay * 1000:.0f} ms/token")
+    print(
+        f"{'fournisseur':<11} {'N':>4} {'durée (s)':>10} {'chunks/s':>9} "
+        f"{'TTFT p50':>9} {'TTFT max':>9} {'in':>5} {'out':>5}"
+    )
+    try:
+        for provider in args.providers:
+            agent = bench_agent(provider)
+            for concurrency in args.concurrency:
+                result = await run_streams(service, agent, concurrency)
+                print(
+                    f"{provider:<11} {concurrency:>4} {result['elapsed']:>10.2f} {result['chunks_per_sec']:>9.0f} "
+                    f"{result['ttft_p50'] * 1000:>7.0f}ms {result['ttft_max'] * 1000:>7.0f}ms "
+                    f"{result['input_tokens']!s:>5} {result['output_tokens']!s:>5}"
+                )
+
+        print(f"\nSans streaming: {'fournisseur':<11} {'N':>4} {'durée (s)':>10} {'in':>5} {'out':>5} {'total':>6}")
+        for provider in args.providers:
+            agent = bench_agent(provider)
+            for concurrency in args.concurrency:
+                result = await run_responses(service, agent, concurrency)
+                print(
+                    f"{'':<16}{provider:<11} {concurrency:>4} {result['elapsed']:>10.2f} "
+                    f"{result['input_tokens']:>5} {result['output_tokens']:>5} {result['tokens_used']:>6}"
+                )
+    finally:
+        await service.aclose()
+        server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=50, help="Tokens par réponse")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="Délai entre deux tokens (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16], help="Nombres de flux simultanés")
+    parser.add_argument("--providers", nargs="+", choices=list(PROVIDERS), default=list(PROVIDERS))
+    asyncio.run(main(parser.parse_args()))
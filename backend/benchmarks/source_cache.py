@@ -0,0 +1,93 @@
+"""Cache des sources: coût de `/start` pour des débats partageant la même source.
+
+Sert un PDF généré de N pages (serveur HTTP local avec `Last-Modified`, réponses 304
+aux requêtes conditionnelles) et démarre `--debates` débats qui le citent, sans puis
+avec le cache des sources (SOURCE_CACHE). Rapporte la durée des démarrages, les octets
+téléchargés, les extractions et la taille de la base SQLite (texte dupliqué dans chaque
+débat, ou référencé par son empreinte).
+
+    python -m backend.benchmarks.source_cache --pages 200 --debates 10
+"""
+import argparse
+import asyncio
+import functools
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from backend.benchmarks.broadcast import start_api
+from backend.benchmarks.source_index import make_pdf
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+async def play(url: str, args, source_cache: bool):
+    data_dir = tempfile.mkdtemp(prefix="agora-bench-")
+    db_path = os.path.join(data_dir, "agora.db")
+    api, base_url = await start_api({
+        "FORCE_MOCK_STREAM": "true",
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_DB_PATH": db_path,
+        "PERSIST_FLUSH_INTERVAL": "0.1",
+        "SOURCE_CACHE": "true" if source_cache else "false",
+        "SOURCE_CACHE_DIR": os.path.join(data_dir, "sources"),
+        "SOURCE_MAX_BYTES": str(64 * 1024 * 1024),
+    })
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            agent_ids = [agent["id"] for agent in (await client.get("/agents")).json()][:2]
+            durations = []
+            for _ in range(args.debates):
+                debate = (await client.post("/debates", json={
+                    "topic": "Faut-il relancer le nucléaire ?", "agent1_id": agent_ids[0], "agent2_id": agent_ids[1],
+                    "config": {"source_url": url}
+                })).json()
+                start = time.perf_counter()
+                response = await client.post(f"/debates/{debate['id']}/start")
+                durations.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+            await asyncio.sleep(0.5)
+            stats = (await client.get("/stats")).json()
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+    fetcher = stats["source_fetcher"]
+    print(f"  /start: premier {durations[0]:.0f} ms, suivants p50 {statistics.median(durations[1:]):.0f} ms")
+    print(f"  {fetcher['fetches']} requêtes ({fetcher['not_modified']} réponses 304), {fetcher['bytes'] / 1e6:.1f} Mo téléchargés, "
+          f"{stats['source_index']['builds']} indexations; base SQLite {os.path.getsize(db_path) / 1e6:.1f} Mo")
+    if stats["source_cache"]:
+        cache = stats["source_cache"]
+        print(f"  cache: {cache['parses']} extraction(s), {cache['not_modified']} revalidations sans extraction, "
+              f"{(cache['disk_bytes'] or 0) / 1e6:.1f} Mo de texte")
+
+
+async def main(args):
+    directory = tempfile.mkdtemp(prefix="agora-source-")
+    with open(os.path.join(directory, "source.pdf"), "wb") as f:
+        f.write(make_pdf(args.pages, random.Random(0)))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/source.pdf"
+    print(f"PDF de {args.pages} pages, {args.debates} débats")
+    try:
+        for source_cache in (False, True):
+            print(f"\nCache des sources {'activé' if source_cache else 'désactivé'} (SOURCE_CACHE={str(source_cache).lower()})")
+            await play(url, args, source_cache)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="Pages du PDF servi")
+    parser.add_argument("--debates", type=int, default=10, help="Débats démarrés avec cette source")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,105 @@
+"""Téléchargement des sources: réactivité de la boucle d'événements.
+
+Sert un PDF généré de N pages depuis un serveur HTTP local (débit limité par
+`--rate`), puis le télécharge et l'extrait `--concurrency` fois en parallèle, d'abord
+comme avant (lecture bloquante par blocs de 1 Ko et extraction dans le gestionnaire
+asynchrone), puis avec `SourceFetcher`. Une tâche témoin mesure pendant ce temps le
+retard de la boucle d'événements (ce que subissent les autres requêtes du serveur).
+
+    python -m backend.benchmarks.source_fetch --pages 200 --concurrency 4
+"""
+import argparse
+import asyncio
+import io
+import random
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from backend.benchmarks.source_index import make_pdf
+from backend.services.source_fetcher import SourceFetcher, extract_text
+
+
+def serve(body: bytes, rate: float) -> ThreadingHTTPServer:
+    """Serveur HTTP local servant `body` à `rate` octets/s (0: sans limite)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/pdf")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            block = 64 * 1024
+            for offset in range(0, len(body), block):
+                self.wfile.write(body[offset:offset + block])
+                if rate:
+                    time.sleep(block / rate)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def blocking_fetch(url: str) -> str:
+    """Comportement d'origine: lecture bloquante par blocs de 1 Ko, extraction sur place"""
+    collected = io.BytesIO()
+    with urllib.request.urlopen(url, timeout=10) as resp:
+        while chunk := resp.read(1024):
+            collected.write(chunk)
+        content_type = resp.headers.get("Content-Type")
+    return extract_text(collected.getvalue(), content_type, url)
+
+
+async def measure(label: str, fetch, url: str, concurrency: int):
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    watcher = asyncio.create_task(ticker())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    texts = await asyncio.gather(*(fetch(url) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await watcher
+    lags.sort()
+    print(f"{label}: {elapsed:.2f} s pour {concurrency} sources ({len(texts[0] or '') / 1e6:.2f} M caractères chacune); "
+          f"retard de la boucle p50 {lags[len(lags) // 2] * 1000:.1f} ms, max {lags[-1] * 1000:.0f} ms")
+
+
+async def main(args):
+    body = make_pdf(args.pages, random.Random(0))
+    server = serve(body, args.rate)
+    url = f"http://127.0.0.1:{server.server_port}/source.pdf"
+    print(f"PDF de {args.pages} pages ({len(body) / 1e6:.1f} Mo), débit {args.rate / 1e6 if args.rate else 0:.1f} Mo/s")
+
+    async def blocking(source_url):
+        return blocking_fetch(source_url)
+
+    fetcher = SourceFetcher(max_bytes=len(body) + 1, parse_workers=args.workers)
+    # Démarrage des processus d'extraction hors mesure
+    await fetcher.fetch_text(url)
+    try:
+        await measure("bloquant (urllib, extraction sur la boucle)", blocking, url, args.concurrency)
+        await measure("SourceFetcher (httpx, pool de processus)", fetcher.fetch_text, url, args.concurrency)
+    finally:
+        await fetcher.aclose()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="Pages du PDF servi")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sources téléchargées en parallèle")
+    parser.add_argument("--rate", type=float, default=4e6, help="Débit du serveur (octets/s, 0: sans limite)")
+    parser.add_argument("--workers", type=int, default=2, help="Processus d'extraction")
+    asyncio.run(main(parser.parse_args()))
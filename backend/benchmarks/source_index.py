@@ -0,0 +1,136 @@
+"""Indexation des sources: construction de l'index BM25 et latence des requêtes.
+
+Génère un PDF de N pages (ou lit `--pdf`), en extrait le texte avec PyPDF2 comme
+`extract_text` (`SourceFetcher.parse`), puis mesure le découpage et l'indexation du texte et la latence
+d'une requête (sujet + dernière intervention) avec la sélection des passages dans le
+budget de tokens.
+
+    python -m backend.benchmarks.source_index --pages 50 200 --queries 200
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import random
+import statistics
+import time
+
+from PyPDF2 import PdfReader
+
+from backend.benchmarks.openai_stream import bench_agent
+from backend.models.debate import Debate, DebateConfig
+from backend.services.context_window import ContextWindow
+from backend.services.source_index import SourceRetriever
+
+WORDS = (
+    "énergie nucléaire réacteur sûreté déchets climat émissions carbone électricité réseau "
+    "renouvelable éolien solaire stockage coût investissement régulation autorité contrôle "
+    "population risque accident santé emploi industrie souveraineté importation uranium "
+    "démantèlement centrale production consommation hiver prix marché politique"
+).split()
+
+
+SYLLABLES = "ba be bi bo bu ca ce ci co da de di do fa fe fi la le li lo ma me mi mo na ne ni no pa pe pi po ra re ri ro sa se si so ta te ti to va ve vi".split()
+
+
+def vocabulary(rng: random.Random, size: int = 20000) -> list:
+    """Vocabulaire synthétique: mots du thème puis mots rares (fréquences selon une loi de Zipf)"""
+    words = list(WORDS)
+    while len(words) < size:
+        words.append("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return words
+
+
+def sentence(rng: random.Random, words: list = WORDS, weights: list = None) -> str:
+    chosen = rng.choices(words, cum_weights=weights, k=rng.randint(6, 16))
+    return " ".join(chosen).capitalize() + "."
+
+
+def make_pdf(pages: int, rng: random.Random, lines_per_page: int = 45) -> bytes:
+    """PDF minimal (police standard Helvetica, texte en WinAnsi) de `pages` pages de texte"""
+    words = vocabulary(rng)
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(words) + 1)))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"]
+    kids = []
+    for _ in range(pages):
+        lines = []
+        for _ in range(lines_per_page):
+            text = sentence(rng, words, weights).encode("cp1252", errors="replace")
+            text = text.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+            lines.append(b"(" + text + b") Tj T*")
+        stream = b"BT /F1 9 Tf 11 TL 40 800 Td " + b" ".join(lines) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content)
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % pages
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def extract(raw: bytes) -> str:
+    return "\n".join(page.extract_text() or "" for page in PdfReader(io.BytesIO(raw)).pages)
+
+
+def bench(label: str, raw: bytes, args, rng: random.Random):
+    start = time.perf_counter()
+    text = extract(raw)
+    extraction = time.perf_counter() - start
+
+    retriever = SourceRetriever(top_k=args.top_k, budget=args.budget, chunk_chars=args.chunk_chars)
+    start = time.perf_counter()
+    index = asyncio.run(retriever.build("bench", text))
+    build = time.perf_counter() - start
+
+    agent = bench_agent()
+    window = ContextWindow()
+    debate = Debate(id="bench", topic="Faut-il relancer le nucléaire ?", agent1_id=agent.id, agent2_id=agent.id,
+                    config=DebateConfig(topic="Faut-il relancer le nucléaire ?"), source_text=text)
+    latencies, sizes = [], []
+    for _ in range(args.queries):
+        opponent = " ".join(sentence(rng) for _ in range(12))
+        start = time.perf_counter()
+        context = retriever.context(debate, f"{debate.topic} {opponent}", lambda t: window.count(agent, t))
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.append(window.count(agent, context))
+    latencies.sort()
+
+    print(f"{label}: {len(raw) / 1e6:.1f} Mo, {len(text) / 1e6:.2f} M caractères, {len(index.chunks)} passages, "
+          f"{len(index.postings)} termes")
+    print(f"  extraction PyPDF2 {extraction:.2f} s, indexation {build * 1000:.0f} ms")
+    print(f"  requête: p50 {statistics.median(latencies):.2f} ms, p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms; "
+          f"contexte injecté {statistics.mean(sizes):.0f} tokens en moyenne (max {max(sizes)}, budget {args.budget})")
+
+
+def main(args):
+    rng = random.Random(0)
+    if args.pdf:
+        with open(args.pdf, "rb") as f:
+            bench(args.pdf, f.read(), args, rng)
+        return
+    for pages in args.pages:
+        bench(f"PDF de {pages} pages", make_pdf(pages, rng), args, rng)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200], help="Pages des PDF générés")
+    parser.add_argument("--pdf", help="PDF à indexer (au lieu des PDF générés)")
+    parser.add_argument("--queries", type=int, default=200, help="Requêtes mesurées")
+    parser.add_argument("--top-k", type=int, default=4, help="Passages par requête")
+    parser.add_argument("--budget", type=int, default=1500, help="Budget du contexte injecté (tokens)")
+    parser.add_argument("--chunk-chars", type=int, default=1000, help="Taille des passages (caractères)")
+    main(parser.parse_args())
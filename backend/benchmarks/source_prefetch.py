@@ -0,0 +1,77 @@
+"""Récupération anticipée des sources: attente au démarrage d'un débat.
+
+Sert un PDF généré de N pages depuis un serveur HTTP local (débit limité par `--rate`),
+puis pour chaque débat: création avec une URL distincte (pas de cache), délai de
+préparation de l'utilisateur (`--think`), et `/start`. Compare la durée de `/start` sans
+puis avec la récupération dès la création (SOURCE_PREFETCH).
+
+    python -m backend.benchmarks.source_prefetch --pages 200 --debates 5 --think 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import httpx
+
+from backend.benchmarks.broadcast import start_api
+from backend.benchmarks.source_fetch import serve
+from backend.benchmarks.source_index import make_pdf
+
+
+async def play(url: str, args, prefetch: bool):
+    data_dir = tempfile.mkdtemp(prefix="agora-bench-")
+    api, base_url = await start_api({
+        "FORCE_MOCK_STREAM": "true",
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_DB_PATH": os.path.join(data_dir, "agora.db"),
+        "SOURCE_CACHE_DIR": os.path.join(data_dir, "sources"),
+        "SOURCE_MAX_BYTES": str(64 * 1024 * 1024),
+        "SOURCE_PREFETCH": "true" if prefetch else "false",
+    })
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            agent_ids = [agent["id"] for agent in (await client.get("/agents")).json()][:2]
+            durations = []
+            for n in range(args.debates):
+                debate = (await client.post("/debates", json={
+                    "topic": "Faut-il relancer le nucléaire ?", "agent1_id": agent_ids[0], "agent2_id": agent_ids[1],
+                    "config": {"source_url": f"{url}?debate={prefetch}-{n}"}
+                })).json()
+                await asyncio.sleep(args.think)
+                start = time.perf_counter()
+                response = await client.post(f"/debates/{debate['id']}/start")
+                durations.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+                assert response.json()["debate"]["source_status"] == "ready"
+            stats = (await client.get("/stats")).json()["source_prefetch"]
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+    print(f"  /start p50 {statistics.median(durations):.0f} ms, max {max(durations):.0f} ms; "
+          f"source prête au démarrage {stats['ready_at_start']}, attendue {stats['awaited']}, à froid {stats['cold']}")
+
+
+async def main(args):
+    body = make_pdf(args.pages, random.Random(0))
+    server = serve(body, args.rate)
+    url = f"http://127.0.0.1:{server.server_port}/source.pdf"
+    print(f"PDF de {args.pages} pages ({len(body) / 1e6:.1f} Mo), {args.debates} débats, préparation {args.think} s")
+    try:
+        for prefetch in (False, True):
+            print(f"\nRécupération anticipée {'activée' if prefetch else 'désactivée'} (SOURCE_PREFETCH={str(prefetch).lower()})")
+            await play(url, args, prefetch)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200, help="Pages du PDF servi")
+    parser.add_argument("--debates", type=int, default=5, help="Débats créés puis démarrés")
+    parser.add_argument("--think", type=float, default=2.0, help="Délai entre création et démarrage (s)")
+    parser.add_argument("--rate", type=float, default=2e6, help="Débit du serveur (octets/s, 0: sans limite)")
+    asyncio.run(main(parser.parse_args()))
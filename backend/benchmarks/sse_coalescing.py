@@ -0,0 +1,94 @@
+"""Benchmark du regroupement des segments en trames SSE.
+
+Reproduit la boucle de `next_turn_stream` (flux OpenAI du fournisseur factice,
+regroupement par `coalesce`, framing pré-encodé) pour plusieurs politiques de flush et
+rapporte trames/s, octets/trame et segments/trame, ainsi que le coût de l'ancien
+framing (`json.dumps` d'un dictionnaire par segment).
+
+    python -m backend.benchmarks.sse_coalescing --tokens 400 --token-delay 0.002 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from backend.benchmarks.mock_provider import MockProviderServer
+from backend.benchmarks.openai_stream import bench_agent
+from backend.services.sse import FlushPolicy, SSEStats, coalesce, sse_token
+
+
+def legacy_frame(text: str) -> bytes:
+    """Framing historique: dictionnaire sérialisé puis chaîne f-string encodée par le serveur"""
+    payload = {"type": "token", "text": text}
+    return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+
+
+async def run_policy(service, agent, policy: FlushPolicy, concurrency: int) -> dict:
+    stats = SSEStats()
+
+    async def one():
+        stream = service._generate_openai_stream(agent, "Système", "Présente ta position.", [])
+        async for batch in coalesce(stream, policy):
+            stats.record(sse_token("".join(batch)), len(batch))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    result = stats.to_dict()
+    result.update(elapsed=elapsed, frames_per_sec=stats.frames / elapsed)
+    return result
+
+
+def framing_cost(samples: int = 200_000) -> dict:
+    text = "mot42 "
+    start = time.perf_counter()
+    for _ in range(samples):
+        legacy_frame(text)
+    legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(samples):
+        sse_token(text)
+    encoded = time.perf_counter() - start
+    return {"legacy_us": legacy / samples * 1e6, "encoded_us": encoded / samples * 1e6}
+
+
+async def main(args):
+    server = MockProviderServer(tokens=args.tokens, token_delay=args.token_delay)
+    base_url = server.start()
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/v1"
+
+    from backend.services.ai_service import AIService
+    service = AIService()
+    agent = bench_agent()
+
+    policies = [FlushPolicy("immediate")] + [
+        FlushPolicy("coalesce", max_bytes=max_bytes, max_latency=args.max_latency_ms / 1000)
+        for max_bytes in args.max_bytes
+    ]
+    print(f"Fournisseur factice: {args.tokens} tokens, {args.token_delay * 1000:.1f} ms/token, {args.concurrency} flux")
+    print(f"{'politique':<56} {'durée (s)':>9} {'trames':>7} {'trames/s':>9} {'o/trame':>8} {'seg/trame':>9}")
+    try:
+        for policy in policies:
+            r = await run_policy(service, agent, policy, args.concurrency)
+            print(
+                f"{policy!r:<56} {r['elapsed']:>9.2f} {r['frames']:>7} {r['frames_per_sec']:>9.0f} "
+                f"{r['bytes_per_frame']:>8} {r['chunks_per_frame']:>9}"
+            )
+    finally:
+        await service.aclose()
+        server.stop()
+
+    cost = framing_cost()
+    print(f"Framing d'une trame: json.dumps(dict) {cost['legacy_us']:.2f} µs, pré-encodé {cost['encoded_us']:.2f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=400, help="Tokens par réponse")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Délai entre deux tokens (s)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Nombre de flux simultanés")
+    parser.add_argument("--max-bytes", type=int, nargs="+", default=[64, 256, 1024], help="Tailles de tampon à comparer")
+    parser.add_argument("--max-latency-ms", type=float, default=50, help="Latence maximale avant flush (ms)")
+    asyncio.run(main(parser.parse_args()))
@@ -1,17 +1,42 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from backend.models.agent import AgentConfig
-from backend.models.debate import Debate, DebateConfig, DebateMessage, MessageRole, DebateStatus, DebateCreateRequest
-from typing import List
+from backend.models.debate import Debate, DebateConfig, DebateMessage, MessageRole, DebateStatus, DebateCreateRequest, SourceStatus
+from backend.models.tournament import Tournament, TournamentCreateRequest, TournamentMatch
+from typing import List, Optional, Set
 import uvicorn
 import json
+import math
+import asyncio
 from pathlib import Path
 from datetime import datetime
 from backend.services.ai_service import AIService
+from backend.services.rate_limiter import AdmissionRejected
+from backend.services.deadline import TRUNCATION_MARKER, TurnDeadline, TurnTimingStats
+from backend.services.debate_runner import DebateRunner
+from backend.services.single_flight import TurnAborted, TurnConflict, TurnFlight, TurnFlights
+from backend.services.broadcast import DebateBroadcaster
+from backend.services.speculation import Speculator, transcript_version
+from backend.services.tournament import TournamentRunner, TournamentStore, build_matches
 from backend.services.prompt_builder import PromptBuilder
-from backend.services.source_fetcher import fetch_source_text,topic_related_to_text
-from contextlib import asynccontextmanager
+from backend.services.context_window import ContextWindow
+from backend.services.source_index import SourceRetriever
+from backend.services.source_cache import SourceCache
+from backend.services.source_fetcher import SourceFetcher, topic_related_to_text
+from backend.services.source_prefetch import SourcePrefetcher
+from backend.services.debate_journal import DebateJournal
+from backend.services.debate_view import debate_delta, debate_etag, etag_matches, parse_fields
+from backend.services.storage import DebateStore, JsonStore, paginate
+from backend.services.sqlite_store import SQLiteStore
+from backend.services.debate_cache import DebateCache
+from backend.services.persistence import PersistenceWorker
+from backend.services.sse import (
+    ClientDisconnected, FlushPolicy, SSEStats, coalesce, multiplex, sse_event, sse_token, until_disconnected,
+    watch_disconnect
+)
+from contextlib import aclosing, asynccontextmanager, contextmanager
+import os
 
 
 
@@ -23,9 +48,29 @@ async def lifespan(app: FastAPI):
     load_agents()
     load_debates()
     print(f"📊 Statut: {len(agents_db)} agents, {len(debates_db)} débats")
+    await persistence_worker.start()
+    await broadcaster.start()
+    # Récupérations de sources interrompues par l'arrêt précédent
+    for debate in debates_db.values():
+        if debate.status == DebateStatus.PENDING and debate.source_status == SourceStatus.PENDING:
+            source_prefetcher.start(debate)
+    resumable = tournament_runner.load()
+    if resumable and TOURNAMENT_AUTORESUME:
+        for tournament in resumable:
+            tournament_runner.start(tournament)
     yield
-    # Shutdown (si nécessaire)
+    # Shutdown: vider les écritures différées (SIGTERM Cloud Run)
     print("👋 Arrêt de l'application...")
+    await debate_runner.shutdown()
+    await tournament_runner.shutdown()
+    await speculator.shutdown()
+    await source_prefetcher.shutdown()
+    await turn_flights.shutdown()
+    await broadcaster.shutdown()
+    await persistence_worker.stop()
+    store.close()
+    await ai_service.aclose()
+    await source_fetcher.aclose()
 
 
 app = FastAPI(
@@ -50,9 +95,9 @@ async def bypass_auth(request, call_next):
     response = await call_next(request)
     return response
 
-# Stockage temporaire en mémoire (à remplacer par une base de données)
+# Stockage en mémoire: agents, cache borné des débats actifs, débats préconfigurés
 agents_db = {}
-debates_db = {}
+debates_db = DebateCache(max_size=int(os.getenv("DEBATE_CACHE_SIZE", "256")))
 debates_config_db = {}
 
 # Chemins des fichiers de données
@@ -60,6 +105,21 @@ DATA_DIR = Path(__file__).parent / "data"
 AGENTS_FILE = DATA_DIR / "agents.json"
 DEBATES_FILE = DATA_DIR / "debates.json"
 ACTIVE_DEBATES_FILE = DATA_DIR / "active_debates.json"
+ARCHIVE_DIR = DATA_DIR / "archive"
+DEBATES_JOURNAL_FILE = DATA_DIR / "active_debates.journal"
+TOURNAMENTS_DIR = DATA_DIR / "tournaments"
+
+# Reprise au démarrage des tournois interrompus (arrêt, crash)
+TOURNAMENT_AUTORESUME = os.getenv("TOURNAMENT_AUTORESUME", "true").lower() in ("1", "true", "yes")
+
+# Backend de stockage des agents et débats actifs: "json" (fichiers) ou "sqlite"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+SQLITE_DB_FILE = Path(os.getenv("SQLITE_DB_PATH", str(DATA_DIR / "agora.db")))
+
+# Mode de persistance des débats actifs (backend "json"):
+# - "snapshot": réécrit active_debates.json à chaque modification (comportement historique)
+# - "journal": ajoute un enregistrement par message/changement de statut, compacté en arrière-plan
+DEBATE_PERSISTENCE = os.getenv("DEBATE_PERSISTENCE", "snapshot").lower()
 
 # Créer le dossier data s'il n'existe pas
 DATA_DIR.mkdir(exist_ok=True)
@@ -68,38 +128,139 @@ DATA_DIR.mkdir(exist_ok=True)
 ai_service = AIService()
 prompt_builder = PromptBuilder()
 
+# Historique transmis à chaque tour: derniers messages dans un budget de tokens, les
+# plus anciens repliés dans un résumé (0: historique complet)
+context_window = ContextWindow(
+    history_budget=int(os.getenv("CONTEXT_HISTORY_TOKENS", "4000")),
+    summary_budget=int(os.getenv("CONTEXT_SUMMARY_TOKENS", "800")),
+    max_debates=int(os.getenv("DEBATE_CACHE_SIZE", "256"))
+)
 
-def load_agents():
-    """Charger les agents depuis le fichier JSON"""
-    if AGENTS_FILE.exists():
-        try:
-            with open(AGENTS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for agent_data in data.get('agents', []):
-                    agent = AgentConfig(**agent_data)
-                    agents_db[agent.id] = agent
-            print(f"✅ {len(agents_db)} agents chargés depuis {AGENTS_FILE}")
-        except Exception as e:
-            print(f"⚠️ Erreur lors du chargement des agents: {e}")
-    else:
-        print(f"ℹ️ Aucun fichier d'agents trouvé à {AGENTS_FILE}")
+# Passages de la source transmis à chaque tour (index BM25 construit au démarrage du débat)
+source_retriever = SourceRetriever(
+    top_k=int(os.getenv("SOURCE_TOP_K", "4")),
+    budget=int(os.getenv("SOURCE_CONTEXT_TOKENS", "1500")),
+    chunk_chars=int(os.getenv("SOURCE_CHUNK_CHARS", "1000")),
+    max_indexes=int(os.getenv("DEBATE_CACHE_SIZE", "256"))
+)
 
+# Téléchargement asynchrone des sources (pool de connexions, extraction dans des processus)
+source_fetcher = SourceFetcher.from_env()
+
+# Textes des sources partagés entre les débats et revalidés par requête conditionnelle;
+# les textes des débats en mémoire ne sont jamais évincés
+source_cache = SourceCache.from_env(
+    source_fetcher,
+    DATA_DIR / "sources",
+    pinned=lambda: {debate.source_hash for debate in debates_db.values() if debate.source_hash}
+) if os.getenv("SOURCE_CACHE", "true").lower() in ("1", "true", "yes") else None
+
+# Regroupement des segments en trames SSE (par déploiement): "coalesce" ou "immediate"
+sse_flush_policy = FlushPolicy(
+    mode=os.getenv("SSE_FLUSH_POLICY", "coalesce").lower(),
+    max_bytes=int(os.getenv("SSE_FLUSH_MAX_BYTES", "256")),
+    max_latency=float(os.getenv("SSE_FLUSH_MAX_LATENCY_MS", "50")) / 1000
+)
+sse_stats = SSEStats()
 
-def save_agents():
-    """Sauvegarder les agents dans le fichier JSON"""
+# Tour interrompu par la déconnexion du client SSE: "discard" (abandonné) ou "save" (texte partiel conservé)
+PARTIAL_TURN_POLICY = os.getenv("PARTIAL_TURN_POLICY", "discard").lower()
+PARTIAL_TURN_MARKER = "\n\n[Réponse interrompue]"
+
+# Pré-génération du tour suivant pendant la lecture du tour courant (opt-in par requête,
+# `?speculate=true`, ou par défaut pour le déploiement)
+SPECULATIVE_TURNS = os.getenv("SPECULATIVE_TURNS", "false").lower() in ("1", "true", "yes")
+speculator = Speculator(ttl=float(os.getenv("SPECULATION_TTL", "300")))
+
+# Génération en cours du tour de chaque débat (single-flight) et verrous par débat
+turn_flights = TurnFlights()
+
+# Débats en cours de démarrage (attente de la source): tours et exécution automatique refusés
+starting_debates: Set[str] = set()
+
+# Durées de génération des tours (limite `turn_time_limit` de la configuration du débat)
+turn_stats = TurnTimingStats()
+
+# Diffusion en direct des débats aux spectateurs (`GET /debates/{id}/events`)
+broadcaster = DebateBroadcaster(
+    buffer_size=int(os.getenv("BROADCAST_BUFFER_SIZE", "1024")),
+    max_pending=int(os.getenv("BROADCAST_MAX_PENDING", "256")),
+    max_channels=int(os.getenv("BROADCAST_MAX_CHANNELS", "1024")),
+    heartbeat=float(os.getenv("BROADCAST_HEARTBEAT", "15"))
+)
+
+
+def create_store() -> DebateStore:
+    """Instancier le backend de stockage configuré"""
+    if STORAGE_BACKEND == "sqlite":
+        return SQLiteStore(agents_db, debates_db, AGENTS_FILE, SQLITE_DB_FILE, ACTIVE_DEBATES_FILE)
+    journal = None
+    if DEBATE_PERSISTENCE == "journal":
+        journal = DebateJournal(
+            DEBATES_JOURNAL_FILE,
+            ACTIVE_DEBATES_FILE,
+            compact_bytes=int(os.getenv("JOURNAL_COMPACT_BYTES", str(4 * 1024 * 1024)))
+        )
+    return JsonStore(agents_db, debates_db, AGENTS_FILE, ACTIVE_DEBATES_FILE, ARCHIVE_DIR, journal)
+
+
+store = create_store()
+
+# Écriture différée des données (hors de la boucle d'événements)
+persistence_worker = PersistenceWorker(flush_interval=float(os.getenv("PERSIST_FLUSH_INTERVAL", "1.0")))
+persistence_worker.register("agents", store.collect_agents, store.write_agents)
+persistence_worker.register("debates", store.collect_debates, store.write_debates)
+tournament_store = TournamentStore(TOURNAMENTS_DIR)
+persistence_worker.register("tournaments", tournament_store.collect, tournament_store.write)
+
+
+def evict_debate(debate: Debate):
+    """Débat terminé évincé du cache: le confier au stockage jusqu'à son écriture"""
+    store.evict(debate)
+    save_debates()
+
+
+def shared_source(debate: Debate) -> Optional[str]:
+    """Empreinte du texte source à relire dans le cache des sources (débat chargé depuis le stockage)"""
+    if debate.source_hash and debate.source_text is None and source_cache is not None:
+        return debate.source_hash
+    return None
+
+
+def attach_source(debate: Debate, text: Optional[str]):
+    debate.source_text = text
+    if text is None:
+        print(f"⚠️ Texte source {debate.source_hash[:12]} du débat {debate.id} absent du cache des sources")
+
+
+async def fetch_debate(debate_id: str) -> Optional[Debate]:
+    """Réhydrater un débat évincé (lectures du stockage et du cache des sources hors de la boucle)"""
+    debate = await store.fetch_debate(debate_id)
+    if debate is not None and shared_source(debate):
+        attach_source(debate, await source_cache.load_text(debate.source_hash))
+    return debate
+
+
+# Les débats évincés sont réhydratés à la demande depuis le stockage
+debates_db.loader = fetch_debate
+debates_db.on_evict = evict_debate
+
+
+def load_agents():
+    """Charger les agents depuis le backend de stockage"""
     try:
-        agents_data = {
-            "agents": [agent.model_dump(mode='json') for agent in agents_db.values()]
-        }
-        with open(AGENTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(agents_data, f, indent=2, ensure_ascii=False)
-        print(f"💾 {len(agents_db)} agents sauvegardés dans {AGENTS_FILE}")
+        store.load_agents()
     except Exception as e:
-        print(f"⚠️ Erreur lors de la sauvegarde des agents: {e}")
+        print(f"⚠️ Erreur lors du chargement des agents: {e}")
+
+
+def save_agents():
+    """Planifier la sauvegarde des agents (écriture différée)"""
+    persistence_worker.mark_dirty("agents")
 
 
 def load_debates():
-    """Charger les débats préconfigurés et actifs depuis les fichiers JSON"""
+    """Charger les débats préconfigurés (fichier JSON) et actifs (backend de stockage)"""
     # Charger les débats préconfigurés (templates)
     if DEBATES_FILE.exists():
         try:
@@ -111,26 +272,52 @@ def load_debates():
             print(f"✅ {len(debates_config_db)} débats préconfigurés chargés depuis {DEBATES_FILE}")
         except Exception as e:
             print(f"⚠️ Erreur lors du chargement des débats préconfigurés: {e}")
-    
 
-
-def save_debates():
-    """Sauvegarder uniquement les débats actifs/modifiés dans active_debates.json"""
     try:
-        # Ne sauvegarder que les débats qui ne sont plus "pending" (ont été démarrés/modifiés)
-        active_debates = [
-            debate for debate in debates_db.values() 
-            if debate.status != 'pending' or len(debate.messages) > 0 or debate.started_at is not None
-        ]
-        
-        debates_data = {
-            "debates": [debate.model_dump(mode='json') for debate in active_debates]
-        }
-        with open(ACTIVE_DEBATES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(debates_data, f, indent=2, ensure_ascii=False)
-        print(f"💾 {len(active_debates)} débats actifs sauvegardés dans {ACTIVE_DEBATES_FILE}")
+        store.load_debates()
+        for debate in debates_db.values():
+            if shared_source(debate):
+                attach_source(debate, source_cache.text(debate.source_hash))
     except Exception as e:
-        print(f"⚠️ Erreur lors de la sauvegarde des débats: {e}")
+        print(f"⚠️ Erreur lors du chargement des débats actifs: {e}")
+
+
+def persist_debate(debate: Debate, new_messages: List[DebateMessage] = (), include_source: bool = False):
+    """Persister les modifications d'un débat.
+
+    Le store note l'en-tête du débat et les nouveaux messages; l'écriture est faite
+    par le worker de persistance (seules ces modifications sont écrites en mode
+    journal ou SQLite).
+    """
+    store.record_debate(debate, new_messages, include_source=include_source)
+    save_debates()
+
+
+def save_debates():
+    """Planifier la sauvegarde des débats actifs (écriture différée)"""
+    persistence_worker.mark_dirty("debates")
+
+
+def overloaded(error: AdmissionRejected) -> HTTPException:
+    """Réponse 503 d'un appel refusé par le contrôle d'admission du fournisseur"""
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after))}
+    )
+
+
+async def query_store(method, *args, **kwargs):
+    """Exécuter une requête de liste sur le store.
+
+    Pour un store sur disque, les écritures en attente sont d'abord vidées et la requête
+    s'exécute dans un thread; un store en mémoire est interrogé directement.
+    """
+    if not store.queries_on_disk:
+        return method(*args, **kwargs)
+    if persistence_worker.running:
+        await persistence_worker.flush()
+    return await asyncio.to_thread(method, *args, **kwargs)
 
 
 @app.get("/")
@@ -150,6 +337,40 @@ async def root():
     }
 
 
+@app.get("/stats")
+async def get_stats():
+    """Statistiques internes (cache des débats, persistance, trames SSE, files d'attente IA, durées des tours)"""
+    return {
+        "debate_cache": debates_db.stats(),
+        "persistence": {
+            "backend": STORAGE_BACKEND,
+            "flushes": persistence_worker.flush_count
+        },
+        "sse": {
+            "policy": repr(sse_flush_policy),
+            **sse_stats.to_dict()
+        },
+        "ai_limits": ai_service.limiter.stats(),
+        "turns": turn_stats.to_dict(),
+        "autorun": debate_runner.stats(),
+        "speculation": speculator.stats(),
+        "turn_flights": turn_flights.stats(),
+        "broadcast": broadcaster.stats(),
+        "context_window": context_window.stats(),
+        "prompt_cache": ai_service.cache_stats.to_dict(),
+        "completion_cache": ai_service.completion_cache.stats() if ai_service.completion_cache else None,
+        "source_index": source_retriever.stats(),
+        "source_fetcher": source_fetcher.stats(),
+        "source_cache": source_cache.stats() if source_cache else None,
+        "source_prefetch": source_prefetcher.stats(),
+        "tournaments": {
+            tournament.id: tournament_runner.summary(tournament)["progress"]
+            for tournament in tournament_runner.tournaments.values()
+            if tournament_runner.is_running(tournament.id)
+        }
+    }
+
+
 # ===== ENDPOINTS AGENTS =====
 
 @app.post("/agents", response_model=AgentConfig)
@@ -163,9 +384,25 @@ async def create_agent(agent: AgentConfig):
 
 
 @app.get("/agents", response_model=List[AgentConfig])
-async def list_agents():
-    """Lister tous les agents"""
-    return list(agents_db.values())
+async def list_agents(
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """Lister les agents.
+
+    Sans `limit`, renvoie tous les agents. Avec `limit`, renvoie une page triée par date
+    de création; le curseur de la page suivante est dans l'en-tête `X-Next-Cursor`.
+    """
+    if limit is None:
+        return list(agents_db.values())
+    try:
+        agents, next_cursor = await query_store(store.list_agents, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return agents
 
 
 @app.get("/agents/{agent_id}", response_model=AgentConfig)
@@ -201,22 +438,22 @@ async def delete_agent(agent_id: str):
 
 # ===== ENDPOINTS DÉBATS =====
 
-@app.post("/debates", response_model=Debate)
-async def create_debate(request: DebateCreateRequest):
-    """Créer un nouveau débat"""
+def new_debate(topic: str, agent1_id: str, agent2_id: str, config_data: Optional[dict] = None) -> Debate:
+    """Créer et enregistrer un débat (API et tournois)"""
     import uuid
     
     # Vérifier que les agents existent
-    if request.agent1_id not in agents_db:
-        raise HTTPException(status_code=404, detail=f"Agent 1 non trouvé: {request.agent1_id}")
-    if request.agent2_id not in agents_db:
-        raise HTTPException(status_code=404, detail=f"Agent 2 non trouvé: {request.agent2_id}")
+    if agent1_id not in agents_db:
+        raise HTTPException(status_code=404, detail=f"Agent 1 non trouvé: {agent1_id}")
+    if agent2_id not in agents_db:
+        raise HTTPException(status_code=404, detail=f"Agent 2 non trouvé: {agent2_id}")
     
     # Créer la configuration avec les valeurs par défaut
-    config_data = request.config or {}
+    config_data = config_data or {}
     debate_config = DebateConfig(
-        topic=request.topic,
+        topic=topic,
         max_turns=config_data.get('max_turns', 10),
+        turn_time_limit=config_data.get('turn_time_limit'),
         agent1_position=config_data.get('agent1_position', 'pour'),
         agent2_position=config_data.get('agent2_position', 'contre'),
         source_url=config_data.get('source_url'),
@@ -226,9 +463,9 @@ async def create_debate(request: DebateCreateRequest):
     # Créer le débat
     debate = Debate(
         id=str(uuid.uuid4()),
-        topic=request.topic,
-        agent1_id=request.agent1_id,
-        agent2_id=request.agent2_id,
+        topic=topic,
+        agent1_id=agent1_id,
+        agent2_id=agent2_id,
         config=debate_config,
         status=DebateStatus.PENDING,
         messages=[],
@@ -237,297 +474,1117 @@ async def create_debate(request: DebateCreateRequest):
     )
     
     debates_db[debate.id] = debate
-    save_debates()
+    persist_debate(debate)
+    if debate_config.source_url and SOURCE_PREFETCH:
+        # Téléchargement et extraction pendant que l'utilisateur prépare le débat
+        source_prefetcher.start(debate)
     return debate
 
 
-@app.get("/debates")
-async def list_debates():
-    """Lister tous les débats"""
-    print(f"ℹ️ Récupération de la liste des débats ({len(debates_config_db)} au total)")
-    return {"debates": list(debates_config_db.values())}
+@app.post("/debates", response_model=Debate)
+async def create_debate(request: DebateCreateRequest):
+    """Créer un nouveau débat"""
+    return new_debate(request.topic, request.agent1_id, request.agent2_id, request.config)
 
 
-@app.get("/debates/{debate_id}", response_model=Debate)
-async def get_debate(debate_id: str):
-    """Récupérer un débat spécifique"""
-    if debate_id not in debates_db:
+@app.get("/debates")
+async def list_debates(
+    scope: str = Query(default="templates", pattern="^(templates|active)$"),
+    status: Optional[DebateStatus] = None,
+    agent_id: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+    cursor: Optional[str] = None
+):
+    """Lister les débats.
+
+    - `scope=templates` (défaut): débats préconfigurés
+    - `scope=active`: débats créés, du plus récent au plus ancien (sans messages ni source)
+
+    Filtres `status` et `agent_id`, pagination par curseur avec `limit`/`cursor`
+    (`next_cursor` dans la réponse).
+    """
+    status_value = status.value if status else None
+    try:
+        if scope == "active":
+            debates, next_cursor = await query_store(
+                store.list_debates, limit or 50, cursor, status=status_value, agent_id=agent_id
+            )
+            return {"debates": debates, "next_cursor": next_cursor}
+
+        templates = [
+            debate for debate in debates_config_db.values()
+            if (status_value is None or debate.status == status_value)
+            and (agent_id is None or agent_id in (debate.agent1_id, debate.agent2_id))
+        ]
+        print(f"ℹ️ Récupération de la liste des débats ({len(templates)} au total)")
+        if limit is None:
+            return {"debates": templates, "next_cursor": None}
+        debates, next_cursor = paginate(templates, limit, cursor)
+        return {"debates": debates, "next_cursor": next_cursor}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/debates/{debate_id}")
+async def get_debate(
+    debate_id: str,
+    fields: Optional[str] = Query(default=None, description="Champs à renvoyer, séparés par des virgules"),
+    exclude: Optional[str] = Query(default=None, description="Champs à omettre (ex. `source_text`)"),
+    since_turn: Optional[int] = Query(default=None, ge=0, description="Delta: messages des tours `since_turn` et suivants"),
+    after_message_id: Optional[str] = Query(default=None, description="Delta: messages enregistrés après celui-ci"),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """Récupérer un débat spécifique.
+
+    La réponse porte un ETag fort: avec `If-None-Match`, un débat inchangé renvoie 304
+    sans corps. `fields`/`exclude` restreignent les champs renvoyés (le `source_text`
+    d'une source PDF peut peser plusieurs Mo). En mode delta (`after_message_id` ou
+    `since_turn`), seuls les champs d'état, le nombre de messages et les nouveaux
+    messages sont renvoyés.
+    """
+    debate = await debates_db.get(debate_id)
+    if debate is None:
         raise HTTPException(status_code=404, detail="Débat non trouvé")
-    return debates_db[debate_id]
+    try:
+        include_fields = parse_fields(fields)
+        exclude_fields = parse_fields(exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    delta = since_turn is not None or after_message_id is not None
+    variant = "" if not (delta or fields or exclude) else repr((
+        sorted(include_fields or ()), sorted(exclude_fields or ()), since_turn, after_message_id
+    ))
+    # Réponses revalidées à chaque affichage (ETag calculé sans sérialiser le débat)
+    headers = {"ETag": debate_etag(debate, variant), "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if delta:
+        content = debate_delta(debate, since_turn, after_message_id)
+    else:
+        content = debate.model_dump(mode="json", include=include_fields, exclude=exclude_fields)
+    return JSONResponse(content, headers=headers)
 
 
-@app.post("/debates/{debate_id}/next-turn")
-async def next_turn(debate_id: str):
-    """Faire progresser le débat d'un tour"""
-    
-    # Vérifier que le débat existe
-    if debate_id not in debates_db:
-        raise HTTPException(status_code=404, detail="Débat non trouvé")
-    
-    debate = debates_db[debate_id]
-    
+class PreparedTurn:
+    """Agent qui parle et prompts du prochain tour d'un débat.
+
+    `agent1_turn` impose l'agent qui parle (déclarations d'ouverture en parallèle);
+    par défaut, les agents alternent.
+    """
+
+    def __init__(self, debate: Debate, agent1_turn: Optional[bool] = None):
+        # Récupérer les agents
+        agent1 = agents_db.get(debate.agent1_id)
+        agent2 = agents_db.get(debate.agent2_id)
+
+        if not agent1 or not agent2:
+            raise HTTPException(status_code=500, detail="Agents non trouvés")
+
+        # Déterminer quel agent parle (alternance)
+        self.is_agent1_turn = len(debate.messages) % 2 == 0 if agent1_turn is None else agent1_turn
+        self.agent = agent1 if self.is_agent1_turn else agent2
+        self.role = MessageRole.AGENT1 if self.is_agent1_turn else MessageRole.AGENT2
+
+        # Construire le prompt système
+        self.system_prompt = prompt_builder.build_system_prompt(self.agent, debate)
+
+        # Obtenir le dernier message de l'adversaire
+        opponent_last_message = None
+        if debate.messages:
+            opponent_last_message = debate.messages[-1].content
+
+        # Construire le prompt utilisateur
+        self.user_prompt = prompt_builder.build_user_prompt(debate, opponent_last_message)
+
+        # Extraits de la source pertinents pour le sujet et la dernière intervention
+        last_turn = next((m for m in reversed(debate.messages) if m.role != MessageRole.SYSTEM), None)
+        source_context = source_retriever.context(
+            debate,
+            f"{debate.topic} {last_turn.content if last_turn else ''}",
+            lambda text: context_window.count(self.agent, text)
+        )
+
+        # Construire l'historique de conversation pour l'agent actuel (borné en tokens)
+        self.conversation_history = context_window.build_history(
+            debate,
+            self.agent,
+            {MessageRole.AGENT1.value: agent1.name, MessageRole.AGENT2.value: agent2.name},
+            source_context
+        )
+
+
+def check_turn_allowed(debate: Debate):
+    """Refuser un tour pour un débat en cours de démarrage ou terminé (marqué terminé au-delà
+    du nombre maximal de tours)"""
+    if debate.id in starting_debates:
+        raise HTTPException(status_code=409, detail="Le débat est en cours de démarrage")
+
     # Vérifier que le débat n'est pas terminé
     if debate.status == DebateStatus.COMPLETED:
         raise HTTPException(status_code=400, detail="Le débat est déjà terminé")
-    
+
     # Vérifier qu'on n'a pas atteint le max de tours
     if debate.current_turn >= debate.config.max_turns:
         debate.status = DebateStatus.COMPLETED
         debate.completed_at = datetime.now()
-        save_debates()
+        persist_debate(debate)
         raise HTTPException(status_code=400, detail="Nombre maximum de tours atteint")
-    
-    # Récupérer les agents
-    agent1 = agents_db.get(debate.agent1_id)
-    agent2 = agents_db.get(debate.agent2_id)
-    
-    if not agent1 or not agent2:
-        raise HTTPException(status_code=500, detail="Agents non trouvés")
-    
-    # Marquer le début du débat si c'est le premier tour
-    if debate.current_turn == 0 and not debate.started_at:
-        debate.status = DebateStatus.IN_PROGRESS
-        debate.started_at = datetime.now()
-    
+
+
+def check_not_autorun(debate_id: str):
+    """Les tours manuels sont refusés pendant une exécution automatique du débat"""
+    if debate_runner.is_active(debate_id):
+        raise HTTPException(status_code=409, detail="Le débat est en cours d'exécution automatique")
+
+
+def record_turn(
+    debate: Debate,
+    turn: PreparedTurn,
+    content: str,
+    tokens_used: Optional[int],
+    generation_time: Optional[float] = None,
+    truncated: bool = False,
+    usage: Optional[dict] = None
+) -> DebateMessage:
+    """Enregistrer le message de l'agent et faire avancer le débat.
+
+    `usage`: consommation rapportée par le fournisseur (tokens d'entrée, dont en cache)
+    """
+    usage = usage or {}
+    if usage.get("output_tokens") and not truncated:
+        # Longueur des réponses complètes de l'agent (estimation des tokens économisés à l'annulation)
+        sse_stats.record_reply(turn.agent.id, usage["output_tokens"])
+    import uuid
+    message = DebateMessage(
+        id=str(uuid.uuid4()),
+        debate_id=debate.id,
+        role=turn.role,
+        agent_id=turn.agent.id,
+        content=content,
+        timestamp=datetime.now(),
+        turn_number=debate.current_turn,
+        tokens_used=tokens_used,
+        generation_time=round(generation_time, 3) if generation_time is not None else None,
+        truncated=truncated,
+        input_tokens=usage.get("input_tokens"),
+        cached_tokens=usage.get("cached_tokens")
+    )
+
+    # Ajouter le message au débat
+    debate.messages.append(message)
+
+    # Incrémenter le tour après que les deux agents aient parlé
+    if not turn.is_agent1_turn:
+        debate.current_turn += 1
+
+    # Vérifier si le débat est terminé
+    if debate.current_turn >= debate.config.max_turns:
+        debate.status = DebateStatus.COMPLETED
+        debate.completed_at = datetime.now()
+
+    # Sauvegarder
+    persist_debate(debate, [message])
+    broadcaster.publish(debate.id, done_event(message, debate), final=debate.status == DebateStatus.COMPLETED)
+    return message
+
+
+def done_event(message: DebateMessage, debate: Debate) -> dict:
+    """Événement SSE de fin de tour: message enregistré et état du débat"""
+    message_dict = {
+        'id': message.id,
+        'debate_id': message.debate_id,
+        'role': message.role,
+        'agent_id': message.agent_id,
+        'content': message.content,
+        'timestamp': message.timestamp.isoformat() if message.timestamp else None,
+        'turn_number': message.turn_number,
+        'tokens_used': message.tokens_used,
+        'generation_time': message.generation_time,
+        'truncated': message.truncated,
+        'input_tokens': message.input_tokens,
+        'cached_tokens': message.cached_tokens
+    }
+
+    return {
+        'type': 'done',
+        'message': message_dict,
+        'debate': {
+            'id': debate.id,
+            'current_turn': debate.current_turn,
+            'status': debate.status
+        }
+    }
+
+
+def turn_start_event(debate: Debate, turn: PreparedTurn) -> dict:
+    return {
+        "type": "turn_start",
+        "role": turn.role,
+        "agent_id": turn.agent.id,
+        "turn_number": debate.current_turn
+    }
+
+
+@contextmanager
+def broadcast_turn(debate: Debate, turn: PreparedTurn):
+    """Annoncer le tour aux spectateurs; `turn_cancelled` s'il se termine sans être enregistré"""
+    version = transcript_version(debate)
+    broadcaster.publish(debate.id, turn_start_event(debate, turn))
     try:
-        # Déterminer quel agent parle (alternance)
-        is_agent1_turn = len(debate.messages) % 2 == 0
-        current_agent = agent1 if is_agent1_turn else agent2
-        current_role = MessageRole.AGENT1 if is_agent1_turn else MessageRole.AGENT2
-        
-        # Construire le prompt système
-        system_prompt = prompt_builder.build_system_prompt(current_agent, debate)
-        
-        # Obtenir le dernier message de l'adversaire
-        opponent_last_message = None
-        if debate.messages:
-            opponent_last_message = debate.messages[-1].content
-        
-        # Construire le prompt utilisateur
-        user_prompt = prompt_builder.build_user_prompt(debate, opponent_last_message)
-        
-        # Construire l'historique de conversation pour l'agent actuel
-        conversation_history = prompt_builder.build_conversation_history(
-            debate.messages,
-            current_agent.id
-        )
-        
-        # Générer la réponse
-        response = await ai_service.generate_response(
-            current_agent,
-            system_prompt,
-            user_prompt,
-            conversation_history
-        ) 
-        
-        # Créer le message
-        import uuid
-        message = DebateMessage(
-            id=str(uuid.uuid4()),
-            debate_id=debate_id,
-            role=current_role,
-            agent_id=current_agent.id,
-            content=response["content"],
-            timestamp=datetime.now(),
-            turn_number=debate.current_turn,
-            tokens_used=response.get("tokens_used", 0)
+        yield
+    finally:
+        if transcript_version(debate) == version:
+            broadcaster.publish(debate.id, {"type": "turn_cancelled", "role": turn.role})
+
+
+def start_speculation(debate: Debate):
+    """Pré-générer le tour suivant en tâche de fond (servi par le prochain `next-turn/stream`)"""
+    turn = PreparedTurn(debate)
+    speculator.start(
+        debate,
+        TurnDeadline(debate.config.turn_time_limit),
+        lambda usage: ai_service.generate_response_stream(
+            turn.agent,
+            turn.system_prompt,
+            turn.user_prompt,
+            turn.conversation_history,
+            debate,
+            usage=usage
         )
+    )
+
+
+async def generate_turn(
+    flight: TurnFlight,
+    debate: Debate,
+    turn: PreparedTurn,
+    version: str,
+    deadline: TurnDeadline,
+    slot=None,
+    speculative=None,
+    speculate: bool = False
+):
+    """Générer un tour en streaming et l'enregistrer (tâche de la génération partagée `flight`)"""
+    parts = []
+    try:
+        async with turn_flights.lock(debate.id):
+            if transcript_version(debate) != version:
+                raise TurnConflict("Le débat a changé pendant l'attente: relancer le tour")
+
+            with broadcast_turn(debate, turn):
+                if speculative is not None:
+                    # Segments en tampon puis suite de la génération (déjà bornée par son échéance)
+                    usage = speculative.usage
+                    chunks = speculative.stream()
+                else:
+                    usage = {}
+                    stream = ai_service.generate_response_stream(
+                        turn.agent,
+                        turn.system_prompt,
+                        turn.user_prompt,
+                        turn.conversation_history,
+                        debate,
+                        usage=usage,
+                        slot=slot
+                    )
+                    chunks = deadline.iterate(stream)
+
+                # Les segments du fournisseur (bornés par l'échéance du tour) sont regroupés en
+                # lots selon la politique de flush, diffusés à toutes les requêtes rattachées
+                # ainsi qu'aux spectateurs
+                try:
+                    async with aclosing(coalesce(chunks, sse_flush_policy)) as batches:
+                        async for batch in batches:
+                            text = "".join(batch)
+                            parts.append(text)
+                            flight.publish(batch)
+                            broadcaster.publish(debate.id, {"type": "token", "role": turn.role, "text": text})
+                except asyncio.CancelledError:
+                    # Tous les clients sont partis: tokens non générés grâce à l'annulation
+                    partial = "".join(parts)
+                    tokens_saved = sse_stats.record_disconnect([(turn.agent, partial)])
+                    print(f"🔌 Client déconnecté pendant le débat {debate.id}: flux annulé (~{tokens_saved} tokens économisés)")
+                    if PARTIAL_TURN_POLICY == "save" and partial:
+                        record_turn(debate, turn, partial + PARTIAL_TURN_MARKER, None, deadline.elapsed())
+                    raise
+
+                if deadline.expired:
+                    # Limite de temps atteinte: le flux du fournisseur est déjà fermé
+                    parts.append(TRUNCATION_MARKER)
+                    flight.publish([TRUNCATION_MARKER])
+                    broadcaster.publish(debate.id, {"type": "token", "role": turn.role, "text": TRUNCATION_MARKER})
+                # (un tour pré-généré peut avoir attendu la requête: durée de sa seule génération)
+                elapsed = speculative.generation_time if speculative is not None else deadline.elapsed()
+                turn_stats.record(elapsed, deadline.expired)
+
+                # Après la fin du streaming, créer le message final et sauvegarder
+                tokens_used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0) if usage else None
+                message = record_turn(debate, turn, "".join(parts), tokens_used, elapsed, deadline.expired, usage)
+                flight.finish(message, done_event(message, debate))
+
+                if speculate and debate.status != DebateStatus.COMPLETED and not debate_runner.is_active(debate.id):
+                    start_speculation(debate)
+    finally:
+        if slot is not None:
+            slot.release()
+
+
+async def generate_turn_response(flight: TurnFlight, debate: Debate, turn: PreparedTurn, version: str):
+    """Générer un tour sans streaming et l'enregistrer (tâche de la génération partagée `flight`)"""
+    async with turn_flights.lock(debate.id):
+        if transcript_version(debate) != version:
+            raise TurnConflict("Le débat a changé pendant l'attente: relancer le tour")
+
+        with broadcast_turn(debate, turn):
+            # Générer la réponse (dans la limite de temps du tour, si configurée)
+            deadline = TurnDeadline(debate.config.turn_time_limit)
+            response = await ai_service.generate_response(
+                turn.agent,
+                turn.system_prompt,
+                turn.user_prompt,
+                turn.conversation_history,
+                debate,
+                deadline=deadline
+            )
+            truncated = response.get("truncated", False)
+            turn_stats.record(deadline.elapsed(), truncated)
+            content = response["content"] + (TRUNCATION_MARKER if truncated else "")
+            flight.publish([content])
+            broadcaster.publish(debate.id, {"type": "token", "role": turn.role, "text": content})
+
+            # Créer le message et faire avancer le débat
+            message = record_turn(
+                debate,
+                turn,
+                content,
+                response.get("tokens_used", 0),
+                deadline.elapsed(),
+                truncated,
+                response
+            )
+            flight.finish(message, done_event(message, debate))
+
+
+@app.post("/debates/{debate_id}/next-turn")
+async def next_turn(debate_id: str):
+    """Faire progresser le débat d'un tour.
+
+    Une requête reçue pendant la génération d'un tour de ce débat (double clic, second
+    onglet, nouvelle tentative) renvoie le message de ce tour au lieu d'en générer un autre.
+    """
+    
+    # Vérifier que le débat existe
+    debate = await debates_db.get(debate_id)
+    if debate is None:
+        raise HTTPException(status_code=404, detail="Débat non trouvé")
+    
+    flight = turn_flights.attach(debate_id)
+    if flight is None:
+        check_not_autorun(debate_id)
+        check_turn_allowed(debate)
+        turn = PreparedTurn(debate)
+        speculator.discard(debate_id)
         
-        # Ajouter le message au débat
-        debate.messages.append(message)
-        
-        # Incrémenter le tour après que les deux agents aient parlé
-        if not is_agent1_turn:
-            debate.current_turn += 1
-        
-        # Vérifier si le débat est terminé
-        if debate.current_turn >= debate.config.max_turns:
-            debate.status = DebateStatus.COMPLETED
-            debate.completed_at = datetime.now()
-        
-        # Sauvegarder
-        save_debates()
-        
-        return {
-            "success": True,
-            "message": message,
-            "debate": debate,
-            "next_speaker": "agent2" if is_agent1_turn else "agent1"
-        }
+        # Marquer le début du débat si c'est le premier tour
+        if debate.current_turn == 0 and not debate.started_at:
+            debate.status = DebateStatus.IN_PROGRESS
+            debate.started_at = datetime.now()
         
+        version = transcript_version(debate)
+        flight = turn_flights.register(debate_id)
+        turn_flights.launch(flight, lambda: generate_turn_response(flight, debate, turn, version))
+    
+    try:
+        message = await flight.wait()
+    except AdmissionRejected as e:
+        raise overloaded(e)
+    except TurnConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la génération: {str(e)}")
+    
+    return {
+        "success": True,
+        "message": message,
+        "debate": debate,
+        "next_speaker": "agent2" if message.role == MessageRole.AGENT1 else "agent1"
+    }
 
 
 @app.post("/debates/{debate_id}/next-turn/stream")
-async def next_turn_stream(debate_id: str):
+async def next_turn_stream(
+    debate_id: str,
+    request: Request,
+    speculate: bool = Query(default=SPECULATIVE_TURNS, description="Pré-générer le tour suivant dès la fin de celui-ci")
+):
     """Endpoint streaming (SSE) pour le tour suivant.
     Envoie des segments de texte au client au fur et à mesure.
+
+    Une requête reçue pendant la génération d'un tour de ce débat se rattache à cette
+    génération (segments déjà produits puis suite du flux) au lieu d'appeler à nouveau
+    le fournisseur.
+
+    Avec `speculate`, le tour de l'adversaire est généré en tâche de fond dès la fin de
+    celui-ci; la requête suivante est servie depuis ce tampon, s'il correspond encore à
+    la transcription (sinon il est abandonné).
+
+    Si tous les clients se déconnectent, l'appel au fournisseur est annulé et le tour
+    partiel est abandonné ou conservé selon `PARTIAL_TURN_POLICY`.
+
+    Si le débat a une limite de temps par tour (`turn_time_limit`), la génération est
+    interrompue à l'échéance et le texte reçu est conservé avec `TRUNCATION_MARKER`.
     """
     # Vérifier que le débat existe
-    if debate_id not in debates_db:
+    debate = await debates_db.get(debate_id)
+    if debate is None:
         raise HTTPException(status_code=404, detail="Débat non trouvé")
 
-    debate = debates_db[debate_id]
+    flight = turn_flights.attach(debate_id)
+    if flight is None:
+        check_not_autorun(debate_id)
+        check_turn_allowed(debate)
+        turn = PreparedTurn(debate)
+        version = transcript_version(debate)
+        # Déclarée avant toute attente: les requêtes concurrentes s'y rattachent
+        flight = turn_flights.register(debate_id)
+        try:
+            # Tour déjà pré-généré (ou en cours de pré-génération) pour cette transcription
+            speculative = speculator.take(debate)
+            slot = None
+            if speculative is not None:
+                deadline = speculative.deadline
+            else:
+                # L'échéance du tour inclut l'attente d'une place auprès du fournisseur
+                deadline = TurnDeadline(debate.config.turn_time_limit)
+
+                # Admission avant d'ouvrir le flux: une surcharge est signalée par un vrai 503
+                slot = await ai_service.acquire_slot(
+                    turn.agent, turn.system_prompt, turn.user_prompt, turn.conversation_history
+                )
+        except BaseException as e:
+            # Génération jamais lancée (surcharge, erreur, requête annulée): libérer les
+            # requêtes rattachées et le débat, sans quoi elles attendraient indéfiniment
+            flight.fail(e if isinstance(e, Exception) else TurnAborted("Génération du tour interrompue"))
+            turn_flights.remove(flight)
+            if isinstance(e, AdmissionRejected):
+                raise overloaded(e)
+            raise
+
+        turn_flights.launch(
+            flight,
+            lambda: generate_turn(flight, debate, turn, version, deadline, slot, speculative, speculate)
+        )
 
-    # Vérifier que le débat n'est pas terminé
-    if debate.status == DebateStatus.COMPLETED:
-        raise HTTPException(status_code=400, detail="Le débat est déjà terminé")
+    async def event_generator():
+        disconnected = asyncio.ensure_future(watch_disconnect(request, body))
+        batches = until_disconnected(flight.follow(), disconnected)
+        try:
+            async for batch in batches:
+                frame = sse_token("".join(batch))
+                sse_stats.record(frame, len(batch))
+                yield frame
 
-    # Vérifier qu'on n'a pas atteint le max de tours
-    if debate.current_turn >= debate.config.max_turns:
-        debate.status = DebateStatus.COMPLETED
-        debate.completed_at = datetime.now()
-        save_debates()
-        raise HTTPException(status_code=400, detail="Nombre maximum de tours atteint")
+            yield sse_event(flight.payload)
 
-    # Récupérer les agents
-    agent1 = agents_db.get(debate.agent1_id)
-    agent2 = agents_db.get(debate.agent2_id)
+        except ClientDisconnected:
+            pass
+        except Exception as e:
+            yield sse_event({"type": "error", "detail": str(e)})
+        finally:
+            # (ce bloc s'exécute dans la tâche de surveillance si c'est elle qui ferme le flux)
+            if disconnected is not asyncio.current_task():
+                disconnected.cancel()
+            # Se détacher de la génération (annulée si plus aucun client ne la suit)
+            await batches.aclose()
 
-    if not agent1 or not agent2:
-        raise HTTPException(status_code=500, detail="Agents non trouvés")
+    body = event_generator()
+    return StreamingResponse(body, media_type="text/event-stream")
 
-    # Déterminer quel agent parle (alternance)
-    is_agent1_turn = len(debate.messages) % 2 == 0
-    current_agent = agent1 if is_agent1_turn else agent2
-    current_role = MessageRole.AGENT1 if is_agent1_turn else MessageRole.AGENT2
 
-    # Construire le prompt système
-    system_prompt = prompt_builder.build_system_prompt(current_agent, debate)
+@app.post("/debates/{debate_id}/openings/stream")
+async def openings_stream(debate_id: str, request: Request):
+    """Générer en parallèle les déclarations d'ouverture des deux agents (SSE).
 
-    # Obtenir le dernier message de l'adversaire
-    opponent_last_message = None
-    if debate.messages:
-        opponent_last_message = debate.messages[-1].content
+    Les deux réponses sont diffusées sur le même flux, chaque segment étant marqué par le
+    `role` de l'agent; elles sont enregistrées dans l'ordre (agent1 puis agent2) et le
+    débat passe au tour 1.
+    """
+    debate = await debates_db.get(debate_id)
+    if debate is None:
+        raise HTTPException(status_code=404, detail="Débat non trouvé")
 
-    # Construire le prompt utilisateur
-    user_prompt = prompt_builder.build_user_prompt(debate, opponent_last_message)
+    check_not_autorun(debate_id)
+    if turn_flights.in_flight(debate_id):
+        raise HTTPException(status_code=409, detail="Un tour de ce débat est en cours de génération")
+    check_turn_allowed(debate)
+    if not debate.config.opening_statement_required:
+        raise HTTPException(status_code=400, detail="Ce débat ne prévoit pas de déclarations d'ouverture")
+    if debate.current_turn != 0 or any(m.role != MessageRole.SYSTEM for m in debate.messages):
+        raise HTTPException(status_code=400, detail="Les déclarations d'ouverture ont déjà commencé")
+
+    # Même transcription pour les deux agents: aucun ne voit l'ouverture de l'autre
+    turns = {
+        MessageRole.AGENT1.value: PreparedTurn(debate, agent1_turn=True),
+        MessageRole.AGENT2.value: PreparedTurn(debate, agent1_turn=False),
+    }
+    speculator.discard(debate_id)
+    version = transcript_version(debate)
+    deadlines = {role: TurnDeadline(debate.config.turn_time_limit) for role in turns}
 
-    # Construire l'historique de conversation pour l'agent actuel
-    conversation_history = prompt_builder.build_conversation_history(
-        debate.messages,
-        current_agent.id
-    )
+    # Admission des deux appels avant d'ouvrir le flux
+    slots = {}
+    try:
+        for role, turn in turns.items():
+            slots[role] = await ai_service.acquire_slot(
+                turn.agent, turn.system_prompt, turn.user_prompt, turn.conversation_history
+            )
+    except BaseException as e:
+        for slot in slots.values():
+            if slot is not None:
+                slot.release()
+        if isinstance(e, AdmissionRejected):
+            raise overloaded(e)
+        raise
+
+    if not debate.started_at:
+        debate.status = DebateStatus.IN_PROGRESS
+        debate.started_at = datetime.now()
+
+    # Les places sont confiées à la tâche de génération, qui les libère dans tous les cas
+    # (même si le corps de la réponse n'est jamais lu). La génération n'est pas déclarée
+    # dans `turn_flights`: un tour demandé pendant les ouvertures ne doit pas s'y rattacher.
+    flight = TurnFlight(debate_id)
+    turn_flights.launch(flight, lambda: generate_openings(flight, debate, turns, version, deadlines, slots))
 
     async def event_generator():
+        disconnected = asyncio.ensure_future(watch_disconnect(request, body))
+        batches = until_disconnected(flight.follow(), disconnected)
         try:
-            full_content = ""
-            chunk_count = 0
-            async for chunk in ai_service.generate_response_stream(
-                current_agent,
-                system_prompt,
-                user_prompt,
-                conversation_history,
-                debate
-            ):
-                chunk_count += 1
-                full_content += chunk
-                payload = {"type": "token", "text": chunk}
-                yield f"data: {json.dumps(payload)}\n\n"
-
-            # Après la fin du streaming, créer le message final et sauvegarder
-            import uuid
-            message = DebateMessage(
-                id=str(uuid.uuid4()),
-                debate_id=debate_id,
-                role=current_role,
-                agent_id=current_agent.id,
-                content=full_content,
-                timestamp=datetime.now(),
-                turn_number=debate.current_turn,
-                tokens_used=0
-            )
+            async for batch in batches:
+                for frame in batch:
+                    yield frame
 
-            debate.messages.append(message)
+        except ClientDisconnected:
+            pass
+        except Exception as e:
+            yield sse_event({"type": "error", "detail": str(e)})
+        finally:
+            if disconnected is not asyncio.current_task():
+                disconnected.cancel()
+            # Se détacher des ouvertures (annulées si plus aucun client ne les suit)
+            await batches.aclose()
+
+    body = event_generator()
+    return StreamingResponse(body, media_type="text/event-stream")
+
+
+async def generate_openings(
+    flight: TurnFlight,
+    debate: Debate,
+    turns: dict,
+    version: str,
+    deadlines: dict,
+    slots: dict
+):
+    """Générer en parallèle les deux déclarations d'ouverture et les enregistrer dans l'ordre
+    des agents (tâche de la génération `flight`, qui publie les trames SSE à relayer)"""
+    parts = {role: [] for role in turns}
+    usages = {role: {} for role in turns}
+    finished_roles = set()
+    recorded = []
+
+    def record(role: str) -> dict:
+        deadline = deadlines[role]
+        if deadline.expired:
+            parts[role].append(TRUNCATION_MARKER)
+        turn_stats.record(deadline.elapsed(), deadline.expired)
+        usage = usages[role]
+        tokens_used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0) if usage else None
+        message = record_turn(
+            debate, turns[role], "".join(parts[role]), tokens_used, deadline.elapsed(), deadline.expired, usage
+        )
+        recorded.append(role)
+        return {**done_event(message, debate), "role": role}
 
-            # Incrémenter le tour après que les deux agents aient parlé
-            if not is_agent1_turn:
-                debate.current_turn += 1
+    try:
+        # Verrou du débat pendant les deux ouvertures (sérialisées avec les autres tours)
+        async with turn_flights.lock(debate.id):
+            if transcript_version(debate) != version:
+                raise TurnConflict("Le débat a changé pendant l'attente: relancer les ouvertures")
+            for role, turn in turns.items():
+                broadcaster.publish(debate.id, turn_start_event(debate, turn))
+            streams = {
+                role: coalesce(
+                    deadlines[role].iterate(ai_service.generate_response_stream(
+                        turn.agent,
+                        turn.system_prompt,
+                        turn.user_prompt,
+                        turn.conversation_history,
+                        debate,
+                        usage=usages[role],
+                        slot=slots[role]
+                    )),
+                    sse_flush_policy
+                )
+                for role, turn in turns.items()
+            }
+            try:
+                async with aclosing(multiplex(streams)) as batches:
+                    async for role, batch in batches:
+                        if batch is not None:
+                            token = {"type": "token", "role": role, "text": "".join(batch)}
+                            parts[role].append(token["text"])
+                            broadcaster.publish(debate.id, token)
+                            frame = sse_event(token)
+                            sse_stats.record(frame, len(batch))
+                            flight.publish([frame])
+                            continue
+
+                        finished_roles.add(role)
+                        if deadlines[role].expired:
+                            token = {"type": "token", "role": role, "text": TRUNCATION_MARKER}
+                            broadcaster.publish(debate.id, token)
+                            flight.publish([sse_event(token)])
+                        # Enregistrement dans l'ordre des agents, dès que possible
+                        for ordered_role in turns:
+                            if ordered_role in recorded:
+                                continue
+                            if ordered_role not in finished_roles:
+                                break
+                            flight.publish([sse_event(record(ordered_role))])
+                flight.finish(None, None)
+
+            except asyncio.CancelledError:
+                # Tous les clients sont partis: tokens non générés grâce à l'annulation
+                pending_roles = [role for role in turns if role not in recorded]
+                partials = {role: "".join(parts[role]) for role in pending_roles}
+                tokens_saved = sse_stats.record_disconnect([(turns[role].agent, partials[role]) for role in pending_roles])
+                print(f"🔌 Client déconnecté pendant les ouvertures du débat {debate.id}: flux annulés (~{tokens_saved} tokens économisés)")
+                if PARTIAL_TURN_POLICY == "save":
+                    # Conserver les ouvertures partielles dans l'ordre, jusqu'à la première vide
+                    for role in pending_roles:
+                        if not partials[role]:
+                            break
+                        record_turn(debate, turns[role], partials[role] + PARTIAL_TURN_MARKER, None, deadlines[role].elapsed())
+                        recorded.append(role)
+                raise
+            finally:
+                for role in turns:
+                    if role not in recorded:
+                        broadcaster.publish(debate.id, {"type": "turn_cancelled", "role": role})
+    finally:
+        for slot in slots.values():
+            if slot is not None:
+                slot.release()
+
+
+# ===== EXÉCUTION AUTOMATIQUE =====
+
+async def autorun_turn(debate_id: str, publish) -> bool:
+    """Jouer un tour d'un débat en exécution automatique.
+
+    Les événements (`turn_start`, `token`, `done`) sont publiés aux abonnés de
+    l'exécution; renvoie False lorsque le débat n'a plus de tour à jouer. Un tour refusé
+    par le contrôle d'admission est rejoué après le délai suggéré (`throttled`).
+    """
+    # Sérialisé avec les tours manuels et les ouvertures du même débat
+    async with turn_flights.lock(debate_id):
+        debate = await debates_db.get(debate_id)
+        if debate is None:
+            raise RuntimeError("Débat non trouvé")
+        if debate.status == DebateStatus.COMPLETED:
+            return False
+        if debate.current_turn >= debate.config.max_turns:
+            debate.status = DebateStatus.COMPLETED
+            debate.completed_at = datetime.now()
+            persist_debate(debate)
+            return False
+
+        if debate.current_turn == 0 and not debate.started_at:
+            debate.status = DebateStatus.IN_PROGRESS
+            debate.started_at = datetime.now()
+
+        turn = PreparedTurn(debate)
+        while True:
+            deadline = TurnDeadline(debate.config.turn_time_limit)
+            try:
+                slot = await ai_service.acquire_slot(
+                    turn.agent, turn.system_prompt, turn.user_prompt, turn.conversation_history
+                )
+                break
+            except AdmissionRejected as e:
+                publish({"type": "throttled", "retry_after": e.retry_after})
+                await asyncio.sleep(e.retry_after)
+
+        usage = {}
+        parts = []
+        stream = ai_service.generate_response_stream(
+            turn.agent,
+            turn.system_prompt,
+            turn.user_prompt,
+            turn.conversation_history,
+            debate,
+            usage=usage,
+            slot=slot
+        )
+        publish(turn_start_event(debate, turn))
+        # Segments publiés aux abonnés de l'exécution et aux spectateurs du débat
+        with broadcast_turn(debate, turn):
+            try:
+                async with aclosing(coalesce(deadline.iterate(stream), sse_flush_policy)) as batches:
+                    async for batch in batches:
+                        token = {"type": "token", "role": turn.role, "text": "".join(batch)}
+                        parts.append(token["text"])
+                        publish(token)
+                        broadcaster.publish(debate_id, token)
+            finally:
+                if slot is not None:
+                    slot.release()
+
+            if deadline.expired:
+                parts.append(TRUNCATION_MARKER)
+                token = {"type": "token", "role": turn.role, "text": TRUNCATION_MARKER}
+                publish(token)
+                broadcaster.publish(debate_id, token)
+            turn_stats.record(deadline.elapsed(), deadline.expired)
+
+            tokens_used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0) if usage else None
+            message = record_turn(debate, turn, "".join(parts), tokens_used, deadline.elapsed(), deadline.expired, usage)
+        publish(done_event(message, debate))
+        return True
+
+
+debate_runner = DebateRunner(autorun_turn)
+
+
+async def run_status(debate_id: str) -> dict:
+    run = debate_runner.get(debate_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Aucune exécution automatique pour ce débat")
+    debate = await debates_db.get(debate_id)
+    return {
+        **run.to_dict(),
+        "current_turn": debate.current_turn if debate else None,
+        "max_turns": debate.config.max_turns if debate else None,
+        "debate_status": debate.status if debate else None
+    }
 
-            # Vérifier si le débat est terminé
-            if debate.current_turn >= debate.config.max_turns:
-                debate.status = DebateStatus.COMPLETED
-                debate.completed_at = datetime.now()
 
-            save_debates()
+@app.post("/debates/{debate_id}/run")
+async def run_debate(debate_id: str):
+    """Jouer tous les tours restants du débat côté serveur (tâche de fond).
 
-            message_dict = {
-                'id': message.id,
-                'debate_id': message.debate_id,
-                'role': message.role,
-                'agent_id': message.agent_id,
-                'content': message.content,
-                'timestamp': message.timestamp.isoformat() if message.timestamp else None,
-                'turn_number': message.turn_number,
-                'tokens_used': message.tokens_used
-            }
+    Les tours sont persistés au fil de l'eau; la progression est diffusée par
+    `GET /debates/{id}/run/events` à un nombre quelconque d'abonnés.
+    """
+    debate = await debates_db.get(debate_id)
+    if debate is None:
+        raise HTTPException(status_code=404, detail="Débat non trouvé")
+    check_not_autorun(debate_id)
+    check_turn_allowed(debate)
+    # Vérifier que les agents existent avant de lancer la tâche
+    PreparedTurn(debate)
+    speculator.discard(debate_id)
+    debate_runner.start(debate_id)
+    return await run_status(debate_id)
 
-            final_payload = {
-                'type': 'done',
-                'message': message_dict,
-                'debate': {
-                    'id': debate.id,
-                    'current_turn': debate.current_turn,
-                    'status': debate.status
-                }
-            }
 
-            yield f"data: {json.dumps(final_payload)}\n\n"
+@app.get("/debates/{debate_id}/run")
+async def get_run_status(debate_id: str):
+    """État de l'exécution automatique du débat"""
+    return await run_status(debate_id)
 
-        except Exception as e:
-            err = {"type": "error", "detail": str(e)}
-            yield f"data: {json.dumps(err)}\n\n"
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
+@app.post("/debates/{debate_id}/run/{action}")
+async def control_run(debate_id: str, action: str):
+    """Mettre en pause (`pause`), reprendre (`resume`) ou annuler (`cancel`) l'exécution automatique"""
+    try:
+        if action == "pause":
+            debate_runner.pause(debate_id)
+        elif action == "resume":
+            debate_runner.resume(debate_id)
+        elif action == "cancel":
+            await debate_runner.cancel(debate_id)
+        else:
+            raise HTTPException(status_code=404, detail=f"Action inconnue: {action}")
+    except KeyError:
+        raise HTTPException(status_code=409, detail="Aucune exécution automatique en cours pour ce débat")
+    return await run_status(debate_id)
+
+
+@app.get("/debates/{debate_id}/run/events")
+async def run_events(debate_id: str, request: Request):
+    """Flux SSE de l'exécution automatique: état, début de tour, segments, messages enregistrés"""
+    run = debate_runner.get(debate_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Aucune exécution automatique pour ce débat")
+
+    async def event_generator():
+        disconnected = asyncio.ensure_future(watch_disconnect(request, body))
+        events = until_disconnected(run.subscribe(), disconnected)
+        try:
+            async for event in events:
+                yield sse_event(event)
+        except ClientDisconnected:
+            pass
+        finally:
+            if disconnected is not asyncio.current_task():
+                disconnected.cancel()
+            await events.aclose()
+
+    body = event_generator()
+    return StreamingResponse(body, media_type="text/event-stream")
+
+
+# ===== DIFFUSION AUX SPECTATEURS =====
+
+@app.get("/debates/{debate_id}/events")
+async def debate_events(
+    debate_id: str,
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None, description="Reprise après cet événement (reconnexion SSE)")
+):
+    """Flux SSE en direct d'un débat pour les spectateurs.
+
+    Une même génération est diffusée à tous les spectateurs, quel que soit l'endpoint
+    qui fait avancer le débat (tours manuels, ouvertures, exécution automatique):
+    `turn_start`, `token`, `done`, `turn_cancelled`. Les événements portent un `id`; à la
+    reconnexion, `Last-Event-ID` rejoue ceux qui ont été manqués s'ils sont encore dans
+    le tampon (sinon `resync`). Un nouveau spectateur reçoit l'état du débat
+    (`debate_status`) puis le tour en cours depuis son début.
+    """
+    debate = await debates_db.get(debate_id)
+    if debate is None:
+        raise HTTPException(status_code=404, detail="Débat non trouvé")
+
+    status = {
+        "type": "debate_status",
+        "debate": {"id": debate.id, "current_turn": debate.current_turn, "status": debate.status},
+        "messages": len(debate.messages)
+    }
+    finished = debate.status in (DebateStatus.COMPLETED, DebateStatus.CANCELLED)
+
+    async def event_generator():
+        # La déconnexion termine directement le flux du spectateur (pas de lecture à annuler)
+        disconnected = asyncio.ensure_future(watch_disconnect(request, body))
+        frames = broadcaster.subscribe(debate_id, last_event_id, status, follow=not finished, disconnected=disconnected)
+        try:
+            async for frame in frames:
+                yield frame
+        finally:
+            if disconnected is not asyncio.current_task():
+                disconnected.cancel()
+            await frames.aclose()
+
+    body = event_generator()
+    return StreamingResponse(body, media_type="text/event-stream")
+
+
+async def prefetch_source(debate: Debate):
+    """Récupérer, valider et indexer la source d'un débat (tâche lancée à sa création).
+
+    Délègue l'extraction au module `source_fetcher` (via le cache des sources: une source
+    connue coûte une requête conditionnelle) et renseigne `debate.source_status`.
+    """
+    source_url = debate.config.source_url
+    source_hash, extracted = None, None
+    try:
+        if source_cache is not None:
+            cached = await source_cache.fetch(source_url)
+            source_hash, extracted = cached if cached else (None, None)
+        else:
+            extracted = await source_fetcher.fetch_text(source_url)
+    except Exception as e:
+        print(f"⚠️ Impossible de récupérer la source {source_url}: {e}")
+
+    if not extracted:
+        debate.source_status = SourceStatus.FAILED
+    # Valider que le sujet du débat est en lien avec le texte extrait (hors de la boucle)
+    elif not await asyncio.to_thread(topic_related_to_text, debate.topic, extracted):
+        print(f"⚠️ Source {source_url} sans rapport avec le sujet du débat {debate.id}")
+        debate.source_status = SourceStatus.IRRELEVANT
+    else:
+        debate.source_text = extracted
+        debate.source_hash = source_hash
+        # Découpage et indexation hors de la boucle d'événements (index partagé par les
+        # débats d'une même source); chaque tour reçoit ensuite les passages pertinents
+        await source_retriever.index(debate)
+        debate.source_status = SourceStatus.READY
+    persist_debate(debate, include_source=debate.source_status == SourceStatus.READY)
+
+
+# Sources récupérées dès la création des débats (SOURCE_PREFETCH); `/start` attend la tâche en cours
+SOURCE_PREFETCH = os.getenv("SOURCE_PREFETCH", "true").lower() in ("1", "true", "yes")
+source_prefetcher = SourcePrefetcher(prefetch_source)
+
+
+IRRELEVANT_SOURCE = "Le sujet du débat ne semble pas lié au contenu de la source fournie."
+
+
+async def begin_debate(debate: Debate) -> Optional[SourceStatus]:
+    """Préparer la source d'un débat en attente puis le passer en cours (`/start`, tournois).
+
+    Attend la récupération de la source, le débat restant en attente: aucun tour ne peut
+    s'intercaler avant le message de contexte, inséré en tête de la transcription. Renvoie
+    l'état de la source (None sans source); une source sans rapport avec le sujet
+    (`irrelevant`) laisse le débat en attente.
+    """
+    new_messages = []
+    source_url = getattr(debate.config, 'source_url', None)
+    status = None
+    if source_url:
+        starting_debates.add(debate.id)
+        try:
+            status = await source_prefetcher.wait(debate)
+        finally:
+            starting_debates.discard(debate.id)
+        if status == SourceStatus.IRRELEVANT:
+            return status
+
+        index = await source_retriever.index(debate) if status == SourceStatus.READY else None
+        if index is not None:
+            import uuid
+            sys_msg = DebateMessage(
+                id=str(uuid.uuid4()),
+                debate_id=debate.id,
+                role=MessageRole.SYSTEM,
+                agent_id=None,
+                content=f"Contexte provenant de {source_url}: {len(index.chunks)} passages indexés, "
+                        f"les plus pertinents sont transmis aux agents à chaque tour.",
+                timestamp=datetime.now(),
+                turn_number=0,
+                tokens_used=None
+            )
+            debate.messages.insert(0, sys_msg)
+            new_messages.append(sys_msg)
+
+    debate.status = DebateStatus.IN_PROGRESS
+    debate.started_at = datetime.now()
+    persist_debate(debate, new_messages, include_source=True)
+    return status
 
 
 @app.post("/debates/{debate_id}/start")
 async def start_debate(debate_id: str):
-    """Démarrer un débat (déclarations d'ouverture des deux agents)"""
+    """Démarrer un débat (déclarations d'ouverture des deux agents)
+
+    La source éventuelle est récupérée depuis la création du débat: le démarrage attend
+    la fin de cette récupération. Une source sans rapport avec le sujet est refusée (400)
+    et le débat reste en attente.
+    """
     
-    if debate_id not in debates_db:
+    debate = await debates_db.get(debate_id)
+    if debate is None:
         raise HTTPException(status_code=404, detail="Débat non trouvé")
     
-    debate = debates_db[debate_id]
-    
     if debate.status != DebateStatus.PENDING:
         raise HTTPException(status_code=400, detail="Le débat a déjà commencé")
+    if debate_id in starting_debates:
+        raise HTTPException(status_code=409, detail="Le débat est en cours de démarrage")
+    check_not_autorun(debate_id)
+    if turn_flights.in_flight(debate_id):
+        raise HTTPException(status_code=409, detail="Un tour de ce débat est en cours de génération")
     
-    debate.status = DebateStatus.IN_PROGRESS
-    debate.started_at = datetime.now()
-    # Si une source URL est fournie, déléguer l'extraction au module `source_fetcher`
-    source_url = getattr(debate.config, 'source_url', None)
-    if source_url:
-        try:
-            extracted = fetch_source_text(source_url)
-            if extracted:
-                # Valider que le sujet du débat est en lien avec le texte extrait
-                if not topic_related_to_text(debate.topic, extracted):
-                    # Ne pas démarrer le débat si la source n'est pas pertinente
-                    raise HTTPException(status_code=400, detail="Le sujet du débat ne semble pas lié au contenu de la source fournie.")
-
-                debate.source_text = extracted
-                import uuid
-                snippet = extracted[:8000]
-                sys_msg = DebateMessage(
-                    id=str(uuid.uuid4()),
-                    debate_id=debate.id,
-                    role=MessageRole.SYSTEM,
-                    agent_id=None,
-                    content=f"Contexte provenant de {source_url}:\n\n{snippet}",
-                    timestamp=datetime.now(),
-                    turn_number=0,
-                    tokens_used=None
-                )
-                debate.messages.insert(0, sys_msg)
-        except Exception as e:
-            print(f"⚠️ Impossible de récupérer la source {source_url}: {e}")
-
-    save_debates()
+    if await begin_debate(debate) == SourceStatus.IRRELEVANT:
+        # Ne pas démarrer le débat si la source n'est pas pertinente
+        raise HTTPException(status_code=400, detail=IRRELEVANT_SOURCE)
     
     return {"success": True, "debate": debate}
 
 
+# ===== TOURNOIS =====
+
+async def play_match(match: TournamentMatch, checkpoint) -> int:
+    """Jouer (ou reprendre) le débat d'un tournoi jusqu'au dernier tour; renvoie les tokens consommés"""
+    debate = await debates_db.get(match.debate_id) if match.debate_id else None
+    if debate is None:
+        debate = new_debate(match.topic, match.agent1_id, match.agent2_id, match.config)
+        match.debate_id = debate.id
+        checkpoint()
+    if debate.status == DebateStatus.PENDING and not debate.started_at:
+        # Même préparation que `/start`: source récupérée et message de contexte inséré
+        # avant le premier tour, pour les deux agents
+        if await begin_debate(debate) == SourceStatus.IRRELEVANT:
+            raise RuntimeError(IRRELEVANT_SOURCE)
+    while await autorun_turn(debate.id, lambda event: None):
+        pass
+    debate = await debates_db.get(debate.id)
+    return sum(message.tokens_used or 0 for message in debate.messages)
+
+
+tournament_runner = TournamentRunner(play_match, tournament_store, lambda: persistence_worker.mark_dirty("tournaments"))
+
+
+def get_tournament_or_404(tournament_id: str) -> Tournament:
+    tournament = tournament_runner.get(tournament_id)
+    if tournament is None:
+        raise HTTPException(status_code=404, detail="Tournoi non trouvé")
+    return tournament
+
+
+@app.post("/tournaments")
+async def create_tournament(request: TournamentCreateRequest):
+    """Créer et lancer un tournoi (débats explicites et/ou toutes paires d'agents × sujets)"""
+    import uuid
+    agent_ids = request.agent_ids if request.agent_ids is not None else list(agents_db)
+    matches = build_matches(request, agent_ids)
+    if not matches:
+        raise HTTPException(status_code=400, detail="Le tournoi ne contient aucun débat")
+    for match in matches:
+        for agent_id in (match.agent1_id, match.agent2_id):
+            if agent_id not in agents_db:
+                raise HTTPException(status_code=404, detail=f"Agent non trouvé: {agent_id}")
+
+    tournament = Tournament(
+        id=str(uuid.uuid4()),
+        name=request.name,
+        concurrency=request.concurrency,
+        matches=matches
+    )
+    tournament_runner.start(tournament)
+    return tournament_runner.summary(tournament)
+
+
+@app.get("/tournaments")
+async def list_tournaments():
+    """Liste des tournois et leur progression"""
+    return [tournament_runner.summary(t) for t in tournament_runner.tournaments.values()]
+
+
+@app.get("/tournaments/{tournament_id}")
+async def get_tournament(tournament_id: str, include_matches: bool = False):
+    """Progression et débit d'un tournoi (détail des débats avec `include_matches`)"""
+    tournament = get_tournament_or_404(tournament_id)
+    summary = tournament_runner.summary(tournament)
+    if include_matches:
+        summary["match_list"] = tournament.matches
+    return summary
+
+
+@app.post("/tournaments/{tournament_id}/cancel")
+async def cancel_tournament(tournament_id: str):
+    """Annuler un tournoi (les débats en cours sont interrompus et pourront être repris)"""
+    tournament = get_tournament_or_404(tournament_id)
+    try:
+        await tournament_runner.cancel(tournament_id)
+    except KeyError:
+        raise HTTPException(status_code=409, detail="Le tournoi n'est pas en cours")
+    return tournament_runner.summary(tournament)
+
+
+@app.post("/tournaments/{tournament_id}/resume")
+async def resume_tournament(tournament_id: str, retry_failed: bool = False):
+    """Reprendre un tournoi annulé ou interrompu (débats en attente et en cours, et en échec avec `retry_failed`)"""
+    tournament = get_tournament_or_404(tournament_id)
+    if tournament_runner.is_running(tournament_id):
+        raise HTTPException(status_code=409, detail="Le tournoi est déjà en cours")
+    if retry_failed:
+        tournament_runner.reset_failed(tournament)
+    tournament_runner.start(tournament)
+    return tournament_runner.summary(tournament)
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001)
@@ -20,6 +20,14 @@ class DebateStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class SourceStatus(str, Enum):
+    """État de la récupération de la source d'un débat (lancée à sa création)"""
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+    IRRELEVANT = "irrelevant"
+
+
 class DebateMessage(BaseModel):
     """Message dans un débat"""
     id: Optional[str] = None
@@ -30,6 +38,12 @@ class DebateMessage(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now)
     turn_number: int
     tokens_used: Optional[int] = None
+    # Durée de génération (secondes) et troncature par la limite de temps du tour
+    generation_time: Optional[float] = None
+    truncated: bool = False
+    # Tokens d'entrée de l'appel, dont ceux servis depuis le cache de prompts du fournisseur
+    input_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
     
     class Config:
         use_enum_values = True
@@ -80,6 +94,10 @@ class Debate(BaseModel):
     completed_at: Optional[datetime] = None
     # Texte extrait de la source (si fournie) et ajouté au contexte
     source_text: Optional[str] = None
+    # Empreinte du texte dans le cache des sources (texte partagé, non persisté avec le débat)
+    source_hash: Optional[str] = None
+    # Récupération de la source (None si le débat n'a pas de source)
+    source_status: Optional[SourceStatus] = None
     
     class Config:
         use_enum_values = True
@@ -0,0 +1,72 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from datetime import datetime
+from enum import Enum
+
+
+class MatchStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class TournamentStatus(str, Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+class TournamentMatchRequest(BaseModel):
+    """Débat explicite d'un tournoi"""
+    agent1_id: str
+    agent2_id: str
+    topic: str
+    config: Optional[Dict] = None
+
+
+class TournamentCreateRequest(BaseModel):
+    """Requête pour créer un tournoi.
+
+    Les débats sont la liste explicite `matches`, et/ou toutes les paires d'agents de
+    `agent_ids` (tous les agents par défaut) sur chaque sujet de `topics`.
+    """
+    name: Optional[str] = None
+    topics: List[str] = Field(default_factory=list, description="Sujets du tournoi (toutes paires d'agents)")
+    agent_ids: Optional[List[str]] = Field(default=None, description="Agents du tournoi (tous par défaut)")
+    both_sides: bool = Field(default=True, description="Chaque paire débat dans les deux positions")
+    config: Optional[Dict] = Field(default=None, description="Configuration commune des débats")
+    matches: List[TournamentMatchRequest] = Field(default_factory=list, description="Débats explicites")
+    concurrency: int = Field(default=4, ge=1, le=256, description="Débats simultanés")
+
+
+class TournamentMatch(BaseModel):
+    """Débat d'un tournoi et son résultat"""
+    id: str
+    agent1_id: str
+    agent2_id: str
+    topic: str
+    config: Dict = Field(default_factory=dict)
+    status: MatchStatus = MatchStatus.PENDING
+    debate_id: Optional[str] = None
+    tokens_used: int = 0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        use_enum_values = True
+
+
+class Tournament(BaseModel):
+    """Tournoi: ensemble de débats exécutés par le planificateur"""
+    id: str
+    name: Optional[str] = None
+    status: TournamentStatus = TournamentStatus.RUNNING
+    concurrency: int = 4
+    matches: List[TournamentMatch] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        use_enum_values = True
@@ -1,11 +1,17 @@
 # Charger les variables d'environnement
 import os
-from typing import Dict, Any, AsyncIterator
+import json
+from typing import Dict, Any, AsyncIterator, Optional
 import asyncio
+from contextlib import aclosing
 from pathlib import Path
+import httpx
 from backend.models.agent import AgentConfig, AIProvider
 from backend.models.debate import Debate
+from backend.services.completion_cache import CompletionCache
+from backend.services.deadline import TurnDeadline
 from backend.services.prompt_builder import PromptBuilder
+from backend.services.rate_limiter import ProviderSlot, RateLimiter
 from dotenv import load_dotenv
 
 # Charger les variables d'environnement depuis backend/.env si présent
@@ -18,6 +24,34 @@ else:
     load_dotenv()
 
 
+class PromptCacheStats:
+    """Tokens d'entrée des appels aux fournisseurs, dont ceux servis depuis leur cache de prompts"""
+
+    def __init__(self):
+        self.providers: Dict[str, Dict[str, int]] = {}
+
+    def record(self, provider: str, usage: Dict[str, Any]):
+        if not usage or usage.get("input_tokens") is None:
+            return
+        entry = self.providers.setdefault(
+            getattr(provider, "value", provider),
+            {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "cache_write_tokens": 0}
+        )
+        entry["calls"] += 1
+        entry["input_tokens"] += usage.get("input_tokens") or 0
+        entry["cached_tokens"] += usage.get("cached_tokens") or 0
+        entry["cache_write_tokens"] += usage.get("cache_write_tokens") or 0
+
+    def to_dict(self) -> dict:
+        return {
+            provider: {
+                **entry,
+                "hit_ratio": round(entry["cached_tokens"] / entry["input_tokens"], 3) if entry["input_tokens"] else 0.0,
+            }
+            for provider, entry in self.providers.items()
+        }
+
+
 class AIService:
     """Service pour gérer les appels aux différentes API d'IA"""
     
@@ -25,6 +59,24 @@ class AIService:
         self.openai_client = None
         self.anthropic_client = None
         self.google_client = None
+        self.mistral_client = None
+        self.google_api_key = None
+        self.google_base_url = os.getenv("GOOGLE_API_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+        
+        # Pool de connexions HTTP partagé par les clients asynchrones (keep-alive)
+        self.http_client = self._build_http_client()
+
+        # Contrôle d'admission par fournisseur (concurrence, requêtes/min, tokens/min)
+        self.limiter = RateLimiter.from_env()
+
+        # Indications de mise en cache du préfixe des prompts (Anthropic `cache_control`);
+        # OpenAI, Mistral et Gemini mettent en cache les préfixes communs automatiquement
+        self.prompt_cache = os.getenv("PROMPT_CACHE", "true").lower() in ("1", "true", "yes")
+        self.cache_stats = PromptCacheStats()
+
+        # Réponses des agents déterministes (température 0) rejouées sans appel au fournisseur
+        # (désactivé par défaut, COMPLETION_CACHE=true)
+        self.completion_cache = CompletionCache.from_env()
         
         # Initialiser le générateur de prompts
         self.prompt_builder = PromptBuilder()
@@ -32,95 +84,366 @@ class AIService:
         # Initialiser les clients uniquement si les clés sont disponibles
         self._init_clients()
     
+    @staticmethod
+    def _build_http_client() -> httpx.AsyncClient:
+        """Client HTTP asynchrone partagé: connexions persistantes réutilisées entre les débats"""
+        max_connections = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "100"))
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=float(os.getenv("AI_HTTP_KEEPALIVE_EXPIRY", "60"))
+            ),
+            timeout=httpx.Timeout(
+                float(os.getenv("AI_HTTP_READ_TIMEOUT", "120")),
+                connect=float(os.getenv("AI_HTTP_CONNECT_TIMEOUT", "10"))
+            )
+        )
+
+    async def aclose(self):
+        """Fermer le pool de connexions (arrêt de l'application)"""
+        await self.http_client.aclose()
+
     def _init_clients(self):
         """Initialiser les clients API"""
         
-        # OpenAI
+        # OpenAI (client asynchrone: le streaming ne bloque pas la boucle d'événements)
         openai_key = os.getenv("OPENAI_API_KEY")
         if openai_key and openai_key != "your_openai_key_here":
             try:
                 import openai
-                # Première tentative: nouvel API client
-                try:
-                    self.openai_client = openai.OpenAI(api_key=openai_key)
-                    print("✅ Client OpenAI initialisé (openai.OpenAI)")
-                except Exception:
-                    # Fallback: affecter la clé au module historique
-                    try:
-                        openai.api_key = openai_key 
-                        self.openai_client = openai
-                        print("✅ Client OpenAI initialisé (openai.api_key fallback)")
-                    except Exception as e:
-                        raise e
+                self.openai_client = openai.AsyncOpenAI(api_key=openai_key, http_client=self.http_client)
+                print("✅ Client OpenAI initialisé (openai.AsyncOpenAI)")
             except Exception as e:
                 print(f"⚠️ Erreur initialisation OpenAI: {e}")
         else:
             print("ℹ️ OPENAI_API_KEY non défini — initialisation OpenAI ignorée")
         
-        # Anthropic
+        # Anthropic (client asynchrone sur le pool partagé)
         anthropic_key = os.getenv("ANTHROPIC_API_KEY")
         if anthropic_key and anthropic_key != "your_anthropic_key_here":
             try:
                 import anthropic
-                self.anthropic_client = anthropic.Anthropic(api_key=anthropic_key)
-                print("✅ Client Anthropic initialisé")
+                try:
+                    self.anthropic_client = anthropic.AsyncAnthropic(api_key=anthropic_key, http_client=self.http_client)
+                except TypeError:
+                    # Versions du SDK basées sur un autre client HTTP: conserver le pool interne du SDK
+                    self.anthropic_client = anthropic.AsyncAnthropic(api_key=anthropic_key)
+                print("✅ Client Anthropic initialisé (anthropic.AsyncAnthropic)")
             except Exception as e:
                 print(f"⚠️ Erreur initialisation Anthropic: {e}")
         
-        # Google
+        # Google (API REST Gemini appelée directement via le pool partagé)
         google_key = os.getenv("GOOGLE_API_KEY")
         if google_key and google_key != "your_google_key_here":
+            self.google_api_key = google_key
+            self.google_client = self.http_client
+            print("✅ Client Google initialisé (API REST Gemini)")
+
+        # Mistral (API compatible OpenAI, même pool de connexions)
+        mistral_key = os.getenv("MISTRAL_API_KEY")
+        if mistral_key and mistral_key != "your_mistral_key_here":
             try:
-                import google.generativeai as genai
-                genai.configure(api_key=google_key)
-                self.google_client = genai
-                print("✅ Client Google initialisé")
+                import openai
+                self.mistral_client = openai.AsyncOpenAI(
+                    api_key=mistral_key,
+                    base_url=os.getenv("MISTRAL_BASE_URL", "https://api.mistral.ai/v1"),
+                    http_client=self.http_client
+                )
+                print("✅ Client Mistral initialisé (API compatible OpenAI)")
             except Exception as e:
-                print(f"⚠️ Erreur initialisation Google: {e}")
-    
-   
+                print(f"⚠️ Erreur initialisation Mistral: {e}")
 
-    async def generate_response_stream(
+    @staticmethod
+    def _force_mock() -> bool:
+        """Option de debug: forcer les réponses simulées"""
+        return os.getenv("FORCE_MOCK_STREAM", "false").lower() in ("1", "true", "yes")
+
+    async def generate_response(
         self,
         agent: AgentConfig,
         system_prompt: str,
         user_prompt: str,
         conversation_history: list = None,
+        debate: Debate = None,
+        deadline: Optional[TurnDeadline] = None
+    ) -> Dict[str, Any]:
+        """
+        Génère une réponse complète en un seul appel (sans streaming ni framing SSE).
+        Retourne {"content", "tokens_used", "input_tokens", "output_tokens"}.
+
+        Avec une échéance (`deadline`), la réponse est lue en streaming afin de conserver
+        le texte déjà produit si la limite de temps du tour est atteinte; la réponse
+        indique alors aussi `truncated`.
+        """
+        if conversation_history is None:
+            conversation_history = []
+
+        if deadline is not None and deadline.expires_at is not None:
+            return await self._generate_response_within(
+                deadline, agent, system_prompt, user_prompt, conversation_history, debate
+            )
+
+        if self._force_mock():
+            return self._generate_mock_response(agent, user_prompt)
+
+        system_prompt = self._system_prompt(agent, system_prompt, debate)
+
+        key = self._completion_key(agent, system_prompt, user_prompt, conversation_history)
+        if key is not None:
+            entry = await self.completion_cache.get(key)
+            if entry is not None:
+                return self._response("".join(entry["chunks"]), 0, 0)
+
+        slot = await self.acquire_slot(agent, system_prompt, user_prompt, conversation_history)
+        response = None
+        try:
+            response = await self._dispatch_response(agent, system_prompt, user_prompt, conversation_history)
+            if key is not None:
+                await self.completion_cache.put(key, [response["content"]], response)
+            return response
+        finally:
+            slot.release(response["tokens_used"] if response else None)
+            if response:
+                self.cache_stats.record(agent.ai_provider, response)
+
+    async def _generate_response_within(
+        self,
+        deadline: TurnDeadline,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list,
         debate: Debate = None
+    ) -> Dict[str, Any]:
+        """Réponse complète bornée par `deadline`: texte partiel conservé à l'échéance"""
+        usage: Dict[str, int] = {}
+        parts = []
+        stream = self.generate_response_stream(
+            agent, system_prompt, user_prompt, conversation_history, debate, usage=usage
+        )
+        async with aclosing(deadline.iterate(stream)) as chunks:
+            async for chunk in chunks:
+                parts.append(chunk)
+        content = "".join(parts)
+        if usage:
+            response = self._response(
+                content, usage.get("input_tokens", 0), usage.get("output_tokens", 0),
+                usage.get("cached_tokens", 0), usage.get("cache_write_tokens", 0)
+            )
+        else:
+            # Flux interrompu avant le rapport de consommation du fournisseur
+            response = {"content": content, "tokens_used": None, "input_tokens": None, "output_tokens": None}
+        response["truncated"] = deadline.expired
+        return response
+
+    async def _dispatch_response(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list
+    ) -> Dict[str, Any]:
+        if agent.ai_provider == AIProvider.OPENAI:
+            return await self._generate_chat_completion(
+                self.openai_client, "OpenAI", agent, system_prompt, user_prompt, conversation_history
+            )
+        elif agent.ai_provider == AIProvider.ANTHROPIC:
+            return await self._generate_anthropic_response(agent, system_prompt, user_prompt, conversation_history)
+        elif agent.ai_provider == AIProvider.GOOGLE:
+            return await self._generate_google_response(agent, system_prompt, user_prompt, conversation_history)
+        elif agent.ai_provider == AIProvider.MISTRAL:
+            return await self._generate_chat_completion(
+                self.mistral_client, "Mistral", agent, system_prompt, user_prompt, conversation_history
+            )
+        return self._generate_mock_response(agent, user_prompt)
+
+    @staticmethod
+    def estimate_tokens(agent: AgentConfig, system_prompt: str, user_prompt: str, conversation_history: list = None) -> int:
+        """Estimation de la consommation d'un appel (≈ 4 caractères par token + réponse maximale)"""
+        characters = len(system_prompt or "") + len(user_prompt or "")
+        characters += sum(len(str(entry.get("content", ""))) for entry in conversation_history or [])
+        return characters // 4 + agent.max_tokens
+
+    async def acquire_slot(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list = None
+    ) -> Optional[ProviderSlot]:
+        """Obtenir une place auprès du limiteur du fournisseur de l'agent.
+
+        Lève `AdmissionRejected` si la file d'attente est pleine ou si l'attente dépasserait
+        le délai maximal. Renvoie None en mode simulé ou si la réponse est dans le cache
+        des réponses (aucun fournisseur appelé).
+        """
+        if self._force_mock():
+            return None
+        key = self._completion_key(agent, system_prompt, user_prompt, conversation_history)
+        if key is not None and self.completion_cache.contains(key):
+            return None
+        return await self.limiter.acquire(
+            agent.ai_provider,
+            agent.model,
+            self.estimate_tokens(agent, system_prompt, user_prompt, conversation_history)
+        )
+
+    def _completion_key(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list = None
+    ) -> Optional[str]:
+        """Clé de la requête dans le cache des réponses, ou None (cache désactivé, agent non déterministe)"""
+        if self.completion_cache is None:
+            return None
+        return self.completion_cache.key(agent, system_prompt, user_prompt, conversation_history)
+
+    def _system_prompt(self, agent: AgentConfig, system_prompt: Optional[str], debate: Debate = None) -> str:
+        """Prompt système de l'appel: celui de l'appelant (identique d'un tour à l'autre) ou,
+        à défaut, le prompt générique de l'agent, sans l'instruction du tour"""
+        return system_prompt or self.prompt_builder.build_agent_prompt(agent, None, debate)
+
+    @staticmethod
+    def _response(
+        content: str,
+        input_tokens: int,
+        output_tokens: int,
+        cached_tokens: int = 0,
+        cache_write_tokens: int = 0
+    ) -> Dict[str, Any]:
+        """Réponse complète; `input_tokens` inclut les tokens lus (`cached_tokens`) et écrits
+        (`cache_write_tokens`) dans le cache de prompts du fournisseur"""
+        return {
+            "content": content,
+            "tokens_used": input_tokens + output_tokens,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cached_tokens": cached_tokens,
+            "cache_write_tokens": cache_write_tokens,
+        }
+
+    async def generate_response_stream(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list = None,
+        debate: Debate = None,
+        usage: Optional[Dict[str, int]] = None,
+        slot: Optional[ProviderSlot] = None
     ) -> AsyncIterator[str]:
         """
         Génère une réponse en mode streaming (yield des tokens/segments)
         Retourne un async iterator de segments de texte.
+
+        Si `usage` est fourni, il est complété à la fin du flux avec `input_tokens` et
+        `output_tokens` tels que rapportés par le fournisseur (dernier événement du flux).
+
+        `slot` est une place déjà obtenue via `acquire_slot` (pour refuser la requête avant
+        d'ouvrir le flux SSE); sinon elle est demandée ici. Elle est libérée en fin de flux.
+
+        Une réponse présente dans le cache des réponses est rejouée sans délai, segment par
+        segment, avec une consommation nulle; une réponse complète y est enregistrée.
         """
         if conversation_history is None:
             conversation_history = []
 
+        if usage is None:
+            usage = {}
+
         # Option de debug: forcer le streaming simulé
-        force_mock = os.getenv("FORCE_MOCK_STREAM", "false").lower() in ("1", "true", "yes")
-        
-        if force_mock:
-            async for chunk in self._generate_mock_stream(agent, user_prompt):
-                yield chunk
+        if self._force_mock():
+            async with aclosing(self._generate_mock_stream(agent, user_prompt, usage)) as chunks:
+                async for chunk in chunks:
+                    yield chunk
             return
 
-        # Construire le prompt système pour les providers qui en ont besoin
-        system_prompt = self.prompt_builder.build_agent_prompt(agent, user_prompt, debate)
-        
+        system_prompt = self._system_prompt(agent, system_prompt, debate)
+
+        key = self._completion_key(agent, system_prompt, user_prompt, conversation_history)
+        if key is not None:
+            entry = await self.completion_cache.get(key)
+            if entry is not None:
+                try:
+                    usage.update(input_tokens=0, output_tokens=0, cached_tokens=0, cache_write_tokens=0)
+                    for chunk in entry["chunks"]:
+                        yield chunk
+                finally:
+                    if slot is not None:
+                        slot.release(0)
+                return
+
+        if slot is None:
+            slot = await self.acquire_slot(agent, system_prompt, user_prompt, conversation_history)
+        try:
+            parts = []
+            # Fermeture explicite: un flux abandonné (client déconnecté) coupe la connexion au fournisseur
+            async with aclosing(self._provider_stream(agent, system_prompt, user_prompt, conversation_history, usage)) as chunks:
+                async for chunk in chunks:
+                    parts.append(chunk)
+                    yield chunk
+            # Flux complet (un flux interrompu ou tronqué à l'échéance n'est pas enregistré)
+            if key is not None and usage:
+                await self.completion_cache.put(key, parts, usage)
+        finally:
+            tokens_used = usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+            slot.release(tokens_used if usage else None)
+            self.cache_stats.record(agent.ai_provider, usage)
+
+    def _provider_stream(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list,
+        usage: Dict[str, int]
+    ) -> AsyncIterator[str]:
+        """Flux du fournisseur de l'agent (renvoyé tel quel pour pouvoir être fermé par l'appelant)"""
         if agent.ai_provider == AIProvider.OPENAI:
-            async for chunk in self._generate_openai_stream(agent, system_prompt, user_prompt, conversation_history):
-                yield chunk
+            return self._generate_openai_stream(agent, system_prompt, user_prompt, conversation_history, usage)
         elif agent.ai_provider == AIProvider.ANTHROPIC:
-            async for chunk in self._generate_anthropic_stream(agent, system_prompt, user_prompt, conversation_history):
-                yield chunk
+            return self._generate_anthropic_stream(agent, system_prompt, user_prompt, conversation_history, usage)
         elif agent.ai_provider == AIProvider.GOOGLE:
-            async for chunk in self._generate_google_stream(agent, system_prompt, user_prompt, conversation_history):
-                yield chunk
-        else:
-            async for chunk in self._generate_mock_stream(agent, user_prompt):
-                yield chunk
+            return self._generate_google_stream(agent, system_prompt, user_prompt, conversation_history, usage)
+        elif agent.ai_provider == AIProvider.MISTRAL:
+            return self._generate_mistral_stream(agent, system_prompt, user_prompt, conversation_history, usage)
+        return self._generate_mock_stream(agent, user_prompt, usage)
 
-    async def _generate_mock_stream(self, agent: AgentConfig, user_prompt: str) -> AsyncIterator[str]:
+    async def _generate_mock_stream(
+        self,
+        agent: AgentConfig,
+        user_prompt: str,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
         """Streaming simulé: génère du contenu de test par chunks"""
+        test_content = self._mock_content(agent, user_prompt)
+
+        # Découper en petits morceaux de 3-5 mots pour simuler le streaming
+        words = test_content.split(' ')
+        
+        for i in range(0, len(words), 4):
+            chunk = ' '.join(words[i:i+4])
+            if i + 4 < len(words):
+                chunk += ' '  # Ajouter un espace sauf pour le dernier chunk
+            yield chunk
+            await asyncio.sleep(0.1)  # Pause pour simuler le streaming
+
+        if usage is not None:
+            # Estimation grossière (pas de fournisseur réel)
+            usage["input_tokens"] = len(user_prompt.split()) if user_prompt else 0
+            usage["output_tokens"] = len(words)
+
+    def _generate_mock_response(self, agent: AgentConfig, user_prompt: str) -> Dict[str, Any]:
+        """Réponse simulée complète (même contenu que le streaming simulé)"""
+        content = self._mock_content(agent, user_prompt)
+        return self._response(content, len(user_prompt.split()) if user_prompt else 0, len(content.split(' ')))
+
+    @staticmethod
+    def _mock_content(agent: AgentConfig, user_prompt: str) -> str:
+        """Contenu de test des réponses simulées"""
         # Si un user_prompt est fourni (ex: ouverture / réponse / clôture), l'utiliser
         if user_prompt and user_prompt.strip():
             test_content = user_prompt.strip()
@@ -134,76 +457,336 @@ class AIService:
                           "Deuxièmement, les implications économiques sont importantes. " \
                           "Troisièmement, nous devons examiner les conséquences à long terme. " \
                           "En conclusion, cette question mérite une analyse approfondie et nuancée."
-        
-        # Découper en petits morceaux de 3-5 mots pour simuler le streaming
-        words = test_content.split(' ')
-        
-        for i in range(0, len(words), 4):
-            chunk = ' '.join(words[i:i+4])
-            if i + 4 < len(words):
-                chunk += ' '  # Ajouter un espace sauf pour le dernier chunk
-            yield chunk
-            await asyncio.sleep(0.1)  # Pause pour simuler le streaming
+        return test_content
+
+    @staticmethod
+    def _chat_messages(system_prompt: str, user_prompt: str, conversation_history: list) -> list:
+        # Préfixe stable (système, historique) puis éléments propres au tour: les API
+        # compatibles OpenAI mettent en cache le plus long préfixe déjà vu
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend({"role": entry["role"], "content": entry["content"]} for entry in conversation_history)
+        messages.append({"role": "user", "content": user_prompt})
+        return messages
+
+    @staticmethod
+    def _openai_usage(usage) -> Dict[str, int]:
+        """Consommation d'une API compatible OpenAI (tokens du prompt servis depuis le cache inclus)"""
+        details = getattr(usage, "prompt_tokens_details", None)
+        return {
+            "input_tokens": usage.prompt_tokens,
+            "output_tokens": usage.completion_tokens,
+            "cached_tokens": getattr(details, "cached_tokens", None) or 0,
+        }
+
+    def _chat_completion_params(self, agent: AgentConfig, system_prompt: str, user_prompt: str, conversation_history: list) -> dict:
+        """Paramètres communs des API compatibles OpenAI (OpenAI, Mistral)"""
+        return {
+            "model": agent.model,
+            "messages": self._chat_messages(system_prompt, user_prompt, conversation_history),
+            "temperature": agent.temperature,
+            "max_tokens": agent.max_tokens,
+            "top_p": agent.top_p,
+            "presence_penalty": agent.presence_penalty,
+            "frequency_penalty": agent.frequency_penalty,
+        }
 
-    async def _generate_openai_stream(
+    async def _generate_chat_completion(
         self,
+        client,
+        label: str,
         agent: AgentConfig,
         system_prompt: str,
         user_prompt: str,
         conversation_history: list
-    ) -> AsyncIterator[str]:
-        """Utilise le streaming OpenAI si disponible."""
-        if not self.openai_client:
-            raise Exception("Client OpenAI non initialisé. Vérifiez votre clé API.")
+    ) -> Dict[str, Any]:
+        """Réponse complète d'une API compatible OpenAI"""
+        if not client:
+            raise Exception(f"Client {label} non initialisé. Vérifiez votre clé API.")
+        try:
+            completion = await client.chat.completions.create(
+                **self._chat_completion_params(agent, system_prompt, user_prompt, conversation_history)
+            )
+        except Exception as e:
+            raise Exception(f"Erreur {label}: {str(e)}")
+        content = (completion.choices[0].message.content or "") if completion.choices else ""
+        usage = self._openai_usage(completion.usage) if completion.usage else {}
+        return self._response(
+            content,
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+            usage.get("cached_tokens", 0)
+        )
 
-        messages = [{"role": "system", "content": system_prompt}]
-        messages.extend(conversation_history)
-        messages.append({"role": "user", "content": user_prompt})
+    async def _stream_chat_completion(
+        self,
+        client,
+        label: str,
+        params: dict,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        """Streaming d'une API compatible OpenAI"""
+        if not client:
+            raise Exception(f"Client {label} non initialisé. Vérifiez votre clé API.")
 
         try:
             # Demande en mode stream
-            response = self.openai_client.chat.completions.create(
-                model=agent.model,
-                messages=messages,
-                temperature=agent.temperature,
-                max_tokens=agent.max_tokens,
-                top_p=agent.top_p,
-                presence_penalty=agent.presence_penalty,
-                frequency_penalty=agent.frequency_penalty,
-                stream=True
-            )
+            response = await client.chat.completions.create(stream=True, **params)
 
-            # L'itération retourne des morceaux (delta)
-            for event in response:
-                try:
-                    # Plusieurs formes possibles selon la lib
-                    chunk = ''
-                    if hasattr(event, 'choices') and event.choices:
-                        choice = event.choices[0]
-                        if hasattr(choice, 'delta') and isinstance(choice.delta, dict):
-                            chunk = choice.delta.get('content', '')
-                        elif hasattr(choice, 'delta') and hasattr(choice.delta, 'content'):
-                            chunk = choice.delta.content or ''
-                        elif hasattr(choice, 'message') and choice.message:
-                            # fallback
-                            chunk = getattr(choice.message, 'content', '')
-                    # Si chunk vide, ignorer
+            try:
+                # L'itération asynchrone retourne des morceaux (delta) sans bloquer les autres requêtes
+                async for event in response:
+                    # Le dernier événement porte la consommation de tokens
+                    if getattr(event, "usage", None) and usage is not None:
+                        usage.update(self._openai_usage(event.usage))
+                    if not event.choices:
+                        continue
+                    chunk = event.choices[0].delta.content or ''
                     if chunk:
                         yield chunk
-                        # Petit délai pour rendre le streaming visible
-                        await asyncio.sleep(0.05)
-                except Exception:
-                    continue
+            finally:
+                # Fermer la connexion si le flux est abandonné (client déconnecté)
+                await response.close()
 
         except Exception as e:
-            raise Exception(f"Erreur OpenAI streaming: {str(e)}")
+            raise Exception(f"Erreur {label} streaming: {str(e)}")
 
-    async def _generate_anthropic_stream(self, *args, **kwargs) -> AsyncIterator[str]:
-        # Anthropic streaming non implémenté ici; fallback au mock
-        async for chunk in self._generate_mock_stream(args[0], kwargs.get('user_prompt', '')):
-            yield chunk
+    def _generate_openai_stream(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        """Utilise le streaming OpenAI si disponible."""
+        params = self._chat_completion_params(agent, system_prompt, user_prompt, conversation_history)
+        # OpenAI n'envoie la consommation en fin de flux que sur demande
+        params["stream_options"] = {"include_usage": True}
+        return self._stream_chat_completion(self.openai_client, "OpenAI", params, usage)
 
-    async def _generate_google_stream(self, *args, **kwargs) -> AsyncIterator[str]:
-        # Google streaming non implémenté ici; fallback au mock
-        async for chunk in self._generate_mock_stream(args[0], kwargs.get('user_prompt', '')):
-            yield chunk
+    def _generate_mistral_stream(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        """Streaming Mistral (la consommation figure dans le dernier segment)."""
+        params = self._chat_completion_params(agent, system_prompt, user_prompt, conversation_history)
+        return self._stream_chat_completion(self.mistral_client, "Mistral", params, usage)
+
+    @staticmethod
+    def _alternate_messages(conversation_history: list, user_prompt: str) -> list:
+        """Historique au format user/assistant strictement alterné, commençant par l'utilisateur
+        (contrainte des API Anthropic et Gemini)"""
+        messages = []
+        for entry in list(conversation_history) + [{"role": "user", "content": user_prompt}]:
+            role = "assistant" if entry.get("role") == "assistant" else "user"
+            content = entry.get("content") or ""
+            if messages and messages[-1]["role"] == role:
+                messages[-1]["content"] += "\n\n" + content
+            else:
+                messages.append({"role": role, "content": content})
+        if messages and messages[0]["role"] != "user":
+            messages.insert(0, {"role": "user", "content": "(début du débat)"})
+        return messages
+
+    @staticmethod
+    def _cached_messages(conversation_history: list, user_prompt: str) -> list:
+        """Messages Anthropic en blocs de texte, avec un point de mise en cache après la
+        dernière entrée stable de l'historique (avant les entrées `volatile` et l'instruction
+        du tour). Mêmes règles d'alternance que `_alternate_messages`."""
+        messages = []
+        breakpoint = None
+        entries = list(conversation_history) + [{"role": "user", "content": user_prompt, "volatile": True}]
+        for entry in entries:
+            role = "assistant" if entry.get("role") == "assistant" else "user"
+            content = entry.get("content") or ""
+            if not content:
+                continue
+            block = {"type": "text", "text": content}
+            if messages and messages[-1]["role"] == role:
+                messages[-1]["content"].append(block)
+            else:
+                messages.append({"role": role, "content": [block]})
+            if not entry.get("volatile"):
+                breakpoint = block
+        if not messages or messages[0]["role"] != "user":
+            messages.insert(0, {"role": "user", "content": [{"type": "text", "text": "(début du débat)"}]})
+        if breakpoint is not None:
+            breakpoint["cache_control"] = {"type": "ephemeral"}
+        return messages
+
+    def _anthropic_params(self, agent: AgentConfig, system_prompt: str, user_prompt: str, conversation_history: list) -> dict:
+        # Paramètres d'échantillonnage passés dans le corps brut: leur signature varie selon
+        # les versions du SDK. Anthropic limite la température à [0, 1].
+        sampling = {"temperature": min(agent.temperature, 1.0)}
+        if agent.top_p < 1.0:
+            sampling["top_p"] = agent.top_p
+        if self.prompt_cache:
+            system = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+            messages = self._cached_messages(conversation_history, user_prompt)
+        else:
+            system = system_prompt
+            messages = self._alternate_messages(conversation_history, user_prompt)
+        return {
+            "model": agent.model,
+            "max_tokens": agent.max_tokens,
+            "system": system,
+            "messages": messages,
+            "extra_body": sampling,
+        }
+
+    @staticmethod
+    def _anthropic_usage(usage) -> Dict[str, int]:
+        """Consommation Anthropic: `input_tokens` n'y compte que les tokens hors cache"""
+        cached = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        return {
+            "input_tokens": usage.input_tokens + cached + written,
+            "output_tokens": usage.output_tokens,
+            "cached_tokens": cached,
+            "cache_write_tokens": written,
+        }
+
+    async def _generate_anthropic_response(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list
+    ) -> Dict[str, Any]:
+        """Réponse complète Anthropic (Messages API)"""
+        if not self.anthropic_client:
+            raise Exception("Client Anthropic non initialisé. Vérifiez votre clé API.")
+        try:
+            message = await self.anthropic_client.messages.create(
+                **self._anthropic_params(agent, system_prompt, user_prompt, conversation_history)
+            )
+        except Exception as e:
+            raise Exception(f"Erreur Anthropic: {str(e)}")
+        content = "".join(block.text for block in message.content if block.type == "text")
+        usage = self._anthropic_usage(message.usage)
+        return self._response(
+            content, usage["input_tokens"], usage["output_tokens"], usage["cached_tokens"], usage["cache_write_tokens"]
+        )
+
+    async def _generate_anthropic_stream(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        """Streaming Anthropic (Messages API)."""
+        if not self.anthropic_client:
+            raise Exception("Client Anthropic non initialisé. Vérifiez votre clé API.")
+
+        params = self._anthropic_params(agent, system_prompt, user_prompt, conversation_history)
+        try:
+            async with self.anthropic_client.messages.stream(**params) as stream:
+                async for text in stream.text_stream:
+                    if text:
+                        yield text
+                # message_start porte input_tokens, message_delta le total output_tokens
+                final_message = await stream.get_final_message()
+            if usage is not None:
+                usage.update(self._anthropic_usage(final_message.usage))
+        except Exception as e:
+            raise Exception(f"Erreur Anthropic streaming: {str(e)}")
+
+    def _google_request(self, agent: AgentConfig, system_prompt: str, user_prompt: str, conversation_history: list) -> dict:
+        """Corps de requête generateContent (rôles user/model)"""
+        contents = [
+            {"role": "model" if m["role"] == "assistant" else "user", "parts": [{"text": m["content"]}]}
+            for m in self._alternate_messages(conversation_history, user_prompt)
+        ]
+        return {
+            "contents": contents,
+            "systemInstruction": {"parts": [{"text": system_prompt}]},
+            "generationConfig": {
+                "temperature": agent.temperature,
+                "topP": agent.top_p,
+                "maxOutputTokens": agent.max_tokens,
+            },
+        }
+
+    def _google_url(self, agent: AgentConfig, action: str) -> str:
+        return f"{self.google_base_url}/v1beta/models/{agent.model}:{action}"
+
+    @staticmethod
+    def _google_text(event: dict) -> str:
+        """Texte du premier candidat d'une réponse generateContent"""
+        for candidate in event.get("candidates", [])[:1]:
+            return "".join(part.get("text", "") for part in candidate.get("content", {}).get("parts", []))
+        return ""
+
+    async def _generate_google_response(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list
+    ) -> Dict[str, Any]:
+        """Réponse complète Gemini (generateContent)"""
+        if not self.google_client:
+            raise Exception("Client Google non initialisé. Vérifiez votre clé API.")
+        try:
+            response = await self.http_client.post(
+                self._google_url(agent, "generateContent"),
+                headers={"x-goog-api-key": self.google_api_key},
+                json=self._google_request(agent, system_prompt, user_prompt, conversation_history),
+            )
+            if response.status_code >= 400:
+                raise Exception(f"HTTP {response.status_code}: {response.text[:500]}")
+            data = response.json()
+        except Exception as e:
+            raise Exception(f"Erreur Google: {str(e)}")
+        metadata = data.get("usageMetadata", {})
+        return self._response(
+            self._google_text(data),
+            metadata.get("promptTokenCount", 0),
+            metadata.get("candidatesTokenCount", 0),
+            metadata.get("cachedContentTokenCount", 0)
+        )
+
+    async def _generate_google_stream(
+        self,
+        agent: AgentConfig,
+        system_prompt: str,
+        user_prompt: str,
+        conversation_history: list,
+        usage: Optional[Dict[str, int]] = None
+    ) -> AsyncIterator[str]:
+        """Streaming Gemini via l'API REST (SSE), sur le pool de connexions partagé."""
+        if not self.google_client:
+            raise Exception("Client Google non initialisé. Vérifiez votre clé API.")
+
+        try:
+            async with self.http_client.stream(
+                "POST",
+                self._google_url(agent, "streamGenerateContent"),
+                params={"alt": "sse"},
+                headers={"x-goog-api-key": self.google_api_key},
+                json=self._google_request(agent, system_prompt, user_prompt, conversation_history),
+            ) as response:
+                if response.status_code >= 400:
+                    body = await response.aread()
+                    raise Exception(f"HTTP {response.status_code}: {body.decode('utf-8', 'replace')[:500]}")
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    event = json.loads(line[5:])
+                    text = self._google_text(event)
+                    if text:
+                        yield text
+                    # usageMetadata est cumulatif: le dernier événement fait foi
+                    metadata = event.get("usageMetadata")
+                    if metadata and usage is not None:
+                        usage["input_tokens"] = metadata.get("promptTokenCount", 0)
+                        usage["output_tokens"] = metadata.get("candidatesTokenCount", 0)
+                        usage["cached_tokens"] = metadata.get("cachedContentTokenCount", 0)
+        except Exception as e:
+            raise Exception(f"Erreur Google streaming: {str(e)}")
@@ -0,0 +1,246 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+
+from backend.services.sse import sse_event
+
+# Commentaire SSE envoyé aux spectateurs inactifs (proxys qui ferment les connexions muettes)
+HEARTBEAT_FRAME = b": keepalive\n\n"
+
+
+class Spectator:
+    """Abonné d'un canal: trames en attente dans une file bornée"""
+
+    def __init__(self, max_pending: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.lagged = False
+        self.closed = False
+
+    def close(self):
+        """Terminer le flux (client déconnecté, arrêt de l'application)"""
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+
+class DebateChannel:
+    """Événements diffusés d'un débat: tampon circulaire des dernières trames et abonnés.
+
+    Chaque événement est encodé une seule fois, avec un identifiant `<époque>-<numéro>`;
+    l'époque distingue les canaux successifs d'un même débat (après éviction ou
+    redémarrage), dont les numéros ne sont pas comparables.
+    """
+
+    def __init__(self, debate_id: str, buffer_size: int):
+        self.debate_id = debate_id
+        self.epoch = uuid.uuid4().hex[:8]
+        self.events: Deque[Tuple[int, bytes]] = deque(maxlen=buffer_size)
+        self.last_seq = 0
+        self.last_publish = time.monotonic()
+        self.subscribers: List[Spectator] = []
+        self.closed = False
+        # Premier événement des tours en cours (rejoués à un nouveau spectateur)
+        self._turn_start: Optional[int] = None
+        self._open_turns = 0
+
+    def append(self, event: dict) -> bytes:
+        self.last_seq += 1
+        self.last_publish = time.monotonic()
+        frame = sse_event(event, f"{self.epoch}-{self.last_seq}")
+        self.events.append((self.last_seq, frame))
+        kind = event.get("type")
+        if kind == "turn_start":
+            if self._open_turns == 0:
+                self._turn_start = self.last_seq
+            self._open_turns += 1
+        elif kind in ("done", "turn_cancelled") and self._open_turns:
+            self._open_turns -= 1
+            if self._open_turns == 0:
+                self._turn_start = None
+        return frame
+
+    def replay(self, last_event_id: Optional[str]) -> Tuple[List[bytes], bool]:
+        """Trames à rejouer à un abonné; le booléen indique une reprise après `last_event_id`"""
+        start = None
+        if last_event_id:
+            epoch, _, seq = last_event_id.partition("-")
+            oldest = self.events[0][0] if self.events else self.last_seq + 1
+            if epoch == self.epoch and seq.isdigit() and oldest - 1 <= int(seq) <= self.last_seq:
+                start = int(seq) + 1
+        resumed = start is not None
+        if start is None:
+            # Nouveau spectateur (ou reprise impossible): le tour en cours depuis son début
+            start = self._turn_start if self._turn_start is not None else self.last_seq + 1
+        return [frame for seq, frame in self.events if seq >= start], resumed
+
+
+class DebateBroadcaster:
+    """Diffusion en direct des débats à de nombreux spectateurs (SSE).
+
+    Les événements d'un débat (début de tour, segments, messages enregistrés) sont
+    publiés une seule fois dans son canal, puis copiés dans la file bornée de chaque
+    spectateur: la génération est partagée, quel que soit le nombre d'abonnés. Un
+    spectateur dont la file déborde est détaché (événement `lagged`); il se reconnecte
+    avec `Last-Event-ID` et rattrape son retard depuis le tampon circulaire du canal.
+
+    Au plus `max_channels` canaux sont conservés; les moins récemment utilisés sans
+    abonné sont évincés.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 1024,
+        max_pending: int = 256,
+        max_channels: int = 1024,
+        heartbeat: float = 15.0
+    ):
+        self.buffer_size = buffer_size
+        self.max_pending = max_pending
+        self.max_channels = max_channels
+        self.heartbeat = heartbeat
+        self._channels: "OrderedDict[str, DebateChannel]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.events = 0
+        self.frames_delivered = 0
+        self.lagged = 0
+        self.resumed = 0
+
+    async def start(self):
+        """Démarrer l'envoi périodique des keepalive (à appeler depuis le lifespan de l'application)"""
+        if self._task is None and self.heartbeat > 0:
+            self._task = asyncio.create_task(self._run_heartbeat(), name="broadcast-heartbeat")
+
+    async def _run_heartbeat(self):
+        # Une seule tâche pour tous les spectateurs, plutôt qu'un délai d'attente par flux
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            idle_since = time.monotonic() - self.heartbeat
+            for channel in list(self._channels.values()):
+                if channel.last_publish <= idle_since:
+                    for spectator in list(channel.subscribers):
+                        if not spectator.queue.full():
+                            spectator.queue.put_nowait(HEARTBEAT_FRAME)
+
+    def _channel(self, debate_id: str) -> DebateChannel:
+        channel = self._channels.get(debate_id)
+        if channel is None:
+            channel = DebateChannel(debate_id, self.buffer_size)
+            self._channels[debate_id] = channel
+            self._evict_if_needed()
+        else:
+            self._channels.move_to_end(debate_id)
+        return channel
+
+    def _evict_if_needed(self):
+        if len(self._channels) <= self.max_channels:
+            return
+        for debate_id, channel in list(self._channels.items()):
+            if len(self._channels) <= self.max_channels:
+                break
+            if not channel.subscribers:
+                del self._channels[debate_id]
+
+    def publish(self, debate_id: str, event: dict, final: bool = False):
+        """Diffuser un événement; `final` termine les flux des spectateurs (débat terminé)"""
+        channel = self._channel(debate_id)
+        frame = channel.append(event)
+        channel.closed = final
+        self.events += 1
+        for spectator in list(channel.subscribers):
+            self._deliver(channel, spectator, frame)
+        if final:
+            for spectator in list(channel.subscribers):
+                self._deliver(channel, spectator, None)
+
+    def _deliver(self, channel: DebateChannel, spectator: Spectator, frame: Optional[bytes]):
+        try:
+            spectator.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Spectateur trop lent: détaché, il rattrapera via Last-Event-ID
+            spectator.lagged = True
+            channel.subscribers.remove(spectator)
+            self.lagged += 1
+            return
+        if frame is not None:
+            self.frames_delivered += 1
+
+    async def subscribe(
+        self,
+        debate_id: str,
+        last_event_id: Optional[str] = None,
+        status: Optional[dict] = None,
+        follow: bool = True,
+        disconnected: Optional["asyncio.Future"] = None
+    ) -> AsyncIterator[bytes]:
+        """Trames SSE du débat: rattrapage depuis le tampon, puis événements en direct.
+
+        Sans reprise possible, `status` (état courant du débat) est envoyé en premier.
+        Sans `follow` (débat terminé), le flux s'arrête après le rattrapage; il s'arrête
+        aussi dès que `disconnected` est terminé. Les trames en attente sont envoyées
+        ensemble, en un seul bloc.
+        """
+        # Rattrapage et inscription sans attente intermédiaire: aucun événement perdu
+        channel = self._channel(debate_id)
+        frames, resumed = channel.replay(last_event_id)
+        spectator = Spectator(self.max_pending)
+        if resumed:
+            self.resumed += 1
+        else:
+            if last_event_id:
+                frames.insert(0, sse_event({"type": "resync", "detail": "Événements manquants: recharger le débat"}))
+            if status is not None:
+                frames.insert(0, sse_event(status))
+        live = follow and not channel.closed
+        if live:
+            channel.subscribers.append(spectator)
+            if disconnected is not None:
+                disconnected.add_done_callback(lambda _: spectator.close())
+        try:
+            if frames:
+                yield b"".join(frames)
+            if not live:
+                return
+            while True:
+                if spectator.lagged and spectator.queue.empty():
+                    yield sse_event({"type": "lagged", "detail": "Flux trop lent: se reconnecter avec Last-Event-ID"})
+                    return
+                batch = [await spectator.queue.get()]
+                while not spectator.queue.empty():
+                    batch.append(spectator.queue.get_nowait())
+                end = None in batch
+                if end:
+                    batch = batch[:batch.index(None)]
+                if spectator.closed:
+                    return
+                if batch:
+                    yield b"".join(batch)
+                if end:
+                    return
+        finally:
+            if spectator in channel.subscribers:
+                channel.subscribers.remove(spectator)
+
+    async def shutdown(self):
+        """Terminer les flux de tous les spectateurs (arrêt de l'application)"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for channel in self._channels.values():
+            channel.closed = True
+            for spectator in list(channel.subscribers):
+                spectator.close()
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._channels),
+            "spectators": sum(len(channel.subscribers) for channel in self._channels.values()),
+            "events": self.events,
+            "frames_delivered": self.frames_delivered,
+            "lagged": self.lagged,
+            "resumed": self.resumed,
+        }
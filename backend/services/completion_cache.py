@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from backend.models.agent import AgentConfig
+
+# Version du format des clés et des entrées (à incrémenter pour invalider le cache)
+CACHE_FORMAT = 1
+
+
+def _normalize(text: Optional[str]) -> str:
+    """Texte sans différences insignifiantes (fins de ligne, espaces en fin de ligne ou de texte)"""
+    lines = (text or "").replace("\r\n", "\n").strip().split("\n")
+    return "\n".join(line.rstrip() for line in lines)
+
+
+class CompletionCache:
+    """Cache adressé par contenu des réponses des agents déterministes (température 0).
+
+    La clé est l'empreinte SHA-256 de la requête normalisée (fournisseur, modèle,
+    paramètres d'échantillonnage, prompt système, historique, prompt du tour). Deux
+    niveaux: LRU en mémoire (`memory_size` entrées), puis un fichier JSON par entrée dans
+    `directory`, valable `ttl` secondes, le volume total étant limité à `max_bytes` (les
+    entrées les plus anciennes sont supprimées). Les accès disque ont lieu hors de la
+    boucle d'événements.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        memory_size: int = 256,
+        ttl: float = 7 * 24 * 3600,
+        max_bytes: int = 64 * 1024 * 1024
+    ):
+        self.directory = Path(directory) if directory else None
+        self.memory_size = memory_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["CompletionCache"]:
+        """Cache configuré par l'environnement, ou None s'il n'est pas activé (COMPLETION_CACHE)"""
+        if os.getenv("COMPLETION_CACHE", "false").lower() not in ("1", "true", "yes"):
+            return None
+        directory = os.getenv("COMPLETION_CACHE_DIR", str(Path(__file__).resolve().parents[1] / "data" / "completions"))
+        return cls(
+            directory or None,
+            memory_size=int(os.getenv("COMPLETION_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("COMPLETION_CACHE_TTL", str(7 * 24 * 3600))),
+            max_bytes=int(os.getenv("COMPLETION_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        )
+
+    @staticmethod
+    def key(agent: AgentConfig, system_prompt: str, user_prompt: str, conversation_history: list) -> Optional[str]:
+        """Clé de la requête, ou None si la réponse de l'agent n'est pas déterministe"""
+        if agent.temperature != 0:
+            return None
+        request = {
+            "format": CACHE_FORMAT,
+            "provider": getattr(agent.ai_provider, "value", agent.ai_provider),
+            "model": agent.model,
+            "max_tokens": agent.max_tokens,
+            "top_p": agent.top_p,
+            "presence_penalty": agent.presence_penalty,
+            "frequency_penalty": agent.frequency_penalty,
+            "system": _normalize(system_prompt),
+            "history": [[entry.get("role"), _normalize(entry.get("content"))] for entry in conversation_history or []],
+            "user": _normalize(user_prompt),
+        }
+        encoded = json.dumps(request, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get("created", 0) <= self.ttl
+
+    def contains(self, key: str) -> bool:
+        """Réponse probablement disponible (entrée en mémoire ou fichier présent), sans la lire"""
+        entry = self._memory.get(key)
+        if entry is not None:
+            return self._fresh(entry)
+        return self.directory is not None and self._path(key).exists()
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Entrée `{"chunks", "input_tokens", "output_tokens", "created"}`, ou None"""
+        entry = self._memory.get(key)
+        if entry is not None and self._fresh(entry):
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+        else:
+            if entry is not None:
+                del self._memory[key]
+            entry = await asyncio.to_thread(self._read, key) if self.directory is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.disk_hits += 1
+        self.tokens_saved += (entry.get("input_tokens") or 0) + (entry.get("output_tokens") or 0)
+        return entry
+
+    async def put(self, key: str, chunks: List[str], usage: Dict[str, int]):
+        """Enregistrer une réponse complète et sa consommation"""
+        entry = {
+            "chunks": chunks,
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+            "created": time.time(),
+        }
+        self._remember(key, entry)
+        self.stores += 1
+        if self.directory is not None:
+            await asyncio.to_thread(self._write, key, entry)
+
+    # ===== Niveau disque (exécuté dans un thread) =====
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not self._fresh(entry):
+            with self._disk_lock:
+                self._unlink(path)
+            return None
+        return entry
+
+    def _unlink(self, path: Path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        if self._disk_bytes is not None:
+            self._disk_bytes -= size
+
+    def _files(self) -> List[Path]:
+        return [path for path in self.directory.glob("*/*.json")]
+
+    def _write(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(p.stat().st_size for p in self._files()) if self.directory.exists() else 0
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                self._unlink(path)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Supprimer les entrées expirées, puis les plus anciennes jusqu'à 90 % de `max_bytes`"""
+        files = []
+        for path in self._files():
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                pass
+        files.sort()
+        expired_before = time.time() - self.ttl
+        target = self.max_bytes * 0.9
+        for mtime, path in files:
+            if mtime >= expired_before and self._disk_bytes <= target:
+                break
+            self._unlink(path)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "tokens_saved": self.tokens_saved,
+        }
@@ -0,0 +1,249 @@
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from backend.models.agent import AgentConfig
+from backend.models.debate import Debate, DebateMessage, MessageRole
+from backend.services.prompt_builder import PromptBuilder
+
+try:
+    import tiktoken
+except Exception:
+    tiktoken = None
+
+# Surcoût de chaque message de l'historique (rôle, délimiteurs), en tokens
+MESSAGE_OVERHEAD = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+class TokenCounter:
+    """Compte de tokens par fournisseur et modèle.
+
+    Tokenizer exact pour OpenAI si `tiktoken` est installé; sinon, estimation par
+    nombre de caractères, avec un ratio propre au fournisseur (texte en français).
+    """
+
+    CHARS_PER_TOKEN = {"openai": 4.0, "anthropic": 3.5, "google": 4.0, "mistral": 3.5}
+    DEFAULT_CHARS_PER_TOKEN = 3.5
+
+    def __init__(self):
+        self._encodings: Dict[str, object] = {}
+
+    def key(self, provider: str, model: str) -> str:
+        """Identifiant du tokenizer: deux modèles de même clé comptent les tokens à l'identique"""
+        provider = getattr(provider, "value", provider)
+        if provider == "openai" and tiktoken is not None:
+            try:
+                name = tiktoken.encoding_for_model(model).name
+            except KeyError:
+                name = "o200k_base"
+            return f"tiktoken:{name}"
+        return f"chars:{self.CHARS_PER_TOKEN.get(provider, self.DEFAULT_CHARS_PER_TOKEN)}"
+
+    def count(self, text: str, key: str) -> int:
+        kind, _, value = key.partition(":")
+        if kind == "tiktoken":
+            encoding = self._encodings.get(value)
+            if encoding is None:
+                encoding = self._encodings[value] = tiktoken.get_encoding(value)
+            return len(encoding.encode(text, disallowed_special=()))
+        return int(len(text) / float(value)) + 1
+
+
+class DebateContext:
+    """Résumé glissant d'un débat pour un tokenizer donné.
+
+    Les messages des tours sont résumés dans l'ordre, de façon définitive: `folded`
+    compte les messages déjà résumés, `folded_id` identifie le dernier (pour détecter
+    une transcription modifiée, qui impose de reconstruire le résumé).
+    """
+
+    def __init__(self):
+        self.folded = 0
+        self.folded_id: Optional[str] = None
+        # Entrées du résumé: [texte, tokens, message résumé]
+        self.entries: List[list] = []
+        self.compressed = 0
+        self.omitted = 0
+        self.summary_tokens = 0
+        self.counts: Dict[str, int] = {}
+
+
+class ContextWindow:
+    """Historique de conversation borné en tokens.
+
+    Les messages de contexte (source du débat) sont toujours transmis; les derniers
+    messages des tours sont gardés tels quels tant qu'ils tiennent dans `history_budget`.
+    Au-delà, les plus anciens sont repliés dans un résumé extractif (premières phrases
+    de chaque intervention), mis à jour uniquement avec les messages nouvellement
+    repliés et conservé par débat; le résumé lui-même est borné par `summary_budget`
+    (entrées abrégées, puis omises). Le repli descend sous `fold_ratio` du budget pour
+    que le résumé, et donc le début du prompt, ne change pas à chaque tour.
+
+    `history_budget` à 0 désactive la limite (historique complet).
+    """
+
+    def __init__(
+        self,
+        history_budget: int = 4000,
+        summary_budget: int = 800,
+        min_recent: int = 2,
+        fold_ratio: float = 0.75,
+        entry_chars: int = 280,
+        max_debates: int = 256
+    ):
+        self.history_budget = history_budget
+        self.summary_budget = summary_budget
+        self.min_recent = min_recent
+        self.fold_ratio = fold_ratio
+        self.entry_chars = entry_chars
+        self.max_debates = max_debates
+        self.counter = TokenCounter()
+        self._contexts: "OrderedDict[Tuple[str, str], DebateContext]" = OrderedDict()
+        self.builds = 0
+        self.rebuilds = 0
+        self.messages_folded = 0
+        self.history_tokens_total = 0
+        self.history_tokens_max = 0
+
+    def _context(self, debate_id: str, key: str) -> DebateContext:
+        context = self._contexts.get((debate_id, key))
+        if context is None:
+            context = self._contexts[(debate_id, key)] = DebateContext()
+            while len(self._contexts) > self.max_debates:
+                self._contexts.popitem(last=False)
+        else:
+            self._contexts.move_to_end((debate_id, key))
+        return context
+
+    def _tokens(self, context: DebateContext, message: DebateMessage, key: str) -> int:
+        if message.id is None:
+            return self.counter.count(message.content, key) + MESSAGE_OVERHEAD
+        tokens = context.counts.get(message.id)
+        if tokens is None:
+            tokens = context.counts[message.id] = self.counter.count(message.content, key) + MESSAGE_OVERHEAD
+        return tokens
+
+    def _gist(self, content: str, limit: int) -> str:
+        """Premières phrases d'une intervention, dans la limite de `limit` caractères"""
+        text = " ".join(content.split())
+        gist = ""
+        for sentence in _SENTENCE_END.split(text):
+            if gist and len(gist) + len(sentence) + 1 > limit:
+                break
+            gist = f"{gist} {sentence}" if gist else sentence
+        if len(gist) > limit:
+            gist = gist[:limit - 1].rstrip() + "…"
+        return gist
+
+    def _entry(self, message: DebateMessage, speakers: Dict[str, str], limit: int) -> str:
+        speaker = speakers.get(message.role, message.role)
+        return f"- {speaker} (tour {message.turn_number + 1}): {self._gist(message.content, limit)}"
+
+    def _fold(self, context: DebateContext, message: DebateMessage, speakers: Dict[str, str], key: str):
+        text = self._entry(message, speakers, self.entry_chars)
+        tokens = self.counter.count(text, key)
+        context.entries.append([text, tokens, message])
+        context.summary_tokens += tokens
+        context.folded += 1
+        context.folded_id = message.id
+        self.messages_folded += 1
+        # Résumé trop long: abréger les entrées les plus anciennes, puis les omettre
+        while context.summary_tokens > self.summary_budget and len(context.entries) > 1:
+            if context.compressed < len(context.entries) - 1:
+                entry = context.entries[context.compressed]
+                short = self._entry(entry[2], speakers, self.entry_chars // 3)
+                short_tokens = self.counter.count(short, key)
+                context.summary_tokens += short_tokens - entry[1]
+                entry[0], entry[1] = short, short_tokens
+                context.compressed += 1
+            else:
+                context.summary_tokens -= context.entries.pop(0)[1]
+                context.compressed = max(0, context.compressed - 1)
+                context.omitted += 1
+
+    def _summary(self, context: DebateContext) -> str:
+        lines = [f"Résumé des échanges précédents ({context.folded} interventions):"]
+        if context.omitted:
+            lines.append(f"({context.omitted} interventions plus anciennes omises)")
+        lines.extend(entry[0] for entry in context.entries)
+        return "\n".join(lines)
+
+    def count(self, agent: AgentConfig, text: str) -> int:
+        """Tokens d'un texte pour le tokenizer du modèle de l'agent"""
+        return self.counter.count(text, self.counter.key(agent.ai_provider, agent.model))
+
+    def build_history(
+        self,
+        debate: Debate,
+        agent: AgentConfig,
+        speakers: Dict[str, str],
+        source_context: Optional[str] = None
+    ) -> List[dict]:
+        """Historique de conversation de `agent` pour le prochain tour du débat.
+
+        `speakers` associe les rôles (agent1, agent2) aux noms utilisés dans le résumé.
+        `source_context` (extraits de la source choisis pour ce tour) remplace les
+        messages de contexte enregistrés; propre à ce tour, il est placé en fin
+        d'historique et marqué `volatile`, après le préfixe stable d'un tour à l'autre
+        (contexte, résumé, interventions) que les fournisseurs peuvent mettre en cache.
+        """
+        pinned = [m for m in debate.messages if m.role == MessageRole.SYSTEM]
+        turns = [m for m in debate.messages if m.role != MessageRole.SYSTEM]
+        if source_context is not None:
+            pinned_history = []
+            tail = [{"role": "user", "content": source_context, "volatile": True}]
+        else:
+            pinned_history = PromptBuilder.build_conversation_history(pinned, agent.id)
+            tail = []
+
+        if self.history_budget <= 0:
+            return pinned_history + PromptBuilder.build_conversation_history(turns, agent.id) + tail
+
+        key = self.counter.key(agent.ai_provider, agent.model)
+        context = self._context(debate.id, key)
+
+        # Transcription modifiée depuis le dernier repli (tour spéculatif abandonné, réinitialisation)
+        if context.folded and (context.folded > len(turns) or turns[context.folded - 1].id != context.folded_id):
+            counts = context.counts
+            context = self._contexts[(debate.id, key)] = DebateContext()
+            context.counts = counts
+            self.rebuilds += 1
+
+        # Repli des plus anciens messages conservés tant que le budget est dépassé
+        recent = turns[context.folded:]
+        recent_tokens = sum(self._tokens(context, m, key) for m in recent)
+        if recent_tokens > self.history_budget:
+            target = self.history_budget * self.fold_ratio
+            while len(recent) > self.min_recent and recent_tokens > target:
+                recent_tokens -= self._tokens(context, recent[0], key)
+                self._fold(context, recent[0], speakers, key)
+                recent = recent[1:]
+
+        tokens = recent_tokens + context.summary_tokens
+        tokens += sum(self.counter.count(entry["content"], key) + MESSAGE_OVERHEAD for entry in pinned_history + tail)
+
+        history = pinned_history
+        if context.folded:
+            history.append({"role": "user", "content": self._summary(context)})
+        history.extend(PromptBuilder.build_conversation_history(recent, agent.id))
+        history.extend(tail)
+
+        self.builds += 1
+        self.history_tokens_total += tokens
+        self.history_tokens_max = max(self.history_tokens_max, tokens)
+        return history
+
+    def stats(self) -> dict:
+        return {
+            "history_budget": self.history_budget,
+            "summary_budget": self.summary_budget,
+            "tokenizer": "tiktoken" if tiktoken is not None else "chars",
+            "debates": len(self._contexts),
+            "builds": self.builds,
+            "rebuilds": self.rebuilds,
+            "messages_folded": self.messages_folded,
+            "history_tokens_avg": round(self.history_tokens_total / self.builds) if self.builds else 0,
+            "history_tokens_max": self.history_tokens_max,
+        }
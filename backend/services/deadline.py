@@ -0,0 +1,80 @@
+import asyncio
+import time
+from collections import deque
+from typing import AsyncIterator, Optional
+
+# Ajouté au texte d'un tour interrompu par sa limite de temps
+TRUNCATION_MARKER = " […]\n\n[Temps de parole écoulé]"
+
+
+class TurnDeadline:
+    """Échéance d'un tour de débat (`DebateConfig.turn_time_limit`, en secondes).
+
+    `iterate` relaie un flux de segments jusqu'à l'échéance: la lecture en cours est
+    alors annulée, le flux amont fermé (connexion au fournisseur, place de concurrence)
+    et l'itération se termine normalement avec `expired = True`, de sorte que le texte
+    déjà reçu est conservé. Sans limite, le flux est relayé tel quel.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds if seconds else None
+        self.expired = False
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    async def iterate(self, items: AsyncIterator) -> AsyncIterator:
+        iterator = items.__aiter__()
+        pending = None
+        try:
+            while True:
+                pending = asyncio.ensure_future(iterator.__anext__())
+                done, _ = await asyncio.wait({pending}, timeout=self.remaining())
+                if not done:
+                    self.expired = True
+                    print(f"⏱️ Limite de temps du tour atteinte ({self.seconds} s): génération interrompue")
+                    return
+                task, pending = pending, None
+                try:
+                    item = task.result()
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            if pending is not None:
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+
+
+class TurnTimingStats:
+    """Durées de génération des tours et tours tronqués par leur limite de temps (exposés par /stats)"""
+
+    def __init__(self, window: int = 1000):
+        self.turns = 0
+        self.truncated = 0
+        self._durations = deque(maxlen=window)
+
+    def record(self, elapsed: float, truncated: bool):
+        self.turns += 1
+        if truncated:
+            self.truncated += 1
+        self._durations.append(elapsed)
+
+    def to_dict(self) -> dict:
+        durations = sorted(self._durations)
+        return {
+            "turns": self.turns,
+            "truncated": self.truncated,
+            "generation_p50_s": round(durations[len(durations) // 2], 2) if durations else None,
+            "generation_p95_s": round(durations[int(len(durations) * 0.95)], 2) if durations else None,
+            "generation_max_s": round(durations[-1], 2) if durations else None,
+        }
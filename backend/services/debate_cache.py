@@ -0,0 +1,147 @@
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional
+
+from backend.models.debate import Debate, DebateStatus
+from backend.services.storage import debate_summary
+
+
+class DebateCache:
+    """Cache LRU borné des débats hydratés.
+
+    Remplace le dictionnaire `debates_db`: les débats en cours restent en mémoire, tandis
+    que les débats terminés ou annulés les moins récemment utilisés sont évincés vers le
+    stockage (`on_evict`) lorsque la taille maximale est dépassée. Seul un résumé (sans
+    messages ni texte source) est conservé dans l'index; le débat est réhydraté à la
+    demande via `loader` (coroutine, lectures hors de la boucle d'événements) lors d'un
+    accès, une seule fois pour les accès simultanés.
+
+    `values()` ne parcourt que les débats en mémoire; `summaries()` couvre tous les débats.
+    """
+
+    EVICTABLE_STATUSES = {DebateStatus.COMPLETED.value, DebateStatus.CANCELLED.value}
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        loader: Optional[Callable[[str], Awaitable[Optional[Debate]]]] = None,
+        on_evict: Optional[Callable[[Debate], None]] = None
+    ):
+        self.max_size = max_size
+        self.loader = loader
+        self.on_evict = on_evict
+        self._hot: "OrderedDict[str, Debate]" = OrderedDict()
+        # Débats évincés ou non chargés: id -> résumé
+        self._index: Dict[str, dict] = {}
+        # Réhydratations en cours
+        self._loading: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, debate_id) -> bool:
+        return debate_id in self._hot or debate_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._hot) + len(self._index)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self._hot)
+        yield from list(self._index)
+
+    def __setitem__(self, debate_id: str, debate: Debate):
+        self._index.pop(debate_id, None)
+        self._hot[debate_id] = debate
+        self._hot.move_to_end(debate_id)
+        self._evict_if_needed()
+
+    def __delitem__(self, debate_id: str):
+        if debate_id in self._hot:
+            del self._hot[debate_id]
+        else:
+            del self._index[debate_id]
+
+    async def get(self, debate_id: str, default=None) -> Optional[Debate]:
+        """Récupérer un débat, en le réhydratant depuis le stockage si nécessaire"""
+        debate = self._hot.get(debate_id)
+        if debate is not None:
+            self.hits += 1
+            self._hot.move_to_end(debate_id)
+            return debate
+        if debate_id not in self._index or self.loader is None:
+            return default
+        task = self._loading.get(debate_id)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._load(debate_id))
+            self._loading[debate_id] = task
+        # La réhydratation se poursuit si la requête qui l'attend est abandonnée
+        debate = await asyncio.shield(task)
+        return debate if debate is not None else default
+
+    async def _load(self, debate_id: str) -> Optional[Debate]:
+        try:
+            debate = await self.loader(debate_id)
+        finally:
+            self._loading.pop(debate_id, None)
+        if debate is None:
+            print(f"⚠️ Débat {debate_id} introuvable dans le stockage")
+            return None
+        if debate_id in self._hot:
+            # Remplacé pendant la lecture: la version en mémoire fait foi
+            return self._hot[debate_id]
+        self[debate_id] = debate
+        return debate
+
+    def keys(self) -> List[str]:
+        return list(self)
+
+    def values(self) -> List[Debate]:
+        """Débats actuellement en mémoire"""
+        return list(self._hot.values())
+
+    def items(self):
+        return list(self._hot.items())
+
+    def update(self, debates: Dict[str, Debate]):
+        for debate_id, debate in debates.items():
+            self[debate_id] = debate
+
+    def index(self, summary: dict):
+        """Référencer un débat resté sur disque à partir de son résumé"""
+        if summary["id"] not in self._hot:
+            self._index[summary["id"]] = summary
+
+    def summaries(self) -> Iterator[dict]:
+        """Résumés de tous les débats (en mémoire et sur disque)"""
+        for debate in list(self._hot.values()):
+            yield debate_summary(debate)
+        yield from list(self._index.values())
+
+    def _evict_if_needed(self):
+        if len(self._hot) <= self.max_size:
+            return
+        # Parcourir du moins récemment utilisé au plus récent; les débats en cours ne sont jamais évincés
+        for debate_id in list(self._hot):
+            if len(self._hot) <= self.max_size:
+                break
+            debate = self._hot[debate_id]
+            if debate.status not in self.EVICTABLE_STATUSES:
+                continue
+            del self._hot[debate_id]
+            self._index[debate_id] = debate_summary(debate)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(debate)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._hot),
+            "max_size": self.max_size,
+            "indexed_on_disk": len(self._index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
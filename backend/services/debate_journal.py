@@ -0,0 +1,184 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from backend.models.debate import Debate, DebateMessage
+
+
+class DebateJournal:
+    """Journal append-only des mutations de débats.
+
+    Chaque ligne du journal est un enregistrement JSON:
+    - ``{"op": "debate", "data": {...}}``: champs d'en-tête d'un débat (sans messages ni source)
+    - ``{"op": "source", "debate_id": ..., "source_text": ...}``: texte source extrait
+    - ``{"op": "message", "debate_id": ..., "data": {...}}``: nouveau message, ajouté en fin
+      de transcription, ou inséré à l'indice ``"position"`` s'il est présent (message de
+      contexte d'une source inséré en tête au démarrage du débat)
+
+    Le coût d'écriture d'un tour est donc proportionnel à la taille du message ajouté.
+    Les enregistrements sont mis en attente puis écrits par le worker de persistance
+    (`write_records`, exécuté hors de la boucle d'événements).
+    Le journal est périodiquement compacté dans le snapshot (`active_debates.json`);
+    au démarrage on rejoue snapshot + journal. Le rejeu est idempotent (les messages
+    déjà présents sont ignorés), ce qui rend la compaction sûre en cas de crash.
+    """
+
+    def __init__(self, journal_path: Path, snapshot_path: Path, compact_bytes: int = 4 * 1024 * 1024):
+        self.journal_path = Path(journal_path)
+        self.snapshot_path = Path(snapshot_path)
+        # Journal en cours de compaction (renommé avant l'écriture du snapshot)
+        self.compacting_path = self.journal_path.with_name(self.journal_path.name + ".compacting")
+        self.compact_bytes = compact_bytes
+        # Enregistrements en attente d'écriture (vidés par le worker de persistance)
+        self._pending: List[dict] = []
+        self._size = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+
+    # ===== Écriture =====
+
+    def append_debate(self, debate: Debate, include_source: bool = False):
+        """Enregistrer l'en-tête d'un débat (statut, tour courant, dates...)"""
+        header = debate.model_dump(mode="json", exclude={"messages", "source_text"})
+        self._pending.append({"op": "debate", "data": header})
+        # Un texte partagé via le cache des sources n'est référencé que par `source_hash` (en-tête)
+        if include_source and debate.source_text is not None and debate.source_hash is None:
+            self._pending.append({"op": "source", "debate_id": debate.id, "source_text": debate.source_text})
+
+    def append_message(self, debate_id: str, message: DebateMessage, position: Optional[int] = None):
+        """Enregistrer un nouveau message d'un débat (inséré à `position`, sinon ajouté en fin)"""
+        record = {"op": "message", "debate_id": debate_id, "data": message.model_dump(mode="json")}
+        if position is not None:
+            record["position"] = position
+        self._pending.append(record)
+
+    def take_pending(self) -> List[dict]:
+        """Récupérer les enregistrements en attente.
+
+        Plusieurs en-têtes successifs d'un même débat sont regroupés: le dernier en-tête
+        prend la place du premier, afin de précéder les messages et la source du débat.
+        """
+        records, self._pending = self._pending, []
+        latest = {}
+        for record in records:
+            if record["op"] == "debate":
+                latest[record["data"]["id"]] = record
+        coalesced = []
+        for record in records:
+            if record["op"] == "debate":
+                header = latest.pop(record["data"]["id"], None)
+                if header is not None:
+                    coalesced.append(header)
+            else:
+                coalesced.append(record)
+        return coalesced
+
+    def write_records(self, records: List[dict], snapshot: Optional[List[dict]] = None):
+        """Ajouter les enregistrements au journal, puis compacter si un snapshot est fourni.
+
+        Le snapshot doit avoir été capturé au même instant que `records` (voir `take_pending`),
+        afin de couvrir exactement le contenu du journal compacté.
+        """
+        if records:
+            data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+            with open(self.journal_path, "ab") as f:
+                f.write(data)
+            self._size += len(data)
+        if snapshot is not None:
+            self.rotate()
+            self.write_snapshot(snapshot)
+
+    # ===== Compaction =====
+
+    def should_compact(self) -> bool:
+        return self._size >= self.compact_bytes
+
+    def rotate(self):
+        """Mettre de côté le journal courant avant l'écriture du snapshot"""
+        if self.journal_path.exists():
+            if self.compacting_path.exists():
+                # Compaction précédente interrompue: conserver ses enregistrements
+                with open(self.compacting_path, "ab") as dst, open(self.journal_path, "rb") as src:
+                    shutil.copyfileobj(src, dst)
+                self.journal_path.unlink()
+            else:
+                os.replace(self.journal_path, self.compacting_path)
+        self._size = 0
+
+    def write_snapshot(self, debates_data: List[dict]):
+        """Écrire le snapshot de manière atomique puis supprimer le journal compacté"""
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"debates": debates_data}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+        if self.compacting_path.exists():
+            self.compacting_path.unlink()
+        print(f"🗜️ Journal compacté: {len(debates_data)} débats dans {self.snapshot_path}")
+
+    # ===== Rejeu =====
+
+    def replay(self, load_archived: Optional[Callable[[str], Optional[dict]]] = None) -> Dict[str, dict]:
+        """Reconstruire les débats (données brutes) à partir du snapshot puis du journal.
+
+        `load_archived` permet de repartir d'un débat archivé hors du snapshot lorsqu'un
+        enregistrement du journal le concerne.
+        """
+        raw: Dict[str, dict] = {}
+        seen_messages: Dict[str, set] = {}
+
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r", encoding="utf-8-sig") as f:
+                data = json.load(f)
+            for debate_data in data.get("debates", []):
+                raw[debate_data["id"]] = debate_data
+                seen_messages[debate_data["id"]] = {m.get("id") for m in debate_data.get("messages", [])}
+
+        replayed = 0
+        for path in (self.compacting_path, self.journal_path):
+            if not path.exists():
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Dernière ligne tronquée (arrêt brutal pendant l'écriture)
+                        print(f"⚠️ Enregistrement de journal illisible ignoré dans {path}")
+                        continue
+                    self._apply(record, raw, seen_messages, load_archived)
+                    replayed += 1
+
+        print(f"📜 Journal rejoué: {replayed} enregistrements, {len(raw)} débats")
+        return raw
+
+    @staticmethod
+    def _apply(record: dict, raw: Dict[str, dict], seen_messages: Dict[str, set], load_archived=None):
+        op = record.get("op")
+        debate_id = record["data"]["id"] if op == "debate" else record.get("debate_id")
+        if debate_id not in raw and load_archived is not None:
+            archived = load_archived(debate_id)
+            if archived is not None:
+                raw[debate_id] = archived
+                seen_messages[debate_id] = {m.get("id") for m in archived.get("messages", [])}
+        if op == "debate":
+            debate_data = raw.setdefault(debate_id, {"messages": []})
+            debate_data.update(record["data"])
+            seen_messages.setdefault(debate_id, set())
+        elif op == "source":
+            if debate_id in raw:
+                raw[debate_id]["source_text"] = record["source_text"]
+        elif op == "message":
+            if debate_id not in raw:
+                return
+            message = record["data"]
+            if message.get("id") in seen_messages[debate_id]:
+                return
+            seen_messages[debate_id].add(message.get("id"))
+            messages = raw[debate_id]["messages"]
+            position = record.get("position")
+            if position is None:
+                messages.append(message)
+            else:
+                messages.insert(min(position, len(messages)), message)
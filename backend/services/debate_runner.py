@@ -0,0 +1,186 @@
+import asyncio
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# Un tour joué par le moteur: `play_turn(debate_id, publish)` publie ses événements et
+# renvoie False, sans rien jouer, lorsque le débat n'a plus de tour à jouer
+PlayTurn = Callable[[str, Callable[[dict], None]], Awaitable[bool]]
+
+
+class RunState:
+    """États d'une exécution automatique"""
+    RUNNING = "running"
+    PAUSED = "paused"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+    FINISHED = (COMPLETED, CANCELLED, FAILED)
+
+
+class DebateRun:
+    """Exécution en tâche de fond des tours restants d'un débat, et ses abonnés.
+
+    Chaque abonné reçoit les événements publiés dans sa propre file (bornée à
+    `max_pending`): un abonné trop lent est détaché plutôt que de ralentir le débat.
+    """
+
+    def __init__(self, debate_id: str, max_pending: int = 1000):
+        self.debate_id = debate_id
+        self.state = RunState.RUNNING
+        self.turns_played = 0
+        self.error: Optional[str] = None
+        self.started_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.max_pending = max_pending
+        self.task: Optional[asyncio.Task] = None
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def active(self) -> bool:
+        return self.state not in RunState.FINISHED
+
+    def publish(self, event: dict):
+        """Diffuser un événement à tous les abonnés"""
+        for queue in list(self._subscribers):
+            if queue.qsize() >= self.max_pending:
+                # Abonné trop lent: ses événements en attente sont abandonnés
+                while not queue.empty():
+                    queue.get_nowait()
+                self._detach(queue)
+            else:
+                queue.put_nowait(event)
+
+    def _detach(self, queue: asyncio.Queue):
+        """Retirer un abonné; son flux se termine après les événements en attente"""
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+        queue.put_nowait(None)
+
+    async def subscribe(self) -> AsyncIterator[dict]:
+        """Événements de l'exécution, de l'état courant jusqu'à la fin"""
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait(self.status_event())
+        if self.active:
+            self._subscribers.append(queue)
+        else:
+            queue.put_nowait(None)
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            if queue in self._subscribers:
+                self._subscribers.remove(queue)
+
+    def status_event(self) -> dict:
+        return {"type": "run_status", **self.to_dict()}
+
+    def _set_state(self, state: str, error: Optional[str] = None):
+        self.state = state
+        self.error = error
+        if state in RunState.FINISHED:
+            self.finished_at = datetime.now()
+        self.publish(self.status_event())
+        if state in RunState.FINISHED:
+            for queue in list(self._subscribers):
+                self._detach(queue)
+
+    def to_dict(self) -> dict:
+        return {
+            "debate_id": self.debate_id,
+            "state": self.state,
+            "turns_played": self.turns_played,
+            "subscribers": len(self._subscribers),
+            "error": self.error,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class DebateRunner:
+    """Moteur d'exécution automatique des débats (une tâche asyncio par débat).
+
+    La pause prend effet entre deux tours (le tour en cours se termine et est
+    enregistré); l'annulation interrompt immédiatement le tour en cours, dont le texte
+    partiel est abandonné.
+    """
+
+    def __init__(self, play_turn: PlayTurn):
+        self.play_turn = play_turn
+        self.runs: Dict[str, DebateRun] = {}
+
+    def get(self, debate_id: str) -> Optional[DebateRun]:
+        return self.runs.get(debate_id)
+
+    def is_active(self, debate_id: str) -> bool:
+        run = self.runs.get(debate_id)
+        return run is not None and run.active
+
+    def start(self, debate_id: str) -> DebateRun:
+        if self.is_active(debate_id):
+            raise ValueError("Une exécution automatique est déjà en cours pour ce débat")
+        run = DebateRun(debate_id)
+        self.runs[debate_id] = run
+        run.task = asyncio.create_task(self._run(run), name=f"debate-run-{debate_id}")
+        return run
+
+    async def _run(self, run: DebateRun):
+        print(f"▶️ Exécution automatique du débat {run.debate_id}")
+        try:
+            while True:
+                await run._resumed.wait()
+                if not await self.play_turn(run.debate_id, run.publish):
+                    break
+                run.turns_played += 1
+        except asyncio.CancelledError:
+            run._set_state(RunState.CANCELLED)
+            print(f"⏹️ Exécution automatique du débat {run.debate_id} annulée")
+            raise
+        except Exception as e:
+            run._set_state(RunState.FAILED, str(e))
+            print(f"⚠️ Exécution automatique du débat {run.debate_id} interrompue: {e}")
+            return
+        run._set_state(RunState.COMPLETED)
+        print(f"✅ Exécution automatique du débat {run.debate_id} terminée ({run.turns_played} tours)")
+
+    def pause(self, debate_id: str) -> DebateRun:
+        run = self._active_run(debate_id)
+        if run.state == RunState.RUNNING:
+            run._resumed.clear()
+            run._set_state(RunState.PAUSED)
+        return run
+
+    def resume(self, debate_id: str) -> DebateRun:
+        run = self._active_run(debate_id)
+        if run.state == RunState.PAUSED:
+            run._set_state(RunState.RUNNING)
+            run._resumed.set()
+        return run
+
+    async def cancel(self, debate_id: str) -> DebateRun:
+        run = self._active_run(debate_id)
+        run.task.cancel()
+        await asyncio.gather(run.task, return_exceptions=True)
+        return run
+
+    def _active_run(self, debate_id: str) -> DebateRun:
+        run = self.runs.get(debate_id)
+        if run is None or not run.active:
+            raise KeyError(debate_id)
+        return run
+
+    async def shutdown(self):
+        """Annuler les exécutions en cours (arrêt de l'application)"""
+        tasks = [run.task for run in self.runs.values() if run.active and run.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        states = [run.state for run in self.runs.values()]
+        return {state: states.count(state) for state in sorted(set(states))}
@@ -0,0 +1,87 @@
+import hashlib
+from typing import Optional, Set
+
+from backend.models.debate import Debate
+
+# Champs d'état renvoyés par une requête incrémentale, avec les nouveaux messages
+DELTA_FIELDS = {"id", "status", "current_turn", "winner_id", "started_at", "completed_at", "source_status"}
+
+
+def debate_version(debate: Debate) -> str:
+    """Empreinte de l'état d'un débat, calculée sans sérialiser ses messages ni sa source.
+
+    Un débat n'évolue que par ajout de messages (ou insertion du message de contexte
+    au démarrage, en même temps que `source_text`) et par ses champs d'état (dont l'état
+    de la récupération de la source, `source_status`).
+    """
+    messages = debate.messages
+    state = (
+        debate.id,
+        len(messages),
+        messages[0].id if messages else None,
+        messages[-1].id if messages else None,
+        debate.status,
+        debate.current_turn,
+        debate.winner_id,
+        debate.started_at,
+        debate.completed_at,
+        debate.source_status,
+        len(debate.source_text) if debate.source_text else 0,
+    )
+    return hashlib.blake2b(repr(state).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def debate_etag(debate: Debate, variant: str = "") -> str:
+    """ETag fort d'une représentation du débat (`variant`: sélection de champs, delta)"""
+    version = debate_version(debate)
+    if variant:
+        version += "-" + hashlib.blake2b(variant.encode("utf-8"), digest_size=4).hexdigest()
+    return f'"{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparaison `If-None-Match` (faible, comme le prévoit HTTP pour les requêtes GET)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def parse_fields(value: Optional[str]) -> Optional[Set[str]]:
+    """Liste de champs `a,b,c` du modèle Debate; ValueError pour un champ inconnu"""
+    if value is None:
+        return None
+    fields = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = fields - set(Debate.model_fields)
+    if unknown:
+        raise ValueError(f"Champs inconnus: {', '.join(sorted(unknown))}")
+    return fields
+
+
+def debate_delta(debate: Debate, since_turn: Optional[int] = None, after_message_id: Optional[str] = None) -> dict:
+    """Champs d'état et nouveaux messages du débat.
+
+    - `after_message_id`: messages enregistrés après celui-ci; s'il est inconnu (débat
+      réinitialisé, identifiant erroné), tous les messages avec `reset: true`
+    - `since_turn`: messages des tours `since_turn` et suivants
+    """
+    messages = debate.messages
+    reset = False
+    if after_message_id is not None:
+        # Recherche depuis la fin: le client connaît en général les derniers messages
+        index = next((i for i in range(len(messages) - 1, -1, -1) if messages[i].id == after_message_id), None)
+        if index is None:
+            reset = True
+        else:
+            messages = messages[index + 1:]
+    elif since_turn is not None:
+        messages = [m for m in messages if m.turn_number >= since_turn]
+
+    delta = debate.model_dump(mode="json", include=DELTA_FIELDS)
+    delta["message_count"] = len(debate.messages)
+    delta["messages"] = [m.model_dump(mode="json") for m in messages]
+    delta["reset"] = reset
+    return delta
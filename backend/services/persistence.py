@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class PersistenceWorker:
+    """Persistance différée (write-behind) exécutée hors de la boucle d'événements.
+
+    Chaque cible est enregistrée avec deux fonctions:
+    - `collect()`: appelée sur la boucle asyncio, capture un instantané cohérent des données
+      (aucune I/O);
+    - `write(payload)`: appelée dans un thread, écrit l'instantané sur disque.
+
+    Les handlers se contentent de `mark_dirty(key)`. Les modifications survenant pendant
+    la fenêtre `flush_interval` sont regroupées en une seule écriture. Tant que le worker
+    n'est pas démarré (scripts, CLI), l'écriture est immédiate et synchrone.
+    """
+
+    def __init__(self, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self._targets: Dict[str, Tuple[Callable[[], Any], Callable[[Any], None]]] = {}
+        self._dirty: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flush_count = 0
+
+    def register(self, key: str, collect: Callable[[], Any], write: Callable[[Any], None]):
+        """Enregistrer une cible de persistance"""
+        self._targets[key] = (collect, write)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def mark_dirty(self, key: str):
+        """Signaler qu'une cible doit être réécrite"""
+        if key not in self._targets:
+            raise KeyError(f"Cible de persistance inconnue: {key}")
+        if not self.running:
+            self._write_now(key)
+            return
+        self._dirty.add(key)
+        self._wakeup.set()
+
+    def _write_now(self, key: str):
+        collect, write = self._targets[key]
+        try:
+            write(collect())
+        except Exception as e:
+            print(f"⚠️ Erreur lors de la persistance de '{key}': {e}")
+
+    async def start(self):
+        """Démarrer la tâche de fond (à appeler depuis le lifespan de l'application)"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run(), name="persistence-worker")
+        print(f"💾 Persistance différée active (intervalle {self.flush_interval}s)")
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            # Fenêtre de regroupement: toutes les modifications de l'intervalle
+            # sont écrites en une seule fois
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Écrire toutes les cibles modifiées (I/O dans un thread)"""
+        async with self._flush_lock:
+            keys = list(self._dirty)
+            self._dirty.clear()
+            for key in keys:
+                collect, write = self._targets[key]
+                try:
+                    payload = collect()
+                    await asyncio.to_thread(write, payload)
+                    self.flush_count += 1
+                except Exception as e:
+                    print(f"⚠️ Erreur lors de la persistance de '{key}': {e}")
+                    # Réessayer au prochain cycle
+                    self._dirty.add(key)
+                    self._wakeup.set()
+
+    async def stop(self):
+        """Arrêter le worker en vidant la file des écritures en attente"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._dirty:
+            print(f"💾 Vidage des écritures en attente: {', '.join(sorted(self._dirty))}")
+        await self.flush()
+        # Une cible en échec reste marquée; on n'insiste pas à l'arrêt
+        self._dirty.clear()
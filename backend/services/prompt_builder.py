@@ -1,6 +1,21 @@
 from backend.models.agent import AgentConfig
 from backend.models.debate import Debate, DebateMessage
+from collections import OrderedDict
 from typing import List
+import hashlib
+
+# Prompts système déjà construits, par version de l'agent et de la configuration du débat
+SYSTEM_PROMPT_CACHE_SIZE = 512
+_system_prompts: "OrderedDict[str, str]" = OrderedDict()
+
+
+def system_prompt_key(agent: AgentConfig, debate: Debate) -> str:
+    """Empreinte de tout ce dont dépend le prompt système (agent, sujet, configuration)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(agent.model_dump_json().encode("utf-8"))
+    digest.update(b"\0" + "\0".join([debate.topic, debate.agent1_id, debate.agent2_id]).encode("utf-8"))
+    digest.update(b"\0" + debate.config.model_dump_json().encode("utf-8"))
+    return digest.hexdigest()
 
 
 class PromptBuilder:
@@ -8,8 +23,24 @@ class PromptBuilder:
     
     @staticmethod
     def build_system_prompt(agent: AgentConfig, debate: Debate) -> str:
-        """Construit le prompt système complet pour un agent"""
-        
+        """Construit le prompt système complet pour un agent.
+
+        Le prompt ne dépend que de l'agent et de la configuration du débat: il est
+        identique d'un tour à l'autre (préfixe réutilisable par le cache de prompts des
+        fournisseurs) et n'est construit qu'une fois par version de l'agent et du débat.
+        """
+        key = system_prompt_key(agent, debate)
+        prompt = _system_prompts.get(key)
+        if prompt is None:
+            prompt = _system_prompts[key] = PromptBuilder._compose_system_prompt(agent, debate)
+            while len(_system_prompts) > SYSTEM_PROMPT_CACHE_SIZE:
+                _system_prompts.popitem(last=False)
+        else:
+            _system_prompts.move_to_end(key)
+        return prompt
+
+    @staticmethod
+    def _compose_system_prompt(agent: AgentConfig, debate: Debate) -> str:
         # Utiliser le template personnalisé si disponible
         if agent.system_prompt_template:
             return agent.system_prompt_template
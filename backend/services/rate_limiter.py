@@ -0,0 +1,208 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Appel refusé: file d'attente pleine ou attente supérieure au délai maximal"""
+
+    def __init__(self, key: str, reason: str, retry_after: float):
+        super().__init__(f"Fournisseur {key} saturé ({reason}), réessayer dans {math.ceil(retry_after)} s")
+        self.key = key
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Seau à jetons rechargé en continu (`per_minute` jetons par minute).
+
+    Une réservation peut rendre le solde négatif: elle renvoie alors le délai à attendre
+    avant de consommer, ce qui sert les appelants dans l'ordre de réservation.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Délai avant de pouvoir consommer `amount` jetons (sans réserver)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def reserve(self, amount: float) -> float:
+        """Réserver `amount` jetons; renvoie le délai d'attente avant consommation"""
+        delay = self.delay_for(amount)
+        self.tokens -= min(amount, self.capacity)
+        return delay
+
+    def adjust(self, delta: float):
+        """Corriger une réservation (delta > 0: consommation réelle supérieure à l'estimation)"""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class ProviderSlot:
+    """Place obtenue auprès d'un limiteur; à libérer une fois l'appel terminé"""
+
+    def __init__(self, limiter: "ProviderLimiter", estimated_tokens: int):
+        self.limiter = limiter
+        self.estimated_tokens = estimated_tokens
+        self.released = False
+
+    def release(self, tokens_used: Optional[int] = None):
+        """Libérer la place (idempotent) et ajuster le seau TPM selon la consommation réelle"""
+        if self.released:
+            return
+        self.released = True
+        self.limiter._release(self, tokens_used)
+
+
+class ProviderLimiter:
+    """Contrôle d'admission d'un fournisseur (ou d'un modèle).
+
+    - au plus `max_concurrency` appels simultanés (sémaphore)
+    - seaux à jetons requêtes/minute (`rpm`) et tokens/minute (`tpm`), 0 = illimité
+    - au plus `max_queue` appels en attente; au-delà, ou si l'attente dépasserait
+      `max_wait` secondes, l'appel est refusé (`AdmissionRejected`)
+    """
+
+    def __init__(self, key: str, max_concurrency: int, rpm: float, tpm: float, max_queue: int, max_wait: float):
+        self.key = key
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waits = deque(maxlen=1000)
+
+    def _rate_delay(self, estimated_tokens: int) -> float:
+        delays = [0.0]
+        if self.requests is not None:
+            delays.append(self.requests.delay_for(1))
+        if self.tokens is not None:
+            delays.append(self.tokens.delay_for(estimated_tokens))
+        return max(delays)
+
+    def retry_after(self) -> float:
+        """Délai suggéré au client refusé (en-tête Retry-After)"""
+        recent = list(self._waits)[-50:]
+        average_wait = sum(recent) / len(recent) if recent else 0.0
+        return max(1.0, self._rate_delay(0), average_wait)
+
+    def _reject(self, reason: str, retry_after: Optional[float] = None):
+        self.rejected += 1
+        raise AdmissionRejected(self.key, reason, retry_after if retry_after is not None else self.retry_after())
+
+    async def acquire(self, estimated_tokens: int = 0) -> ProviderSlot:
+        # La file ne compte que les appels qui doivent attendre une place
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self._reject("file d'attente pleine")
+        self.waiting += 1
+        start = time.monotonic()
+        try:
+            if self._semaphore.locked():
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=self.max_wait)
+                except asyncio.TimeoutError:
+                    self._reject("attente trop longue")
+            else:
+                await self._semaphore.acquire()
+            try:
+                # Débit: ne pas réserver si l'attente dépasserait le délai restant
+                delay = self._rate_delay(estimated_tokens)
+                remaining = self.max_wait - (time.monotonic() - start)
+                if delay > remaining:
+                    self._reject("limite de débit", delay)
+                if self.requests is not None:
+                    self.requests.reserve(1)
+                if self.tokens is not None:
+                    self.tokens.reserve(estimated_tokens)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+        self._waits.append(time.monotonic() - start)
+        self.admitted += 1
+        self.in_flight += 1
+        return ProviderSlot(self, estimated_tokens)
+
+    def _release(self, slot: ProviderSlot, tokens_used: Optional[int]):
+        if tokens_used is not None and self.tokens is not None:
+            self.tokens.adjust(tokens_used - slot.estimated_tokens)
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        waits = sorted(self._waits)
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.waiting,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+            "wait_p95_ms": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else None,
+            "wait_max_ms": round(waits[-1] * 1000, 1) if waits else None,
+        }
+
+
+class RateLimiter:
+    """Limiteurs par fournisseur, ou par (fournisseur, modèle) si `per_model`.
+
+    Configuration par variables d'environnement, avec surcharge par fournisseur
+    (suffixe `_OPENAI`, `_ANTHROPIC`, `_GOOGLE`, `_MISTRAL`):
+    `AI_MAX_CONCURRENCY`, `AI_RPM`, `AI_TPM`, `AI_QUEUE_MAX`, `AI_QUEUE_TIMEOUT`.
+    """
+
+    def __init__(self, per_model: bool = False):
+        self.per_model = per_model
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        return cls(per_model=os.getenv("AI_LIMIT_PER_MODEL", "false").lower() in ("1", "true", "yes"))
+
+    @staticmethod
+    def _setting(name: str, provider: str, default: str) -> float:
+        return float(os.getenv(f"{name}_{provider.upper()}", os.getenv(name, default)))
+
+    def limiter_for(self, provider: str, model: str) -> ProviderLimiter:
+        key = f"{provider}/{model}" if self.per_model else provider
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = ProviderLimiter(
+                key,
+                max_concurrency=int(self._setting("AI_MAX_CONCURRENCY", provider, "16")),
+                rpm=self._setting("AI_RPM", provider, "0"),
+                tpm=self._setting("AI_TPM", provider, "0"),
+                max_queue=int(self._setting("AI_QUEUE_MAX", provider, "64")),
+                max_wait=self._setting("AI_QUEUE_TIMEOUT", provider, "30"),
+            )
+            self._limiters[key] = limiter
+        return limiter
+
+    async def acquire(self, provider: str, model: str, estimated_tokens: int = 0) -> ProviderSlot:
+        return await self.limiter_for(provider, model).acquire(estimated_tokens)
+
+    def stats(self) -> dict:
+        return {key: limiter.stats() for key, limiter in self._limiters.items()}
@@ -0,0 +1,162 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from weakref import WeakValueDictionary
+
+
+class TurnAborted(Exception):
+    """Génération du tour interrompue (toutes les requêtes qui l'attendaient sont parties)"""
+
+
+class TurnConflict(Exception):
+    """La transcription du débat a changé pendant l'attente du verrou: tour abandonné"""
+
+
+class TurnFlight:
+    """Génération en cours du tour d'un débat, partagée par toutes les requêtes qui le demandent.
+
+    La génération s'exécute dans sa propre tâche et publie ses lots de segments; chaque
+    requête les suit (`follow`, SSE) ou attend le message enregistré (`wait`, JSON). Si
+    toutes les requêtes abandonnent avant la fin, la génération est annulée.
+    """
+
+    def __init__(self, debate_id: str):
+        self.debate_id = debate_id
+        self.batches: List[List[str]] = []
+        self.done = False
+        self.message = None
+        self.payload: Optional[dict] = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def publish(self, batch: List[str]):
+        self.batches.append(batch)
+        self._changed.set()
+
+    def finish(self, message, payload: dict):
+        """Tour enregistré: `message` et l'événement SSE `done` à diffuser"""
+        self.message = message
+        self.payload = payload
+        self._close()
+
+    def fail(self, error: BaseException):
+        if not self.done:
+            self.error = error
+            self._close()
+
+    def _close(self):
+        self.done = True
+        self._changed.set()
+
+    async def follow(self) -> AsyncIterator[List[str]]:
+        """Lots de segments depuis le début du tour, puis au fil de la génération"""
+        self.followers += 1
+        index = 0
+        try:
+            while True:
+                while index < len(self.batches):
+                    yield self.batches[index]
+                    index += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                self._changed.clear()
+                await self._changed.wait()
+        finally:
+            self._detach()
+
+    async def wait(self):
+        """Attendre la fin du tour; renvoie le message enregistré"""
+        self.followers += 1
+        try:
+            while not self.done:
+                self._changed.clear()
+                await self._changed.wait()
+            if self.error is not None:
+                raise self.error
+            return self.message
+        finally:
+            self._detach()
+
+    def _detach(self):
+        self.followers -= 1
+        if self.followers == 0 and not self.done and self.task is not None:
+            # Plus aucune requête n'attend ce tour: annuler l'appel au fournisseur
+            self.task.cancel()
+
+
+class TurnFlights:
+    """Au plus une génération de tour en cours par débat (single-flight), et verrous par débat.
+
+    Une requête qui arrive pendant la génération d'un tour s'y rattache au lieu de
+    lancer un nouvel appel au fournisseur. Le verrou d'un débat sérialise les
+    opérations qui font avancer sa transcription (tour, ouvertures, exécution automatique).
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, TurnFlight] = {}
+        self._locks: "WeakValueDictionary[str, asyncio.Lock]" = WeakValueDictionary()
+        self.started = 0
+        self.attached = 0
+
+    def attach(self, debate_id: str) -> Optional[TurnFlight]:
+        """Génération en cours pour ce débat, s'il y en a une"""
+        if not self.in_flight(debate_id):
+            return None
+        self.attached += 1
+        return self._flights[debate_id]
+
+    def in_flight(self, debate_id: str) -> bool:
+        flight = self._flights.get(debate_id)
+        return flight is not None and not flight.done
+
+    def register(self, debate_id: str) -> TurnFlight:
+        """Déclarer la génération d'un tour (avant toute attente, pour que les requêtes suivantes s'y rattachent)"""
+        flight = TurnFlight(debate_id)
+        self._flights[debate_id] = flight
+        self.started += 1
+        return flight
+
+    def launch(self, flight: TurnFlight, generate: Callable[[], Awaitable]) -> asyncio.Task:
+        """Exécuter `generate()` dans la tâche de la génération"""
+        flight.task = asyncio.create_task(self._run(flight, generate), name=f"turn-{flight.debate_id}")
+        flight.task.add_done_callback(lambda task: self._landed(flight))
+        return flight.task
+
+    @staticmethod
+    async def _run(flight: TurnFlight, generate: Callable[[], Awaitable]):
+        try:
+            await generate()
+        except Exception as e:
+            flight.fail(e)
+
+    def _landed(self, flight: TurnFlight):
+        # Tâche annulée (éventuellement avant même de démarrer): libérer les requêtes en attente
+        flight.fail(TurnAborted("Génération du tour interrompue"))
+        self.remove(flight)
+
+    def remove(self, flight: TurnFlight):
+        if self._flights.get(flight.debate_id) is flight:
+            del self._flights[flight.debate_id]
+
+    def lock(self, debate_id: str) -> asyncio.Lock:
+        lock = self._locks.get(debate_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[debate_id] = lock
+        return lock
+
+    async def shutdown(self):
+        tasks = [flight.task for flight in self._flights.values() if flight.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "attached_requests": self.attached,
+        }
@@ -0,0 +1,279 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from backend.services.source_fetcher import SourceFetcher
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SourceCache:
+    """Cache persistant des textes extraits des sources, partagés entre les débats.
+
+    - Par URL (`index.json`): validateurs HTTP (`ETag`, `Last-Modified`), empreinte du
+      document téléchargé et empreinte du texte extrait. Une source déjà connue est
+      revalidée par une requête conditionnelle: une réponse 304, ou un document identique,
+      réutilise le texte sans nouvelle extraction.
+    - Textes adressés par leur empreinte SHA-256 (`texts/ab/<empreinte>.txt`), stockés une
+      seule fois quel que soit le nombre de débats ou d'URL; les débats ne persistent que
+      l'empreinte (`Debate.source_hash`).
+    - Volume des textes limité à `max_bytes`: les moins récemment utilisés sont supprimés,
+      sauf ceux des débats en mémoire (`pinned`). Un débat archivé dont le texte a été
+      supprimé est rechargé sans texte source.
+    - Les `memory_size` derniers textes utilisés restent en mémoire (une seule copie pour
+      tous les débats de la même source).
+    """
+
+    def __init__(
+        self,
+        fetcher: SourceFetcher,
+        directory: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        memory_size: int = 32,
+        pinned: Optional[Callable[[], Set[str]]] = None
+    ):
+        self.fetcher = fetcher
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.memory_size = memory_size
+        self.pinned = pinned
+        self._lock = threading.Lock()
+        self._texts: "OrderedDict[str, str]" = OrderedDict()
+        self._index: Optional[Dict[str, dict]] = None
+        self._disk_bytes: Optional[int] = None
+        # Récupérations en cours par URL (débats créés simultanément avec la même source)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.shared = 0
+        self.not_modified = 0
+        self.unchanged = 0
+        self.downloads = 0
+        self.parses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, fetcher: SourceFetcher, directory: Path, pinned: Optional[Callable[[], Set[str]]] = None) -> "SourceCache":
+        return cls(
+            fetcher,
+            Path(os.getenv("SOURCE_CACHE_DIR", str(directory))),
+            max_bytes=int(os.getenv("SOURCE_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            memory_size=int(os.getenv("SOURCE_CACHE_MEMORY", "32")),
+            pinned=pinned,
+        )
+
+    # ===== Textes =====
+
+    def _text_path(self, digest: str) -> Path:
+        return self.directory / "texts" / digest[:2] / f"{digest}.txt"
+
+    def _remember(self, digest: str, text: str) -> str:
+        self._texts[digest] = text
+        self._texts.move_to_end(digest)
+        while len(self._texts) > self.memory_size:
+            self._texts.popitem(last=False)
+        return text
+
+    def text(self, digest: str) -> Optional[str]:
+        """Texte d'empreinte `digest` (lecture disque synchrone si absent de la mémoire)"""
+        text = self._texts.get(digest)
+        if text is not None:
+            self._texts.move_to_end(digest)
+            return text
+        text = self._read_text(digest)
+        return self._remember(digest, text) if text is not None else None
+
+    def _read_text(self, digest: str) -> Optional[str]:
+        path = self._text_path(digest)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)
+        except OSError:
+            return None
+        return text
+
+    async def load_text(self, digest: str) -> Optional[str]:
+        """Texte d'empreinte `digest` (lecture disque dans un thread si absent de la mémoire)"""
+        text = self._texts.get(digest)
+        if text is not None:
+            self._texts.move_to_end(digest)
+            # Date d'accès du fichier pour l'éviction LRU
+            await asyncio.to_thread(self._touch, digest)
+            return text
+        text = await asyncio.to_thread(self._read_text, digest)
+        return self._remember(digest, text) if text is not None else None
+
+    def _touch(self, digest: str):
+        try:
+            os.utime(self._text_path(digest))
+        except OSError:
+            pass
+
+    # ===== Index des URL =====
+
+    def _load_index(self) -> Dict[str, dict]:
+        if self._index is None:
+            try:
+                with open(self.directory / "index.json", "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _write(self, index: Dict[str, dict], pinned: Set[str], digest: Optional[str] = None, text: Optional[str] = None) -> Set[str]:
+        """Écrire un nouveau texte et l'index (dans un thread), en évinçant si nécessaire;
+        renvoie les empreintes des textes supprimés"""
+        removed: Set[str] = set()
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(p.stat().st_size for p in (self.directory / "texts").glob("*/*.txt"))
+            if digest is not None:
+                path = self._text_path(digest)
+                if not path.exists():
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    data = text.encode("utf-8")
+                    tmp = path.with_suffix(".tmp")
+                    tmp.write_bytes(data)
+                    os.replace(tmp, path)
+                    self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_bytes:
+                removed = self._evict(pinned)
+                index = {url: entry for url, entry in index.items() if entry["text_hash"] not in removed}
+            tmp = self.directory / "index.json.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(index, f, ensure_ascii=False)
+            os.replace(tmp, self.directory / "index.json")
+        return removed
+
+    def _evict(self, pinned: Set[str]) -> Set[str]:
+        """Supprimer les textes les moins récemment utilisés (hors `pinned`) jusqu'à 90 % de `max_bytes`"""
+        files = []
+        for path in (self.directory / "texts").glob("*/*.txt"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        removed = set()
+        for _, size, path in files:
+            if self._disk_bytes <= self.max_bytes * 0.9:
+                break
+            if path.stem in pinned:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._disk_bytes -= size
+            removed.add(path.stem)
+            self.evictions += 1
+        return removed
+
+    async def _save(self, digest: Optional[str] = None, text: Optional[str] = None):
+        """Persister l'index (et un nouveau texte) hors de la boucle, puis oublier les textes évincés"""
+        # Textes des débats en mémoire (calculés sur la boucle), et le texte enregistré
+        pinned = set(self.pinned()) if self.pinned else set()
+        if digest is not None:
+            pinned.add(digest)
+        removed = await asyncio.to_thread(self._write, dict(self._index), pinned, digest, text)
+        for url in [url for url, entry in self._index.items() if entry["text_hash"] in removed]:
+            del self._index[url]
+        for evicted in removed:
+            self._texts.pop(evicted, None)
+
+    # ===== Récupération =====
+
+    async def fetch(self, source_url: str) -> Optional[Tuple[str, str]]:
+        """(empreinte, texte) de la source `source_url`, ou None si elle est indisponible.
+
+        Source connue: une requête conditionnelle (`If-None-Match`, `If-Modified-Since`);
+        si elle échoue (réseau), le texte en cache est utilisé. Les demandes simultanées
+        d'une même URL partagent la même récupération.
+        """
+        task = self._inflight.get(source_url)
+        if task is None:
+            task = asyncio.create_task(self._fetch(source_url))
+            self._inflight[source_url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(source_url, None))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    async def _fetch(self, source_url: str) -> Optional[Tuple[str, str]]:
+        index = await asyncio.to_thread(self._load_index) if self._index is None else self._index
+        entry = index.get(source_url)
+        cached = await self.load_text(entry["text_hash"]) if entry else None
+
+        headers = {}
+        if cached is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        try:
+            downloaded = await self.fetcher.download(source_url, headers=headers or None)
+        except Exception as e:
+            if cached is None:
+                raise
+            print(f"⚠️ Revalidation de {source_url} impossible ({e}); texte en cache utilisé")
+            self.stale += 1
+            return entry["text_hash"], cached
+        if downloaded is None:
+            return None
+
+        if downloaded["content"] is None:
+            # 304: document inchangé (une réponse 304 sans texte en cache n'est pas attendue)
+            if cached is None:
+                return None
+            self.not_modified += 1
+            entry["checked_at"] = time.time()
+            await self._save()
+            return entry["text_hash"], cached
+
+        self.downloads += 1
+        raw = downloaded["content"]
+        content_hash = hashlib.sha256(raw).hexdigest()
+        if cached is not None and entry.get("content_hash") == content_hash:
+            # Serveur sans validateurs (ou qui les ignore): document identique, pas de nouvelle extraction
+            self.unchanged += 1
+            digest, text = entry["text_hash"], cached
+        else:
+            text = await self.fetcher.parse(raw, downloaded["content_type"], source_url, downloaded["encoding"])
+            self.parses += 1
+            if not text:
+                return None
+            digest = text_hash(text)
+            self._remember(digest, text)
+
+        index[source_url] = {
+            "etag": downloaded["etag"],
+            "last_modified": downloaded["last_modified"],
+            "content_hash": content_hash,
+            "text_hash": digest,
+            "checked_at": time.time(),
+        }
+        await self._save(digest, text)
+        return digest, text
+
+    def stats(self) -> dict:
+        return {
+            "urls": len(self._index or {}),
+            "texts_in_memory": len(self._texts),
+            "disk_bytes": self._disk_bytes,
+            "shared": self.shared,
+            "not_modified": self.not_modified,
+            "unchanged": self.unchanged,
+            "downloads": self.downloads,
+            "parses": self.parses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+        }
@@ -1,9 +1,16 @@
-import requests
+import asyncio
 import io
+import multiprocessing
 import re
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
 from urllib.parse import urlparse
 
+import httpx
+
 try:
     from PyPDF2 import PdfReader
 except Exception:
@@ -15,48 +22,26 @@ except Exception:
     BeautifulSoup = None
 
 
-def fetch_source_text(source_url: str, allowed_domains_env: str = None, max_bytes_env: str = None):
-    """Récupère et extrait le texte d'une URL donnée (HTML ou PDF).
+def domain_allowed(url: str, allowed_domains: Optional[str]) -> bool:
+    """Domaine de `url` présent dans la liste CSV `allowed_domains` (toujours vrai sans liste)"""
+    if not allowed_domains:
+        return True
+    domain = (urlparse(str(url)).hostname or '').lower()
+    allowed = [d.strip().lower() for d in allowed_domains.split(',') if d.strip()]
+    if domain not in allowed:
+        print(f"⚠️ Domaine {domain} non autorisé pour la source.")
+        return False
+    return True
 
-    - Vérifie le domaine si `allowed_domains_env` fourni (liste CSV) ou via env `ALLOWED_SOURCE_DOMAINS`.
-    - Limite la lecture à `max_bytes_env` (ou env `SOURCE_MAX_BYTES`, défaut 2MB).
-    - Retourne le texte extrait ou `None` si échec / non autorisé / trop volumineux.
-    """
-    ALLOWED_DOMAINS = allowed_domains_env or os.environ.get('ALLOWED_SOURCE_DOMAINS')
-    MAX_BYTES = int(max_bytes_env or os.environ.get('SOURCE_MAX_BYTES', str(2 * 1024 * 1024)))
-
-    parsed = urlparse(source_url)
-    domain = parsed.hostname or ''
-    if ALLOWED_DOMAINS:
-        allowed = [d.strip().lower() for d in ALLOWED_DOMAINS.split(',') if d.strip()]
-        if domain.lower() not in allowed:
-            print(f"⚠️ Domaine {domain} non autorisé pour la source.")
-            return None
 
-    resp = requests.get(source_url, timeout=10, stream=True)
-    content_length = resp.headers.get('Content-Length')
-    if content_length and int(content_length) > MAX_BYTES:
-        print(f"⚠️ Fichier trop volumineux ({content_length} bytes) > limite {MAX_BYTES}")
-        return None
-
-    collected = io.BytesIO()
-    total = 0
-    for chunk in resp.iter_content(1024):
-        if not chunk:
-            break
-        collected.write(chunk)
-        total += len(chunk)
-        if total > MAX_BYTES:
-            print(f"⚠️ Fichier dépassant la taille maximale ({MAX_BYTES} bytes)")
-            return None
+def extract_text(raw: bytes, content_type: str, source_url: str, encoding: Optional[str] = None) -> Optional[str]:
+    """Extraire le texte d'un document téléchargé (PDF ou HTML/texte).
 
-    raw = collected.getvalue()
+    Exécuté dans un processus de travail: l'extraction (PyPDF2, BeautifulSoup) est du
+    Python pur qui monopoliserait la boucle d'événements sur un document volumineux.
+    """
     extracted = None
-
-    try:
-        ctype = (resp.headers.get('Content-Type') or '').lower()
-    except Exception:
-        ctype = ''
+    ctype = (content_type or '').lower()
 
     # Traiter PDF
     if 'pdf' in ctype or source_url.lower().endswith('.pdf'):
@@ -79,8 +64,7 @@ def fetch_source_text(source_url: str, allowed_domains_env: str = None, max_byte
     else:
         # Traiter HTML/text
         try:
-            encoding = resp.encoding or 'utf-8'
-            html = raw.decode(encoding, errors='replace')
+            html = raw.decode(encoding or 'utf-8', errors='replace')
             if BeautifulSoup is not None:
                 try:
                     soup = BeautifulSoup(html, 'html.parser')
@@ -96,15 +80,194 @@ def fetch_source_text(source_url: str, allowed_domains_env: str = None, max_byte
                 text = re.sub('<script[^>]*>.*?</script>', '', html, flags=re.S | re.I)
                 text = re.sub('<style[^>]*>.*?</style>', '', text, flags=re.S | re.I)
                 text = re.sub('<[^>]+>', '', text)
-                extracted = re.sub('\s+', ' ', text).strip()
+                extracted = re.sub(r'\s+', ' ', text).strip()
         except Exception as e:
             print(f"⚠️ Erreur decoding HTML: {e}")
             extracted = None
-    print(f"✅ Extraction source depuis {source_url} réussie.")
-    print(extracted[:500])  # Debug: afficher un extrait
-
     return extracted
 
+
+class SourceFetcher:
+    """Téléchargement asynchrone des sources des débats.
+
+    - Client HTTP partagé (connexions persistantes), délais distincts de connexion,
+      de lecture entre deux blocs et de téléchargement total.
+    - Lecture par blocs de `chunk_bytes`, abandonnée au-delà de `max_bytes`; domaine
+      vérifié à chaque redirection (`ALLOWED_SOURCE_DOMAINS`).
+    - Extraction du texte dans un pool de `parse_workers` processus.
+    """
+
+    MAX_REDIRECTS = 5
+
+    def __init__(
+        self,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 10.0,
+        total_timeout: float = 30.0,
+        max_bytes: int = 2 * 1024 * 1024,
+        chunk_bytes: int = 64 * 1024,
+        max_connections: int = 20,
+        parse_workers: int = 2
+    ):
+        self.total_timeout = total_timeout
+        self.max_bytes = max_bytes
+        self.chunk_bytes = chunk_bytes
+        self.parse_workers = parse_workers
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={"User-Agent": "AgoraIA/1.0 (+source fetcher)"},
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.fetches = 0
+        self.failures = 0
+        self.bytes = 0
+        self.parses = 0
+        self.not_modified = 0
+        self.download_seconds = 0.0
+        self.parse_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> "SourceFetcher":
+        return cls(
+            connect_timeout=float(os.getenv("SOURCE_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("SOURCE_READ_TIMEOUT", "10")),
+            total_timeout=float(os.getenv("SOURCE_TOTAL_TIMEOUT", "30")),
+            max_bytes=int(os.getenv("SOURCE_MAX_BYTES", str(2 * 1024 * 1024))),
+            chunk_bytes=int(os.getenv("SOURCE_CHUNK_BYTES", str(64 * 1024))),
+            max_connections=int(os.getenv("SOURCE_MAX_CONNECTIONS", "20")),
+            parse_workers=int(os.getenv("SOURCE_PARSE_WORKERS", "2")),
+        )
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # Créé à la première source; "spawn": pas de fork d'un processus multi-thread
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def download(
+        self,
+        source_url: str,
+        allowed_domains: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        headers: Optional[dict] = None
+    ) -> Optional[dict]:
+        """Contenu brut d'une URL, ou None si refusé ou trop volumineux.
+
+        Renvoie `{"status", "content", "content_type", "encoding", "etag", "last_modified"}`;
+        `content` vaut None pour une réponse 304 à une requête conditionnelle (`headers`).
+        Les erreurs réseau et le dépassement du délai total sont levés (`httpx.HTTPError`,
+        `TimeoutError`).
+        """
+        allowed_domains = allowed_domains or os.environ.get('ALLOWED_SOURCE_DOMAINS')
+        self.fetches += 1
+        start = time.perf_counter()
+        try:
+            result = await self._download(source_url, allowed_domains, max_bytes or self.max_bytes, headers)
+        except BaseException:
+            self.failures += 1
+            raise
+        finally:
+            self.download_seconds += time.perf_counter() - start
+        if result is None:
+            self.failures += 1
+        elif result["content"] is None:
+            self.not_modified += 1
+        else:
+            self.bytes += len(result["content"])
+        return result
+
+    async def _download(self, source_url: str, allowed_domains: Optional[str], limit: int, headers: Optional[dict]):
+        url = source_url
+        async with asyncio.timeout(self.total_timeout):
+            for _ in range(self.MAX_REDIRECTS + 1):
+                if not domain_allowed(url, allowed_domains):
+                    return None
+                async with self.client.stream("GET", url, headers=headers) as response:
+                    if response.is_redirect and response.next_request is not None:
+                        url = str(response.next_request.url)
+                        continue
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    result = {
+                        "status": response.status_code,
+                        "content": None,
+                        "content_type": response.headers.get('Content-Type', ''),
+                        "encoding": response.charset_encoding,
+                        "etag": response.headers.get('ETag'),
+                        "last_modified": response.headers.get('Last-Modified'),
+                    }
+                    if response.status_code == 304:
+                        return result
+                    content_length = response.headers.get('Content-Length')
+                    if content_length and int(content_length) > limit:
+                        print(f"⚠️ Fichier trop volumineux ({content_length} bytes) > limite {limit}")
+                        return None
+
+                    collected = bytearray()
+                    async for chunk in response.aiter_bytes(self.chunk_bytes):
+                        collected += chunk
+                        if len(collected) > limit:
+                            print(f"⚠️ Fichier dépassant la taille maximale ({limit} bytes)")
+                            return None
+                    result["content"] = bytes(collected)
+                    return result
+        raise httpx.TooManyRedirects(f"Plus de {self.MAX_REDIRECTS} redirections", request=None)
+
+    async def parse(self, raw: bytes, content_type: str, source_url: str, encoding: Optional[str] = None) -> Optional[str]:
+        """`extract_text` dans le pool de processus (dans un thread si le pool est inutilisable)"""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            extracted = await loop.run_in_executor(self.executor, extract_text, raw, content_type, source_url, encoding)
+        except BrokenProcessPool as e:
+            # Processus de travail arrêté (ou script principal non importable): pool recréé à la prochaine source
+            print(f"⚠️ Pool d'extraction indisponible ({e}); extraction dans un thread")
+            self._executor = None
+            extracted = await asyncio.to_thread(extract_text, raw, content_type, source_url, encoding)
+        self.parse_seconds += time.perf_counter() - start
+        self.parses += 1
+        if extracted:
+            print(f"✅ Extraction source depuis {source_url} réussie.")
+        return extracted
+
+    async def fetch_text(
+        self,
+        source_url: str,
+        allowed_domains: Optional[str] = None,
+        max_bytes: Optional[int] = None
+    ) -> Optional[str]:
+        """Récupère et extrait le texte d'une URL donnée (HTML ou PDF).
+
+        - Vérifie le domaine si `allowed_domains` fourni (liste CSV) ou via env `ALLOWED_SOURCE_DOMAINS`.
+        - Limite la lecture à `max_bytes` (ou env `SOURCE_MAX_BYTES`, défaut 2MB).
+        - Retourne le texte extrait ou `None` si échec / non autorisé / trop volumineux.
+        """
+        downloaded = await self.download(source_url, allowed_domains, max_bytes)
+        if downloaded is None:
+            return None
+        return await self.parse(downloaded["content"], downloaded["content_type"], source_url, downloaded["encoding"])
+
+    async def aclose(self):
+        await self.client.aclose()
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "not_modified": self.not_modified,
+            "bytes": self.bytes,
+            "download_ms_avg": round(self.download_seconds / self.fetches * 1000, 1) if self.fetches else 0,
+            "parse_ms_avg": round(self.parse_seconds / self.parses * 1000, 1) if self.parses else 0,
+            "parse_workers": self.parse_workers,
+        }
+
+
 def topic_related_to_text(topic: str, text: str) -> bool:
     """Validation simple: vérifie si le sujet est lié au texte extrait.
 
@@ -0,0 +1,238 @@
+import asyncio
+import heapq
+import math
+import re
+import time
+from array import array
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.models.debate import Debate
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…;:])\s+")
+_WORD = re.compile(r"\w+")
+_ACCENTS = str.maketrans("àâäáãéèêëíìîïóòôöõúùûüçœæñ", "aaaaaeeeeiiiiooooouuuucoan")
+
+# Mots vides français et anglais (sources en anglais fréquentes)
+STOPWORDS = {
+    "les", "des", "une", "pour", "avec", "sans", "dans", "sur", "par", "entre", "est", "sont",
+    "qui", "que", "quoi", "dont", "aux", "ces", "ses", "leur", "leurs", "son", "sa", "mais",
+    "plus", "pas", "tout", "tous", "elle", "ils", "elles", "nous", "vous", "cette", "comme",
+    "ont", "été", "etre", "être", "avoir", "fait", "peut", "aussi", "donc", "ainsi", "the",
+    "and", "for", "with", "that", "this", "are", "was", "from", "have", "has", "not", "but",
+}
+
+
+def terms(text: str) -> List[str]:
+    """Termes indexés: minuscules sans accents, mots vides retirés, pluriels simples ramenés au singulier"""
+    words = _WORD.findall(text.lower())
+    result = []
+    for word in words:
+        if len(word) < 3 or word in STOPWORDS or word.isdigit():
+            continue
+        word = word.translate(_ACCENTS)
+        if len(word) > 4 and word[-1] in "sx":
+            word = word[:-1]
+        result.append(word)
+    return result
+
+
+def chunk_text(text: str, chunk_chars: int = 1000) -> List[str]:
+    """Découper un texte en passages d'environ `chunk_chars` caractères, aux limites de phrases"""
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for sentence in _SENTENCE_END.split(" ".join(text.split())):
+        # Phrase démesurée (tableaux, texte sans ponctuation): découpée aux espaces
+        while len(sentence) > chunk_chars:
+            cut = sentence.rfind(" ", 0, chunk_chars)
+            cut = cut if cut > 0 else chunk_chars
+            if current:
+                chunks.append(" ".join(current))
+                current, size = [], 0
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if size and size + len(sentence) > chunk_chars:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        if sentence:
+            current.append(sentence)
+            size += len(sentence) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class SourceIndex:
+    """Index BM25 des passages d'un texte source.
+
+    Index inversé dont les poids BM25 (idf × tf saturé, normalisé par la longueur du
+    passage) sont calculés une fois à la construction: une requête n'additionne que les
+    poids des passages contenant ses termes.
+    """
+
+    def __init__(self, text: str, chunk_chars: int = 1000, k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunk_text(text, chunk_chars)
+        self.source_length = len(text)
+        counts = [Counter(terms(chunk)) for chunk in self.chunks]
+        lengths = [sum(c.values()) for c in counts]
+        average = (sum(lengths) / len(lengths)) if lengths and sum(lengths) else 1.0
+
+        postings: Dict[str, Tuple[array, array]] = {}
+        for doc, (doc_counts, length) in enumerate(zip(counts, lengths)):
+            norm = k1 * (1 - b + b * length / average)
+            for term, tf in doc_counts.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (array("I"), array("d"))
+                entry[0].append(doc)
+                entry[1].append(tf * (k1 + 1) / (tf + norm))
+
+        total = len(self.chunks)
+        for ids, weights in postings.values():
+            idf = math.log(1 + (total - len(ids) + 0.5) / (len(ids) + 0.5))
+            for i in range(len(weights)):
+                weights[i] *= idf
+        self.postings = postings
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """Les `k` passages les plus pertinents pour `query`: (indice, score), score décroissant"""
+        scores = [0.0] * len(self.chunks)
+        matched = False
+        for term in set(terms(query)):
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            matched = True
+            for doc, weight in zip(*entry):
+                scores[doc] += weight
+        if not matched:
+            return []
+        best = heapq.nlargest(k, range(len(scores)), key=scores.__getitem__)
+        return [(doc, scores[doc]) for doc in best if scores[doc] > 0]
+
+
+class SourceRetriever:
+    """Passages de la source d'un débat transmis aux agents à chaque tour.
+
+    La source est découpée et indexée une fois (au démarrage du débat, ou en tâche de fond
+    à la première requête après un redémarrage), l'index étant partagé par les débats d'un
+    même texte du cache des sources; chaque tour reçoit les `top_k` passages les plus
+    pertinents pour le sujet et la dernière intervention, dans un budget de tokens,
+    dans l'ordre du document. Au plus `max_indexes` index sont conservés (LRU).
+
+    La construction (`SourceIndex`, sans état partagé) s'exécute dans un thread; l'index
+    n'est ajouté au LRU que sur la boucle d'événements.
+    """
+
+    def __init__(self, top_k: int = 4, budget: int = 1500, chunk_chars: int = 1000, max_indexes: int = 256):
+        self.top_k = top_k
+        self.budget = budget
+        self.chunk_chars = chunk_chars
+        self.max_indexes = max_indexes
+        self._indexes: "OrderedDict[str, SourceIndex]" = OrderedDict()
+        # Constructions en cours par clé
+        self._building: Dict[str, asyncio.Task] = {}
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.deferred = 0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.passages = 0
+
+    async def build(self, key: str, text: str) -> Optional[SourceIndex]:
+        """Indexer le texte source d'un débat hors de la boucle d'événements (une seule
+        construction à la fois par clé); None si l'indexation échoue"""
+        task = self._building.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._build(key, text))
+            self._building[key] = task
+            task.add_done_callback(lambda _: self._building.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _build(self, key: str, text: str) -> Optional[SourceIndex]:
+        start = time.perf_counter()
+        try:
+            index = await asyncio.to_thread(SourceIndex, text, self.chunk_chars)
+        except Exception as e:
+            print(f"⚠️ Indexation de la source {key[:12]} impossible: {e}")
+            return None
+        self.build_seconds += time.perf_counter() - start
+        self.builds += 1
+        self._indexes[key] = index
+        self._indexes.move_to_end(key)
+        while len(self._indexes) > self.max_indexes:
+            self._indexes.popitem(last=False)
+        return index
+
+    @staticmethod
+    def key(debate: Debate) -> str:
+        """Clé de l'index: empreinte du texte partagé (un index par source), sinon le débat"""
+        return debate.source_hash or debate.id
+
+    def lookup(self, debate: Debate) -> Optional[SourceIndex]:
+        """Index déjà construit pour le texte source du débat, sans le construire"""
+        key = self.key(debate)
+        index = self._indexes.get(key)
+        if index is None or not debate.source_text or index.source_length != len(debate.source_text):
+            return None
+        self._indexes.move_to_end(key)
+        return index
+
+    async def index(self, debate: Debate) -> Optional[SourceIndex]:
+        """Index du texte source du débat, construit si nécessaire"""
+        if not debate.source_text:
+            return None
+        return self.lookup(debate) or await self.build(self.key(debate), debate.source_text)
+
+    def context(self, debate: Debate, query: str, count: Callable[[str], int]) -> Optional[str]:
+        """Extraits de la source pour le prochain tour (`count`: tokens d'un texte pour l'agent).
+
+        Sans index (premier tour après un redémarrage), l'indexation est lancée en tâche de
+        fond et ce tour ne reçoit pas d'extraits plutôt que d'attendre.
+        """
+        if not debate.source_text:
+            return None
+        index = self.lookup(debate)
+        if index is None:
+            key = self.key(debate)
+            if key not in self._building:
+                asyncio.ensure_future(self.build(key, debate.source_text))
+            self.deferred += 1
+            return None
+        if not index.chunks:
+            return None
+        start = time.perf_counter()
+        ranked = [doc for doc, _ in index.search(query, self.top_k)]
+        if not ranked:
+            # Aucun terme commun: début du document
+            ranked = list(range(min(self.top_k, len(index.chunks))))
+        self.query_seconds += time.perf_counter() - start
+        self.queries += 1
+
+        selected, used = [], 0
+        for doc in ranked:
+            tokens = count(index.chunks[doc])
+            if selected and used + tokens > self.budget:
+                continue
+            selected.append(doc)
+            used += tokens
+        self.passages += len(selected)
+
+        total = len(index.chunks)
+        source = debate.config.source_url or "la source du débat"
+        parts = [f"Extraits de {source} (passages les plus pertinents pour ce tour):"]
+        parts.extend(f"[Passage {doc + 1}/{total}] {index.chunks[doc]}" for doc in sorted(selected))
+        return "\n\n".join(parts)
+
+    def stats(self) -> dict:
+        return {
+            "indexes": len(self._indexes),
+            "builds": self.builds,
+            "build_ms_avg": round(self.build_seconds / self.builds * 1000, 1) if self.builds else 0,
+            "building": len(self._building),
+            "turns_without_index": self.deferred,
+            "queries": self.queries,
+            "query_us_avg": round(self.query_seconds / self.queries * 1e6) if self.queries else 0,
+            "passages_injected": self.passages,
+        }
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict
+
+from backend.models.debate import Debate, SourceStatus
+
+
+class SourcePrefetcher:
+    """Récupération de la source des débats dès leur création (au plus une par débat).
+
+    `prepare(debate)` télécharge, extrait, valide et indexe la source, puis renseigne
+    `debate.source_status`. Le démarrage du débat attend la tâche en cours au lieu de
+    refaire ce travail; une source en échec (`failed`) est retentée à ce moment-là.
+    """
+
+    def __init__(self, prepare: Callable[[Debate], Awaitable[None]]):
+        self.prepare = prepare
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.started = 0
+        self.ready_at_start = 0
+        self.awaited = 0
+        self.cold = 0
+        self.wait_seconds = 0.0
+
+    def start(self, debate: Debate) -> asyncio.Task:
+        """Lancer la récupération de la source du débat (sans effet si elle est en cours)"""
+        task = self._tasks.get(debate.id)
+        if task is None:
+            debate.source_status = SourceStatus.PENDING
+            task = asyncio.create_task(self._run(debate), name=f"source-prefetch-{debate.id}")
+            self._tasks[debate.id] = task
+            self.started += 1
+        return task
+
+    async def _run(self, debate: Debate):
+        try:
+            await self.prepare(debate)
+        except Exception as e:
+            print(f"⚠️ Récupération de la source du débat {debate.id} impossible: {e}")
+            debate.source_status = SourceStatus.FAILED
+        finally:
+            self._tasks.pop(debate.id, None)
+
+    async def wait(self, debate: Debate) -> SourceStatus:
+        """État de la source au démarrage du débat, en attendant la récupération si nécessaire"""
+        if debate.source_status in (SourceStatus.READY, SourceStatus.IRRELEVANT) and debate.id not in self._tasks:
+            self.ready_at_start += 1
+            return debate.source_status
+        if debate.id in self._tasks:
+            self.awaited += 1
+        else:
+            # Débat créé avant un redémarrage, ou source en échec: récupération à froid
+            self.cold += 1
+        start = time.perf_counter()
+        # La récupération continue même si la requête de démarrage est abandonnée
+        await asyncio.shield(self.start(debate))
+        self.wait_seconds += time.perf_counter() - start
+        return debate.source_status
+
+    async def shutdown(self):
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        waits = self.awaited + self.cold
+        return {
+            "pending": len(self._tasks),
+            "started": self.started,
+            "ready_at_start": self.ready_at_start,
+            "awaited": self.awaited,
+            "cold": self.cold,
+            "wait_ms_avg": round(self.wait_seconds / waits * 1000, 1) if waits else 0,
+        }
@@ -0,0 +1,144 @@
+import asyncio
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from backend.models.debate import Debate
+from backend.services.deadline import TurnDeadline
+
+
+def transcript_version(debate: Debate) -> str:
+    """Version de la transcription: le tour suivant n'en dépend qu'à travers elle"""
+    last_id = debate.messages[-1].id if debate.messages else ""
+    return f"{len(debate.messages)}:{last_id}"
+
+
+class SpeculativeTurn:
+    """Tour généré d'avance en tâche de fond; ses segments sont mis en tampon.
+
+    `stream()` rejoue le tampon puis suit la génération en cours. Si ce flux est fermé
+    avant la fin (client déconnecté), la génération est annulée.
+    """
+
+    def __init__(self, debate_id: str, version: str, deadline: TurnDeadline):
+        self.debate_id = debate_id
+        self.version = version
+        self.deadline = deadline
+        self.chunks: List[str] = []
+        self.usage: Dict[str, int] = {}
+        self.done = False
+        self.generation_time: Optional[float] = None
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    async def _generate(self, stream: AsyncIterator[str]):
+        try:
+            async with aclosing(self.deadline.iterate(stream)) as chunks:
+                async for chunk in chunks:
+                    self.chunks.append(chunk)
+                    self._changed.set()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self.generation_time = self.deadline.elapsed()
+            self._changed.set()
+
+    async def stream(self) -> AsyncIterator[str]:
+        index = 0
+        try:
+            while True:
+                while index < len(self.chunks):
+                    yield self.chunks[index]
+                    index += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                self._changed.clear()
+                await self._changed.wait()
+        finally:
+            if not self.done:
+                self.cancel()
+
+    def cancel(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+
+class Speculator:
+    """Pré-génération du tour suivant de chaque débat (au plus une par débat).
+
+    Le tour pré-généré n'est servi que si la transcription n'a pas changé depuis son
+    lancement; sinon il est abandonné (tâche annulée, place libérée). Un tour terminé
+    mais jamais demandé est abandonné après `ttl` secondes.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._turns: Dict[str, SpeculativeTurn] = {}
+        self.started = 0
+        self.hits = 0
+        self.discarded = 0
+
+    def start(
+        self,
+        debate: Debate,
+        deadline: TurnDeadline,
+        open_stream: Callable[[Dict[str, int]], AsyncIterator[str]]
+    ) -> SpeculativeTurn:
+        """Lancer la pré-génération; `open_stream(usage)` ouvre le flux du fournisseur"""
+        self.discard(debate.id)
+        turn = SpeculativeTurn(debate.id, transcript_version(debate), deadline)
+        turn.task = asyncio.create_task(
+            self._run(turn, open_stream(turn.usage)), name=f"speculative-turn-{debate.id}"
+        )
+        self._turns[debate.id] = turn
+        self.started += 1
+        return turn
+
+    async def _run(self, turn: SpeculativeTurn, stream: AsyncIterator[str]):
+        await turn._generate(stream)
+        if turn.error is not None:
+            print(f"⚠️ Pré-génération abandonnée pour le débat {turn.debate_id}: {turn.error}")
+            self._drop(turn)
+            return
+        asyncio.get_running_loop().call_later(self.ttl, self._drop, turn)
+
+    def take(self, debate: Debate) -> Optional[SpeculativeTurn]:
+        """Retirer le tour pré-généré s'il correspond à la transcription actuelle"""
+        turn = self._turns.pop(debate.id, None)
+        if turn is None:
+            return None
+        if turn.version != transcript_version(debate):
+            self.discarded += 1
+            turn.cancel()
+            return None
+        self.hits += 1
+        return turn
+
+    def discard(self, debate_id: str):
+        """Abandonner la pré-génération d'un débat modifié autrement"""
+        turn = self._turns.pop(debate_id, None)
+        if turn is not None:
+            self.discarded += 1
+            turn.cancel()
+
+    def _drop(self, turn: SpeculativeTurn):
+        if self._turns.get(turn.debate_id) is turn:
+            self.discard(turn.debate_id)
+
+    async def shutdown(self):
+        tasks = [turn.task for turn in self._turns.values() if turn.task is not None]
+        self._turns.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._turns),
+            "started": self.started,
+            "hits": self.hits,
+            "discarded": self.discarded,
+        }
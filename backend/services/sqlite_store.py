@@ -0,0 +1,385 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from backend.models.agent import AgentConfig
+from backend.models.debate import Debate, DebateMessage
+from backend.services.storage import DebateStore, decode_cursor, encode_cursor, message_positions, persisted_source
+
+if TYPE_CHECKING:
+    from backend.services.debate_cache import DebateCache
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS debates (
+    id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    agent1_id TEXT NOT NULL,
+    agent2_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    current_turn INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    completed_at TEXT,
+    header TEXT NOT NULL,
+    source_text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_debates_created ON debates (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_debates_status ON debates (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_debates_agent1 ON debates (agent1_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_debates_agent2 ON debates (agent2_id, created_at, id);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    debate_id TEXT NOT NULL REFERENCES debates (id) ON DELETE CASCADE,
+    turn_number INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    agent_id TEXT,
+    content TEXT NOT NULL,
+    timestamp TEXT,
+    tokens_used INTEGER,
+    generation_time REAL,
+    truncated INTEGER NOT NULL DEFAULT 0,
+    input_tokens INTEGER,
+    cached_tokens INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_messages_debate_turn ON messages (debate_id, turn_number, seq);
+"""
+
+# Colonnes ajoutées après la création initiale du schéma: nom -> définition
+MESSAGE_MIGRATIONS = {
+    "generation_time": "REAL",
+    "truncated": "INTEGER NOT NULL DEFAULT 0",
+    "input_tokens": "INTEGER",
+    "cached_tokens": "INTEGER",
+}
+
+DEBATE_COLUMNS = "id, topic, agent1_id, agent2_id, status, current_turn, created_at, started_at, completed_at, header"
+
+
+class SQLiteStore(DebateStore):
+    """Stockage SQLite (bibliothèque standard) des agents et des débats actifs.
+
+    Les en-têtes de débats sont indexés par statut, agents et date de création; les
+    messages ont leur propre table indexée par (debate_id, turn_number). Une écriture
+    ne concerne que les débats modifiés et leurs nouveaux messages.
+    """
+
+    queries_on_disk = True
+
+    def __init__(
+        self,
+        agents: Dict[str, AgentConfig],
+        debates: "DebateCache",
+        agents_file: Path,
+        db_path: Path,
+        active_debates_file: Optional[Path] = None
+    ):
+        super().__init__(agents, debates, agents_file)
+        self.db_path = Path(db_path)
+        self.active_debates_file = Path(active_debates_file) if active_debates_file else None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+        # Débats modifiés depuis la dernière écriture: id -> (débat, inclure le texte source)
+        self._dirty: Dict[str, Tuple[Debate, bool]] = {}
+        self._new_messages: Dict[str, List[DebateMessage]] = {}
+        # Débats dont un message a été inséré avant d'autres: `seq` à renuméroter
+        self._reordered: Dict[str, Debate] = {}
+
+    def _migrate(self):
+        """Ajouter aux bases existantes les colonnes apparues depuis leur création"""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(messages)")}
+        for name, definition in MESSAGE_MIGRATIONS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE messages ADD COLUMN {name} {definition}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ===== Chargement =====
+
+    def load_agents(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM agents ORDER BY created_at, id").fetchall()
+        if not rows and self.agents_file.exists():
+            # Première utilisation: importer les agents du fichier JSON
+            with open(self.agents_file, 'r', encoding='utf-8') as f:
+                agents_data = json.load(f).get('agents', [])
+            for agent_data in agents_data:
+                agent = AgentConfig(**agent_data)
+                self.agents[agent.id] = agent
+            self.write_agents(self.collect_agents())
+            print(f"✅ {len(self.agents)} agents importés depuis {self.agents_file} dans {self.db_path}")
+            return
+        for row in rows:
+            agent = AgentConfig(**json.loads(row["data"]))
+            self.agents[agent.id] = agent
+        print(f"✅ {len(self.agents)} agents chargés depuis {self.db_path}")
+
+    def load_debates(self):
+        """Indexer les débats terminés (résumés) et hydrater uniquement les débats en cours"""
+        with self._lock:
+            empty = self._conn.execute("SELECT COUNT(*) FROM debates").fetchone()[0] == 0
+        if empty and self.active_debates_file and self.active_debates_file.exists():
+            self._import_active_debates()
+        evictable = tuple(self.debates.EVICTABLE_STATUSES)
+        placeholders = ",".join("?" for _ in evictable)
+        with self._lock:
+            archived = self._conn.execute(
+                f"SELECT header FROM debates WHERE status IN ({placeholders})", evictable
+            ).fetchall()
+            rows = self._conn.execute(
+                f"SELECT {DEBATE_COLUMNS}, source_text FROM debates WHERE status NOT IN ({placeholders})", evictable
+            ).fetchall()
+            messages = self._conn.execute(
+                f"SELECT m.* FROM messages m JOIN debates d ON d.id = m.debate_id "
+                f"WHERE d.status NOT IN ({placeholders}) ORDER BY m.debate_id, m.seq", evictable
+            ).fetchall()
+        for row in archived:
+            self.debates.index(json.loads(row["header"]))
+        by_debate: Dict[str, List[dict]] = {}
+        for row in messages:
+            by_debate.setdefault(row["debate_id"], []).append(self._message_from_row(row))
+        for row in rows:
+            debate = self._debate_from_row(row, by_debate.get(row["id"], []))
+            self.debates[debate.id] = debate
+        print(f"✅ {len(rows)} débats actifs chargés, {len(archived)} débats terminés indexés depuis {self.db_path}")
+
+    def _read_debate(self, debate_id: str) -> Optional[Debate]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {DEBATE_COLUMNS}, source_text FROM debates WHERE id = ?", (debate_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            messages = self._conn.execute(
+                "SELECT * FROM messages WHERE debate_id = ? ORDER BY seq", (debate_id,)
+            ).fetchall()
+        return self._debate_from_row(row, [self._message_from_row(m) for m in messages])
+
+    def _import_active_debates(self):
+        """Première utilisation: importer active_debates.json dans la base"""
+        with open(self.active_debates_file, 'r', encoding='utf-8-sig') as f:
+            debates_data = json.load(f).get('debates', [])
+        debates = [Debate(**debate_data) for debate_data in debates_data]
+        self._write_rows([
+            (self._debate_params(debate, include_source=True), self._message_params(debate, debate.messages))
+            for debate in debates
+        ])
+        print(f"✅ {len(debates)} débats importés depuis {self.active_debates_file} dans {self.db_path}")
+
+    @staticmethod
+    def _message_from_row(row) -> dict:
+        return {
+            "id": row["id"],
+            "debate_id": row["debate_id"],
+            "role": row["role"],
+            "agent_id": row["agent_id"],
+            "content": row["content"],
+            "timestamp": row["timestamp"],
+            "turn_number": row["turn_number"],
+            "tokens_used": row["tokens_used"],
+            "generation_time": row["generation_time"],
+            "truncated": bool(row["truncated"]),
+            "input_tokens": row["input_tokens"],
+            "cached_tokens": row["cached_tokens"],
+        }
+
+    @staticmethod
+    def _debate_from_row(row, messages: List[dict]) -> Debate:
+        debate_data = json.loads(row["header"])
+        debate_data["messages"] = messages
+        if "source_text" in row.keys():
+            debate_data["source_text"] = row["source_text"]
+        return Debate(**debate_data)
+
+    # ===== Écriture =====
+
+    def record_debate(self, debate: Debate, new_messages: List[DebateMessage] = (), include_source: bool = False):
+        include_source = include_source or (debate.id in self._dirty and self._dirty[debate.id][1])
+        self._dirty[debate.id] = (debate, include_source)
+        if new_messages:
+            self._new_messages.setdefault(debate.id, []).extend(new_messages)
+            if message_positions(debate, new_messages):
+                self._reordered[debate.id] = debate
+
+    def collect_agents(self) -> List[tuple]:
+        return [
+            (agent.id, agent.created_at.isoformat(), agent.model_dump_json())
+            for agent in self.agents.values()
+        ]
+
+    def write_agents(self, rows: List[tuple]):
+        with self._lock, self._conn:
+            ids = [row[0] for row in rows]
+            placeholders = ",".join("?" for _ in ids)
+            self._conn.execute(f"DELETE FROM agents WHERE id NOT IN ({placeholders})", ids)
+            self._conn.executemany(
+                "INSERT INTO agents (id, created_at, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET created_at = excluded.created_at, data = excluded.data",
+                rows
+            )
+        print(f"💾 {len(rows)} agents sauvegardés dans {self.db_path}")
+
+    @staticmethod
+    def _debate_params(debate: Debate, include_source: bool) -> dict:
+        header = debate.model_dump(mode="json", exclude={"messages", "source_text"})
+        return {
+            "id": debate.id,
+            "topic": debate.topic,
+            "agent1_id": debate.agent1_id,
+            "agent2_id": debate.agent2_id,
+            "status": header["status"],
+            "current_turn": debate.current_turn,
+            "created_at": header["created_at"],
+            "started_at": header["started_at"],
+            "completed_at": header["completed_at"],
+            "header": json.dumps(header, ensure_ascii=False),
+            "source_text": persisted_source(debate) if include_source else None,
+            "include_source": include_source,
+        }
+
+    @staticmethod
+    def _message_params(debate: Debate, messages: List[DebateMessage]) -> List[tuple]:
+        positions = {message.id: index for index, message in enumerate(debate.messages)}
+        return [
+            (
+                message.id,
+                debate.id,
+                message.turn_number,
+                positions.get(message.id, len(debate.messages)),
+                message.role,
+                message.agent_id,
+                message.content,
+                message.timestamp.isoformat() if message.timestamp else None,
+                message.tokens_used,
+                message.generation_time,
+                int(message.truncated),
+                message.input_tokens,
+                message.cached_tokens,
+            )
+            for message in messages
+        ]
+
+    def collect_debates(self) -> dict:
+        """En-têtes des débats modifiés et leurs nouveaux messages"""
+        dirty, self._dirty = self._dirty, {}
+        new_messages, self._new_messages = self._new_messages, {}
+        rows = [
+            (
+                self._debate_params(debate, include_source),
+                self._message_params(debate, new_messages.get(debate_id, []))
+            )
+            for debate_id, (debate, include_source) in dirty.items()
+        ]
+        reordered, self._reordered = self._reordered, {}
+        reorder = [
+            (seq, message.id)
+            for debate in reordered.values()
+            for seq, message in enumerate(debate.messages)
+        ]
+        # Les débats évincés sont libérés une fois leurs modifications écrites
+        return {"rows": rows, "reorder": reorder, "evicted": list(self._evicted.items())}
+
+    def write_debates(self, payload: dict):
+        self._write_rows(payload["rows"], payload["reorder"])
+        self._release_evicted(payload["evicted"])
+
+    def _write_rows(self, rows: List[Tuple[dict, List[tuple]]], reorder: List[Tuple[int, str]] = ()):
+        """Écrire les en-têtes et les nouveaux messages; `reorder`: (seq, id) des messages dont
+        la position a changé (insertion avant des messages déjà écrits)"""
+        with self._lock, self._conn:
+            for debate_params, message_rows in rows:
+                self._conn.execute(
+                    "INSERT INTO debates (id, topic, agent1_id, agent2_id, status, current_turn, created_at, "
+                    "started_at, completed_at, header, source_text) VALUES (:id, :topic, :agent1_id, :agent2_id, "
+                    ":status, :current_turn, :created_at, :started_at, :completed_at, :header, :source_text) "
+                    "ON CONFLICT(id) DO UPDATE SET topic = excluded.topic, status = excluded.status, "
+                    "current_turn = excluded.current_turn, started_at = excluded.started_at, "
+                    "completed_at = excluded.completed_at, header = excluded.header, "
+                    "source_text = CASE WHEN :include_source THEN excluded.source_text ELSE debates.source_text END",
+                    debate_params
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO messages (id, debate_id, turn_number, seq, role, agent_id, content, "
+                    "timestamp, tokens_used, generation_time, truncated, input_tokens, cached_tokens) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    message_rows
+                )
+            if reorder:
+                self._conn.executemany("UPDATE messages SET seq = ? WHERE id = ?", reorder)
+
+    # ===== Requêtes =====
+
+    def list_agents(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[AgentConfig], Optional[str]]:
+        query = "SELECT id, created_at, data FROM agents"
+        params: list = []
+        if cursor:
+            created_at, agent_id = decode_cursor(cursor)
+            query += " WHERE (created_at, id) > (?, ?)"
+            params += [created_at, agent_id]
+        query += " ORDER BY created_at, id LIMIT ?"
+        params.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return [AgentConfig(**json.loads(row["data"])) for row in rows], next_cursor
+
+    def list_debates(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        conditions: List[str] = []
+        params: list = []
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if cursor:
+            created_at, debate_id = decode_cursor(cursor)
+            conditions.append("(created_at, id) < (?, ?)")
+            params += [created_at, debate_id]
+        where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+
+        if agent_id is None:
+            query = f"SELECT {DEBATE_COLUMNS} FROM debates{where} ORDER BY created_at DESC, id DESC LIMIT ?"
+            params.append(limit + 1)
+        else:
+            # UNION des deux index agent1/agent2 plutôt qu'un OR qui empêche leur usage
+            agent_where = " AND ".join(conditions + ["{column} = ?"])
+            branch = f"SELECT {DEBATE_COLUMNS} FROM debates WHERE {agent_where}"
+            query = (
+                f"{branch.format(column='agent1_id')} UNION {branch.format(column='agent2_id')} "
+                "ORDER BY created_at DESC, id DESC LIMIT ?"
+            )
+            params = params + [agent_id] + params + [agent_id] + [limit + 1]
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        return [json.loads(row["header"]) for row in rows], next_cursor
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from backend.models.agent import AgentConfig
+
+# Framing SSE pré-encodé: seul le texte du segment est sérialisé à chaque trame
+_TOKEN_FRAME_PREFIX = b'data: {"type": "token", "text": '
+_FRAME_SUFFIX = b'}\n\n'
+
+
+def sse_event(payload: dict, event_id: Optional[str] = None) -> bytes:
+    """Trame SSE encodée d'un événement arbitraire (done, error...), avec son `id` éventuel"""
+    frame = b"data: " + json.dumps(payload).encode("utf-8") + b"\n\n"
+    if event_id is not None:
+        frame = b"id: " + event_id.encode("ascii") + b"\n" + frame
+    return frame
+
+
+def sse_token(text: str) -> bytes:
+    """Trame SSE encodée d'un segment de texte, identique à `sse_event({"type": "token", "text": text})`"""
+    return _TOKEN_FRAME_PREFIX + json.dumps(text).encode("utf-8") + _FRAME_SUFFIX
+
+
+class FlushPolicy:
+    """Politique de regroupement des segments du fournisseur en trames SSE.
+
+    - "immediate": une trame par segment reçu (comportement historique)
+    - "coalesce": les segments sont accumulés et envoyés dès que le tampon atteint
+      `max_bytes`, ou que le plus ancien segment en attente a `max_latency` secondes
+      (même si le fournisseur ne produit plus rien entre-temps)
+    """
+
+    MODES = ("immediate", "coalesce")
+
+    def __init__(self, mode: str = "coalesce", max_bytes: int = 256, max_latency: float = 0.05):
+        if mode not in self.MODES:
+            raise ValueError(f"Politique de flush SSE inconnue: {mode}")
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+
+    def __repr__(self) -> str:
+        if self.mode == "immediate":
+            return "FlushPolicy(immediate)"
+        return f"FlushPolicy(coalesce, max_bytes={self.max_bytes}, max_latency={self.max_latency * 1000:.0f}ms)"
+
+
+class SSEStats:
+    """Compteurs cumulés des trames de tokens émises et des flux interrompus (exposés par /stats).
+
+    Tokens économisés par l'annulation d'un flux: longueur moyenne des dernières réponses
+    complètes de l'agent (`output_tokens` rapportés par le fournisseur), moins les tokens
+    déjà générés; sans réponse connue pour l'agent, pas d'estimation. `tokens_budget_unused`
+    est le majorant calculé sur `max_tokens`.
+    """
+
+    def __init__(self, reply_window: int = 20):
+        self.frames = 0
+        self.bytes = 0
+        self.chunks = 0
+        self.disconnects = 0
+        self.tokens_saved = 0
+        self.tokens_budget_unused = 0
+        self.unestimated = 0
+        self.reply_window = reply_window
+        self._replies: Dict[str, deque] = {}
+
+    def record(self, frame: bytes, chunks: int):
+        self.frames += 1
+        self.bytes += len(frame)
+        self.chunks += chunks
+
+    def record_reply(self, agent_id: str, output_tokens: int):
+        """Longueur (tokens générés) d'une réponse complète de l'agent"""
+        replies = self._replies.get(agent_id)
+        if replies is None:
+            replies = self._replies[agent_id] = deque(maxlen=self.reply_window)
+        replies.append(output_tokens)
+
+    def record_disconnect(self, cancelled: List[Tuple[AgentConfig, str]]) -> int:
+        """Flux annulés `(agent, texte déjà généré)`; renvoie l'estimation des tokens économisés"""
+        self.disconnects += 1
+        saved = 0
+        for agent, partial in cancelled:
+            generated = len(partial) // 4
+            self.tokens_budget_unused += max(agent.max_tokens - generated, 0)
+            replies = self._replies.get(agent.id)
+            if replies:
+                saved += max(round(sum(replies) / len(replies)) - generated, 0)
+            else:
+                self.unestimated += 1
+        self.tokens_saved += saved
+        return saved
+
+    def to_dict(self) -> dict:
+        return {
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "provider_chunks": self.chunks,
+            "bytes_per_frame": round(self.bytes / self.frames, 1) if self.frames else None,
+            "chunks_per_frame": round(self.chunks / self.frames, 2) if self.frames else None,
+            "client_disconnects": self.disconnects,
+            "tokens_saved_estimate": self.tokens_saved,
+            "tokens_saved_unestimated": self.unestimated,
+            "tokens_budget_unused": self.tokens_budget_unused,
+        }
+
+
+class ClientDisconnected(Exception):
+    """Le client SSE s'est déconnecté avant la fin du flux"""
+
+
+async def wait_for_disconnect(request) -> None:
+    """Se termine lorsque le client de la requête se déconnecte"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def watch_disconnect(request, generator) -> None:
+    """Attendre la déconnexion du client du flux SSE `generator`.
+
+    Si le générateur est alors suspendu sur un `yield` (le serveur attendait l'envoi d'une
+    trame), le serveur ne le reprendra plus: il est fermé ici pour exécuter ses blocs
+    `finally`. S'il attend le fournisseur, `until_disconnected` voit la fin de cette tâche
+    et interrompt lui-même la lecture.
+    """
+    await wait_for_disconnect(request)
+    if generator.ag_frame is not None and generator.ag_await is None and not generator.ag_running:
+        await generator.aclose()
+
+
+async def until_disconnected(items: AsyncIterator, disconnected: "asyncio.Future") -> AsyncIterator:
+    """Relayer `items` tant que `disconnected` n'est pas terminé.
+
+    À la déconnexion, la lecture en cours est annulée (l'annulation remonte jusqu'au
+    flux du fournisseur, qui ferme sa connexion) et `ClientDisconnected` est levée.
+    """
+    iterator = items.__aiter__()
+    next_item = None
+    try:
+        while True:
+            next_item = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait({next_item, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if next_item not in done:
+                raise ClientDisconnected()
+            task, next_item = next_item, None
+            try:
+                item = task.result()
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        # Lecture en cours (déconnexion, ou annulation de la requête par le serveur):
+        # l'annuler et attendre sa fin avant de fermer le flux amont
+        if next_item is not None:
+            next_item.cancel()
+            await asyncio.gather(next_item, return_exceptions=True)
+        await iterator.aclose()
+
+
+async def coalesce(chunks: AsyncIterator[str], policy: FlushPolicy) -> AsyncIterator[list]:
+    """Regrouper les segments d'un flux selon `policy`; chaque lot est une liste de segments.
+
+    Tant qu'un lot est en attente, le prochain segment est lu dans une tâche conservée
+    d'un tour à l'autre: une échéance de latence vide le tampon sans annuler la lecture
+    du flux amont.
+    """
+    if policy.mode == "immediate":
+        try:
+            async for chunk in chunks:
+                yield [chunk]
+        finally:
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+        return
+
+    iterator = chunks.__aiter__()
+    buffer = []
+    buffered_bytes = 0
+    deadline: Optional[float] = None
+    pending = None
+    try:
+        while True:
+            try:
+                if pending is None and deadline is None:
+                    # Tampon vide: aucune échéance, attente directe du segment suivant
+                    chunk = await iterator.__anext__()
+                else:
+                    if pending is None:
+                        pending = asyncio.ensure_future(iterator.__anext__())
+                    timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                    done, _ = await asyncio.wait({pending}, timeout=timeout)
+                    if not done:
+                        # Latence maximale atteinte: envoyer ce qui est en attente
+                        yield buffer
+                        buffer, buffered_bytes, deadline = [], 0, None
+                        continue
+                    task, pending = pending, None
+                    chunk = task.result()
+            except StopAsyncIteration:
+                break
+            if not chunk:
+                continue
+            buffer.append(chunk)
+            buffered_bytes += len(chunk.encode("utf-8"))
+            if deadline is None:
+                deadline = time.monotonic() + policy.max_latency
+            if buffered_bytes >= policy.max_bytes:
+                yield buffer
+                buffer, buffered_bytes, deadline = [], 0, None
+        if buffer:
+            yield buffer
+    finally:
+        # Interrompre la lecture en cours puis fermer le flux amont (connexion au fournisseur)
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
+
+
+async def multiplex(streams: Dict[str, AsyncIterator]) -> AsyncIterator[Tuple[str, object]]:
+    """Fusionner plusieurs flux lus en parallèle en paires `(clé, élément)`.
+
+    La fin d'un flux est signalée par `(clé, None)`. À la fermeture, les lectures en
+    cours sont annulées et tous les flux amont fermés.
+    """
+    iterators = {key: stream.__aiter__() for key, stream in streams.items()}
+    pending = {}
+    try:
+        for key, iterator in iterators.items():
+            pending[asyncio.ensure_future(iterator.__anext__())] = key
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Ordre de déclaration des flux pour les lectures terminées en même temps
+            for task in sorted(done, key=lambda t: list(iterators).index(pending[t])):
+                key = pending.pop(task)
+                try:
+                    item = task.result()
+                except StopAsyncIteration:
+                    yield key, None
+                    continue
+                pending[asyncio.ensure_future(iterators[key].__anext__())] = key
+                yield key, item
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for iterator in iterators.values():
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
@@ -0,0 +1,322 @@
+import asyncio
+import base64
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from backend.models.agent import AgentConfig
+from backend.models.debate import Debate, DebateMessage
+from backend.services.debate_journal import DebateJournal
+
+if TYPE_CHECKING:
+    from backend.services.debate_cache import DebateCache
+
+
+def encode_cursor(created_at: str, item_id: str) -> str:
+    """Curseur opaque de pagination: position (created_at, id) du dernier élément renvoyé"""
+    raw = json.dumps([created_at, item_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return created_at, item_id
+    except Exception:
+        raise ValueError("Curseur de pagination invalide")
+
+
+def _sort_key(item) -> Tuple[str, str]:
+    if isinstance(item, dict):
+        return (item["created_at"], item["id"] or "")
+    return (item.created_at.isoformat(), item.id or "")
+
+
+def paginate(items: Iterable, limit: int, cursor: Optional[str] = None, descending: bool = False):
+    """Pagination par curseur d'une collection en mémoire (modèles ou résumés), triée par (created_at, id)"""
+    ordered = sorted(items, key=_sort_key, reverse=descending)
+    if cursor:
+        position = decode_cursor(cursor)
+        if descending:
+            ordered = [item for item in ordered if _sort_key(item) < position]
+        else:
+            ordered = [item for item in ordered if _sort_key(item) > position]
+    page = ordered[:limit]
+    next_cursor = None
+    if len(ordered) > limit:
+        next_cursor = encode_cursor(*_sort_key(page[-1]))
+    return page, next_cursor
+
+
+def debate_summary(debate: Debate) -> dict:
+    """Représentation d'un débat pour les listes (sans messages ni texte source)"""
+    return debate.model_dump(mode="json", exclude={"messages", "source_text"})
+
+
+def debate_record(debate: Debate) -> dict:
+    """Débat complet à persister; un texte source partagé (`source_hash`) reste dans le cache des sources"""
+    return debate.model_dump(mode="json", exclude={"source_text"} if debate.source_hash else None)
+
+
+def persisted_source(debate: Debate) -> Optional[str]:
+    """Texte source à persister avec le débat (aucun s'il est partagé via le cache des sources)"""
+    return None if debate.source_hash else debate.source_text
+
+
+def message_positions(debate: Debate, new_messages: List[DebateMessage]) -> Dict[str, int]:
+    """Indices des nouveaux messages qui ne sont pas simplement ajoutés en fin de transcription
+    (vide dans le cas courant: un tour ajoute son message à la fin)"""
+    if not new_messages:
+        return {}
+    tail = debate.messages[-len(new_messages):]
+    if len(tail) == len(new_messages) and all(a is b for a, b in zip(tail, new_messages)):
+        return {}
+    new_ids = {message.id for message in new_messages}
+    return {message.id: index for index, message in enumerate(debate.messages) if message.id in new_ids}
+
+
+class DebateStore:
+    """Interface commune des backends de stockage des agents et des débats actifs.
+
+    Les collections en mémoire (`agents`, et le cache `debates`) restent la référence pour
+    les handlers. Le store les charge au démarrage et persiste les modifications via le
+    worker d'écriture différée: `collect_*` s'exécute sur la boucle d'événements et capture
+    un instantané, `write_*` s'exécute dans un thread et fait les I/O.
+
+    Les débats évincés du cache (`evict`) sont conservés jusqu'à ce que leur écriture
+    soit terminée, puis relus depuis le disque par `fetch_debate`.
+    """
+
+    # Les requêtes de liste lisent-elles le disque (à exécuter hors de la boucle)?
+    queries_on_disk = False
+
+    def __init__(self, agents: Dict[str, AgentConfig], debates: "DebateCache", agents_file: Path):
+        self.agents = agents
+        self.debates = debates
+        self.agents_file = Path(agents_file)
+        # Débats évincés dont l'écriture n'est pas encore terminée
+        self._evicted: Dict[str, Debate] = {}
+
+    def load_agents(self):
+        raise NotImplementedError
+
+    def load_debates(self):
+        raise NotImplementedError
+
+    def close(self):
+        """Libérer les ressources du backend (appelé à l'arrêt)"""
+
+    def record_debate(self, debate: Debate, new_messages: List[DebateMessage] = (), include_source: bool = False):
+        """Noter les modifications d'un débat (appelé sur la boucle, sans I/O)"""
+
+    def evict(self, debate: Debate):
+        """Débat évincé du cache: le garder en mémoire jusqu'à la prochaine écriture"""
+        self._evicted[debate.id] = debate
+
+    def _release_evicted(self, evicted: List[Tuple[str, Debate]]):
+        """Oublier les débats évincés désormais écrits (sauf s'ils ont été réhydratés puis réévincés)"""
+        for debate_id, debate in evicted:
+            if self._evicted.get(debate_id) is debate:
+                self._evicted.pop(debate_id, None)
+
+    async def fetch_debate(self, debate_id: str) -> Optional[Debate]:
+        """Réhydrater un débat évincé du cache (lecture du disque dans un thread)"""
+        debate = self._evicted.pop(debate_id, None)
+        if debate is not None:
+            return debate
+        return await asyncio.to_thread(self._read_debate, debate_id)
+
+    def _read_debate(self, debate_id: str) -> Optional[Debate]:
+        raise NotImplementedError
+
+    def collect_agents(self):
+        raise NotImplementedError
+
+    def write_agents(self, payload):
+        raise NotImplementedError
+
+    def collect_debates(self):
+        raise NotImplementedError
+
+    def write_debates(self, payload):
+        raise NotImplementedError
+
+    def active_debates(self) -> List[Debate]:
+        """Débats à persister: ceux qui ne sont plus "pending" (ont été démarrés/modifiés), et
+        ceux en attente avec une source (récupération anticipée à reprendre au redémarrage)"""
+        return [
+            debate for debate in self.debates.values()
+            if debate.status != 'pending' or len(debate.messages) > 0 or debate.started_at is not None
+            or debate.config.source_url
+        ]
+
+    def list_agents(self, limit: int, cursor: Optional[str] = None) -> Tuple[List[AgentConfig], Optional[str]]:
+        """Agents triés par date de création"""
+        return paginate(self.agents.values(), limit, cursor)
+
+    def list_debates(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None,
+        agent_id: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Débats actifs filtrés, du plus récent au plus ancien"""
+        matching = [
+            summary for summary in self.debates.summaries()
+            if (status is None or summary["status"] == status)
+            and (agent_id is None or agent_id in (summary["agent1_id"], summary["agent2_id"]))
+        ]
+        return paginate(matching, limit, cursor, descending=True)
+
+
+class JsonStore(DebateStore):
+    """Stockage historique en fichiers JSON (agents.json, active_debates.json).
+
+    Avec un `journal`, les débats sont persistés en mode append-only (voir `DebateJournal`)
+    au lieu de réécrire active_debates.json à chaque modification. Les débats terminés
+    évincés du cache sont archivés individuellement dans `archive_dir` (un fichier par
+    débat, plus un index des résumés) et ne figurent plus dans le snapshot.
+    """
+
+    def __init__(
+        self,
+        agents: Dict[str, AgentConfig],
+        debates: "DebateCache",
+        agents_file: Path,
+        active_debates_file: Path,
+        archive_dir: Path,
+        journal: Optional[DebateJournal] = None
+    ):
+        super().__init__(agents, debates, agents_file)
+        self.active_debates_file = Path(active_debates_file)
+        self.archive_dir = Path(archive_dir)
+        self.archive_index_file = self.archive_dir / "index.jsonl"
+        self.journal = journal
+
+    def load_agents(self):
+        if not self.agents_file.exists():
+            print(f"ℹ️ Aucun fichier d'agents trouvé à {self.agents_file}")
+            return
+        with open(self.agents_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            for agent_data in data.get('agents', []):
+                agent = AgentConfig(**agent_data)
+                self.agents[agent.id] = agent
+        print(f"✅ {len(self.agents)} agents chargés depuis {self.agents_file}")
+
+    def load_debates(self):
+        """Indexer les débats archivés et charger les débats actifs.
+
+        Seuls les débats non terminés du snapshot (et du journal) sont hydratés; les débats
+        terminés sont archivés et seul leur résumé est gardé en mémoire.
+        """
+        if self.archive_index_file.exists():
+            with open(self.archive_index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self.debates.index(json.loads(line))
+
+        if self.journal is not None:
+            raw = self.journal.replay(load_archived=self._read_archive)
+        elif self.active_debates_file.exists():
+            with open(self.active_debates_file, 'r', encoding='utf-8-sig') as f:
+                raw = {d["id"]: d for d in json.load(f).get('debates', [])}
+        else:
+            raw = {}
+
+        archived = []
+        for debate_id, debate_data in raw.items():
+            try:
+                if debate_data.get("status") in self.debates.EVICTABLE_STATUSES:
+                    archived.append(debate_data)
+                else:
+                    self.debates[debate_id] = Debate(**debate_data)
+            except Exception as e:
+                print(f"⚠️ Débat {debate_id} ignoré au chargement: {e}")
+        # Les débats terminés quittent le snapshot pour l'archive
+        self._write_archive(archived)
+        for debate_data in archived:
+            self.debates.index(self._summary(debate_data))
+        hydrated = len(self.debates.values())
+        print(f"✅ {hydrated} débats actifs chargés, {len(self.debates) - hydrated} débats archivés indexés")
+
+    # ===== Archive des débats évincés =====
+
+    def _archive_path(self, debate_id: str) -> Path:
+        return self.archive_dir / f"{debate_id}.json"
+
+    def _read_archive(self, debate_id: str) -> Optional[dict]:
+        path = self._archive_path(debate_id)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _read_debate(self, debate_id: str) -> Optional[Debate]:
+        debate_data = self._read_archive(debate_id)
+        return Debate(**debate_data) if debate_data is not None else None
+
+    @staticmethod
+    def _summary(debate_data: dict) -> dict:
+        return {k: v for k, v in debate_data.items() if k not in ("messages", "source_text")}
+
+    def _write_archive(self, debates_data: List[dict]):
+        if not debates_data:
+            return
+        self.archive_dir.mkdir(exist_ok=True)
+        for debate_data in debates_data:
+            path = self._archive_path(debate_data["id"])
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(debate_data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        with open(self.archive_index_file, 'a', encoding='utf-8') as f:
+            for debate_data in debates_data:
+                f.write(json.dumps(self._summary(debate_data), ensure_ascii=False) + "\n")
+
+    # ===== Écriture =====
+
+    def record_debate(self, debate: Debate, new_messages: List[DebateMessage] = (), include_source: bool = False):
+        if self.journal is not None:
+            self.journal.append_debate(debate, include_source=include_source)
+            positions = message_positions(debate, new_messages)
+            for message in new_messages:
+                self.journal.append_message(debate.id, message, positions.get(message.id))
+
+    def collect_agents(self) -> dict:
+        return {
+            "agents": [agent.model_dump(mode='json') for agent in self.agents.values()]
+        }
+
+    def write_agents(self, agents_data: dict):
+        with open(self.agents_file, 'w', encoding='utf-8') as f:
+            json.dump(agents_data, f, indent=2, ensure_ascii=False)
+        print(f"💾 {len(agents_data['agents'])} agents sauvegardés dans {self.agents_file}")
+
+    def collect_debates(self) -> dict:
+        evicted = list(self._evicted.items())
+        payload = {
+            "evicted": evicted,
+            "archive": [debate_record(debate) for _, debate in evicted],
+        }
+        if self.journal is not None:
+            # Enregistrements en attente, et snapshot si une compaction est due
+            payload["records"] = self.journal.take_pending()
+            if self.journal.should_compact():
+                payload["snapshot"] = [debate_record(debate) for debate in self.active_debates()]
+        else:
+            payload["snapshot"] = [debate_record(debate) for debate in self.active_debates()]
+        return payload
+
+    def write_debates(self, payload: dict):
+        # Archiver d'abord: le snapshot suivant ne contient plus les débats évincés
+        self._write_archive(payload["archive"])
+        if self.journal is not None:
+            self.journal.write_records(payload["records"], payload.get("snapshot"))
+        else:
+            with open(self.active_debates_file, 'w', encoding='utf-8') as f:
+                json.dump({"debates": payload["snapshot"]}, f, indent=2, ensure_ascii=False)
+            print(f"💾 {len(payload['snapshot'])} débats actifs sauvegardés dans {self.active_debates_file}")
+        self._release_evicted(payload["evicted"])
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from itertools import combinations, permutations
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from backend.models.tournament import (
+    MatchStatus, Tournament, TournamentCreateRequest, TournamentMatch, TournamentStatus
+)
+
+# Un débat du tournoi: `play_match(match, checkpoint)` crée (ou reprend) le débat, joue
+# ses tours et renvoie les tokens consommés; `checkpoint()` persiste l'état du tournoi
+PlayMatch = Callable[[TournamentMatch, Callable[[], None]], Awaitable[int]]
+
+
+def build_matches(request: TournamentCreateRequest, agent_ids: List[str]) -> List[TournamentMatch]:
+    """Matrice des débats: débats explicites puis paires d'agents × sujets"""
+    matches = [
+        TournamentMatch(
+            id=str(uuid.uuid4()),
+            agent1_id=m.agent1_id,
+            agent2_id=m.agent2_id,
+            topic=m.topic,
+            config=m.config or request.config or {}
+        )
+        for m in request.matches
+    ]
+    pairs = permutations(agent_ids, 2) if request.both_sides else combinations(agent_ids, 2)
+    pairs = list(pairs)
+    for topic in request.topics:
+        for agent1_id, agent2_id in pairs:
+            matches.append(TournamentMatch(
+                id=str(uuid.uuid4()),
+                agent1_id=agent1_id,
+                agent2_id=agent2_id,
+                topic=topic,
+                config=request.config or {}
+            ))
+    return matches
+
+
+class TournamentStore:
+    """Un fichier JSON par tournoi, réécrit par le worker de persistance.
+
+    `mark(tournament)` note un tournoi modifié; `collect()` (boucle asyncio) capture les
+    tournois notés et `write(payload)` (thread) les écrit de façon atomique.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._dirty: Dict[str, Tournament] = {}
+
+    def mark(self, tournament: Tournament):
+        self._dirty[tournament.id] = tournament
+
+    def collect(self) -> List[dict]:
+        dirty, self._dirty = self._dirty, {}
+        return [tournament.model_dump(mode="json") for tournament in dirty.values()]
+
+    def write(self, payload: List[dict]):
+        if not payload:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for tournament_data in payload:
+            path = self.directory / f"{tournament_data['id']}.json"
+            tmp_path = path.with_name(path.name + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(tournament_data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def load_all(self) -> List[Tournament]:
+        tournaments = []
+        if not self.directory.exists():
+            return tournaments
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    tournaments.append(Tournament(**json.load(f)))
+            except Exception as e:
+                print(f"⚠️ Tournoi illisible {path.name}: {e}")
+        return tournaments
+
+
+class TournamentProgress:
+    """Débit de la session d'exécution en cours d'un tournoi"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.completed = 0
+        self.tokens = 0
+
+    def to_dict(self) -> dict:
+        elapsed = time.monotonic() - self.started
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "debates_completed": self.completed,
+            "debates_per_hour": round(self.completed / elapsed * 3600, 1) if elapsed > 0 else None,
+            "tokens_per_sec": round(self.tokens / elapsed, 1) if elapsed > 0 else None,
+        }
+
+
+class TournamentRunner:
+    """Planificateur des tournois: au plus `concurrency` débats simultanés par tournoi.
+
+    Les limites par fournisseur sont celles du contrôle d'admission d'`AIService`, que
+    chaque tour traverse. L'état est persisté à chaque changement de statut d'un débat;
+    un tournoi interrompu (arrêt, crash) reprend ses débats en attente ou en cours, ces
+    derniers à partir de leur transcription persistée.
+    """
+
+    def __init__(self, play_match: PlayMatch, store: TournamentStore, on_change: Callable[[], None]):
+        self.play_match = play_match
+        self.store = store
+        self.on_change = on_change
+        self.tournaments: Dict[str, Tournament] = {}
+        self.progress: Dict[str, TournamentProgress] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._stopping = False
+
+    def load(self) -> List[Tournament]:
+        """Charger les tournois persistés; renvoie ceux à reprendre"""
+        for tournament in self.store.load_all():
+            self.tournaments[tournament.id] = tournament
+        return [t for t in self.tournaments.values() if t.status == TournamentStatus.RUNNING]
+
+    def checkpoint(self, tournament: Tournament):
+        self.store.mark(tournament)
+        self.on_change()
+
+    def is_running(self, tournament_id: str) -> bool:
+        task = self._tasks.get(tournament_id)
+        return task is not None and not task.done()
+
+    def start(self, tournament: Tournament) -> asyncio.Task:
+        if self.is_running(tournament.id):
+            raise ValueError("Le tournoi est déjà en cours")
+        self.tournaments[tournament.id] = tournament
+        tournament.status = TournamentStatus.RUNNING
+        tournament.completed_at = None
+        self.progress[tournament.id] = TournamentProgress()
+        self.checkpoint(tournament)
+        task = asyncio.create_task(self._run(tournament), name=f"tournament-{tournament.id}")
+        self._tasks[tournament.id] = task
+        return task
+
+    async def _run(self, tournament: Tournament):
+        todo = [m for m in tournament.matches if m.status in (MatchStatus.PENDING, MatchStatus.RUNNING)]
+        print(f"🏆 Tournoi {tournament.id}: {len(todo)} débats à jouer ({tournament.concurrency} simultanés)")
+        semaphore = asyncio.Semaphore(tournament.concurrency)
+
+        async def play(match: TournamentMatch):
+            async with semaphore:
+                await self._play(tournament, match)
+
+        try:
+            await asyncio.gather(*(play(match) for match in todo))
+        except asyncio.CancelledError:
+            # Arrêt de l'application: le tournoi reste `running` pour être repris
+            if not self._stopping:
+                tournament.status = TournamentStatus.CANCELLED
+            for match in tournament.matches:
+                if match.status == MatchStatus.RUNNING:
+                    match.status = MatchStatus.PENDING
+            self.checkpoint(tournament)
+            print(f"⏹️ Tournoi {tournament.id} {'interrompu' if self._stopping else 'annulé'}")
+            raise
+        tournament.status = TournamentStatus.COMPLETED
+        tournament.completed_at = datetime.now()
+        self.checkpoint(tournament)
+        print(f"✅ Tournoi {tournament.id} terminé: {self.progress[tournament.id].to_dict()}")
+
+    async def _play(self, tournament: Tournament, match: TournamentMatch):
+        match.status = MatchStatus.RUNNING
+        match.started_at = match.started_at or datetime.now()
+        match.error = None
+        self.checkpoint(tournament)
+        try:
+            tokens = await self.play_match(match, lambda: self.checkpoint(tournament))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            match.status = MatchStatus.FAILED
+            match.error = str(e)
+            print(f"⚠️ Tournoi {tournament.id}, débat {match.debate_id}: {e}")
+        else:
+            match.status = MatchStatus.COMPLETED
+            match.tokens_used = tokens
+            progress = self.progress[tournament.id]
+            progress.completed += 1
+            progress.tokens += tokens
+        match.completed_at = datetime.now()
+        self.checkpoint(tournament)
+
+    def reset_failed(self, tournament: Tournament):
+        """Remettre en attente les débats en échec (rejoués à partir de leur transcription)"""
+        for match in tournament.matches:
+            if match.status == MatchStatus.FAILED:
+                match.status = MatchStatus.PENDING
+                match.error = None
+
+    async def cancel(self, tournament_id: str):
+        task = self._tasks.get(tournament_id)
+        if task is None or task.done():
+            raise KeyError(tournament_id)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def shutdown(self):
+        """Arrêt de l'application: les tournois en cours restent `running` pour être repris"""
+        self._stopping = True
+        tasks = [task for task in self._tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def summary(self, tournament: Tournament) -> dict:
+        statuses = [m.status for m in tournament.matches]
+        progress = self.progress.get(tournament.id)
+        return {
+            "id": tournament.id,
+            "name": tournament.name,
+            "status": tournament.status,
+            "concurrency": tournament.concurrency,
+            "created_at": tournament.created_at.isoformat(),
+            "completed_at": tournament.completed_at.isoformat() if tournament.completed_at else None,
+            "matches": len(statuses),
+            "progress": {status.value: statuses.count(status.value) for status in MatchStatus},
+            "tokens_used": sum(m.tokens_used for m in tournament.matches),
+            "throughput": progress.to_dict() if progress else None,
+        }
+
+    def get(self, tournament_id: str) -> Optional[Tournament]:
+        return self.tournaments.get(tournament_id)
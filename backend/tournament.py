@@ -0,0 +1,85 @@
+"""Exécution d'un tournoi en ligne de commande (sans serveur HTTP).
+
+Même planificateur et même persistance que l'API `/tournaments`: le tournoi est
+enregistré dans `data/tournaments/` et peut être repris après une interruption.
+
+    # Toutes les paires d'agents sur deux sujets, 8 débats simultanés
+    python -m backend.tournament --topics "Le télétravail" "La semaine de 4 jours" --max-turns 4 --concurrency 8
+
+    # Matrice explicite (JSON: objet TournamentCreateRequest)
+    python -m backend.tournament --matrix matrice.json
+
+    # Reprendre un tournoi interrompu
+    python -m backend.tournament --resume <id>
+"""
+import argparse
+import asyncio
+import json
+import os
+
+# Le tournoi est piloté ici: pas de reprise automatique des autres tournois
+os.environ.setdefault("TOURNAMENT_AUTORESUME", "false")
+
+from backend import main as api  # noqa: E402
+from backend.models.tournament import TournamentCreateRequest  # noqa: E402
+
+
+def print_progress(tournament):
+    summary = api.tournament_runner.summary(tournament)
+    progress = summary["progress"]
+    throughput = summary["throughput"] or {}
+    print(
+        f"📈 {progress['completed']}/{summary['matches']} terminés, {progress['running']} en cours, "
+        f"{progress['failed']} en échec | {throughput.get('debates_per_hour')} débats/h, "
+        f"{throughput.get('tokens_per_sec')} tokens/s"
+    )
+
+
+async def run(args):
+    async with api.lifespan(api.app):
+        if args.resume:
+            tournament = api.get_tournament_or_404(args.resume)
+            if args.retry_failed:
+                api.tournament_runner.reset_failed(tournament)
+            api.tournament_runner.start(tournament)
+        else:
+            if args.matrix:
+                with open(args.matrix, 'r', encoding='utf-8') as f:
+                    request = TournamentCreateRequest(**json.load(f))
+            else:
+                config = {"max_turns": args.max_turns}
+                if args.response_length:
+                    config["response_length"] = args.response_length
+                request = TournamentCreateRequest(
+                    name=args.name,
+                    topics=args.topics,
+                    agent_ids=args.agents,
+                    both_sides=not args.one_side,
+                    config=config,
+                    concurrency=args.concurrency
+                )
+            summary = await api.create_tournament(request)
+            tournament = api.tournament_runner.get(summary["id"])
+            print(f"🏆 Tournoi {tournament.id}: {len(tournament.matches)} débats")
+
+        task = api.tournament_runner._tasks[tournament.id]
+        while not task.done():
+            await asyncio.wait({task}, timeout=args.report_interval)
+            print_progress(tournament)
+        print(json.dumps(api.tournament_runner.summary(tournament), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", nargs="+", default=[], help="Sujets (toutes les paires d'agents)")
+    parser.add_argument("--agents", nargs="+", help="Identifiants des agents (tous par défaut)")
+    parser.add_argument("--one-side", action="store_true", help="Chaque paire ne débat que dans un sens")
+    parser.add_argument("--max-turns", type=int, default=4)
+    parser.add_argument("--response-length", choices=["concis", "moyen", "verbeux"])
+    parser.add_argument("--concurrency", type=int, default=4, help="Débats simultanés")
+    parser.add_argument("--name")
+    parser.add_argument("--matrix", help="Fichier JSON de la requête de tournoi (débats explicites)")
+    parser.add_argument("--resume", help="Identifiant du tournoi à reprendre")
+    parser.add_argument("--retry-failed", action="store_true", help="Avec --resume: rejouer les débats en échec")
+    parser.add_argument("--report-interval", type=float, default=10, help="Intervalle d'affichage de la progression (s)")
+    asyncio.run(run(parser.parse_args()))
@@ -196,6 +196,17 @@ function displayDebateInfo() {
     `;
 }
 
+// Fusionner une réponse incrémentale de GET /debates/{id} (nouveaux messages + champs d'état)
+function applyDebateDelta(delta) {
+    const debate = state.currentDebate;
+    const known = delta.reset ? [] : (debate.messages || []);
+    const knownIds = new Set(known.map(m => m.id));
+    debate.messages = known.concat(delta.messages.filter(m => !knownIds.has(m.id)));
+    for (const field of ['status', 'current_turn', 'winner_id', 'started_at', 'completed_at']) {
+        debate[field] = delta[field];
+    }
+}
+
 function addMessageToDebate(message, agentClass, agentName) {
     const messageDiv = document.createElement('div');
     messageDiv.className = `message ${agentClass}`;
@@ -527,11 +538,19 @@ elements.nextTurnBtn.addEventListener('click', async () => {
                         }
                         contentDiv.innerHTML = escapeHtml(placeholderMsg.content).replace(/\n/g, '<br>');
 
-                        // Récupérer l'état final du débat côté serveur pour mise à jour
+                        // Récupérer l'état du débat côté serveur: seulement les nouveaux messages
+                        // et les champs d'état (sans le texte de la source)
                         try {
-                            const finalResp = await fetch(`${API_BASE_URL}/debates/${state.currentDebate.id}`);
+                            const known = state.currentDebate.messages || [];
+                            const params = new URLSearchParams();
+                            if (known.length && known[known.length - 1].id) {
+                                params.set('after_message_id', known[known.length - 1].id);
+                            } else {
+                                params.set('since_turn', '0');
+                            }
+                            const finalResp = await fetch(`${API_BASE_URL}/debates/${state.currentDebate.id}?${params}`);
                             if (finalResp.ok) {
-                                state.currentDebate = await finalResp.json();
+                                applyDebateDelta(await finalResp.json());
                             }
                         } catch (e) {
                             console.warn('Impossible d\'obtenir le débat final:', e);